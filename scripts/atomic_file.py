@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Atomic file replacement shared by every script that rewrites a file in place
+(saves, caches, indexes, provider files). Each write goes to its own
+mkstemp file next to the target and is renamed over it only once complete,
+so concurrent writers (a batch run, the watcher, the daemon) never clobber
+each other's half-written temporary file and readers never see one.
+
+Usage:
+    with atomic_write(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+"""
+
+import contextlib
+import os
+import tempfile
+
+
+def temp_path(path):
+    """A fresh temporary file next to path, so concurrent writers never share one"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=f".{os.path.basename(path)}.",
+                                    suffix='.tmp')
+    os.close(fd)
+    # mkstemp files are private; give it the mode a plain open() would
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(tmp_path, 0o666 & ~umask)
+    return tmp_path
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='wb', encoding=None, validate=None, keep_existing=False):
+    """Open a unique temporary file for writing and move it over path on success
+
+    If the block raises, the temporary file is removed and path is left as
+    it was. validate(tmp_path), if given, runs on the finished file before
+    it replaces path and may raise to abort the same way. With
+    keep_existing, a path that appeared meanwhile (the same
+    content-addressed object from another process) counts as written.
+    """
+    tmp_path = temp_path(path)
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+        if validate is not None:
+            validate(tmp_path)
+        if keep_existing and os.path.exists(path):
+            os.remove(tmp_path)
+            return
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Packed attribute store for every player in a save
+Each player's attributes dict ({'LAY': [current, max], ...}) becomes one row
+of a single (players, attributes, 2) int8 array, so whole-league questions
+("who has a 20/20 attribute?") and bulk overwrites are array operations.
+Writes go to the array first and are copied back into the player dicts by
+sync(), only for the rows that changed.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # AttributeMatrix needs NumPy; callers check for it
+    np = None
+
+# Stored for attributes a player doesn't have
+MISSING = -1
+
+
+class AttributeMatrix:
+    """int8 [current, max] values for a list of player dicts
+
+    keys fixes the order of the first columns (e.g. ATTRIBUTE_KEYS, so
+    calculate_attributes_batch rows can be assigned directly); any other
+    attribute found in the players is added after them.
+    """
+
+    def __init__(self, players, keys=()):
+        if np is None:
+            raise ImportError("AttributeMatrix needs NumPy (pip install numpy)")
+        self.players = list(players)
+        self.keys = list(keys)
+        self.col_of = {key: col for col, key in enumerate(self.keys)}
+        self.row_of = {id(player): row for row, player in enumerate(self.players)}
+
+        rows, cols, pairs = [], [], []
+        for row, player in enumerate(self.players):
+            attributes = player.get('attributes')
+            if not isinstance(attributes, dict):
+                continue
+            for key, value in attributes.items():
+                if not (isinstance(value, list) and len(value) == 2
+                        and all(isinstance(v, int) and -128 <= v <= 127 for v in value)):
+                    continue
+                if key not in self.col_of:
+                    self.col_of[key] = len(self.keys)
+                    self.keys.append(key)
+                rows.append(row)
+                cols.append(self.col_of[key])
+                pairs.append(value)
+
+        self.values = np.full((len(self.players), len(self.keys), 2), MISSING, dtype=np.int8)
+        if pairs:
+            self.values[rows, cols] = np.array(pairs, dtype=np.int8)
+        # Columns written through assign() and not yet synced, per row
+        self.assigned = np.zeros((len(self.players), len(self.keys)), dtype=bool)
+
+    @classmethod
+    def from_leagues(cls, leagues, league_types=None, keys=()):
+        """Matrix over every roster player in leagues whose leagueType is in league_types"""
+        players = [
+            player
+            for league in leagues
+            if league_types is None or league.get('leagueType') in league_types
+            for team in league.get('teams') or []
+            for player in team.get('roster') or []
+        ]
+        return cls(players, keys)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def row(self, player):
+        """Row of this player dict, or None if it isn't in the matrix"""
+        return self.row_of.get(id(player))
+
+    def assign(self, player, values, keys=None):
+        """Overwrite a player's attributes with a (len(keys), 2) array of [current, max]
+
+        keys defaults to the leading columns, in order. The player dict is
+        only updated on sync().
+        """
+        row = self.row_of[id(player)]
+        cols = list(range(len(values))) if keys is None else [self.col_of[key] for key in keys]
+        self.values[row, cols] = values
+        self.assigned[row, cols] = True
+
+    def maxed_rows(self, require_all=False):
+        """Rows with any attribute at 20/20 (or every attribute they have, with require_all)"""
+        maxed = (self.values == 20).all(axis=2)
+        if not require_all:
+            return np.flatnonzero(maxed.any(axis=1))
+        present = self.values[:, :, 1] != MISSING
+        return np.flatnonzero((maxed | ~present).all(axis=1) & present.any(axis=1))
+
+    def sync(self):
+        """Copy assigned values back into the player dicts; returns the number of players written"""
+        dirty = np.flatnonzero(self.assigned.any(axis=1))
+        for row in dirty.tolist():
+            player = self.players[row]
+            attributes = player.get('attributes')
+            attributes = dict(attributes) if isinstance(attributes, dict) else {}
+            cols = np.flatnonzero(self.assigned[row])
+            for col, pair in zip(cols.tolist(), self.values[row, cols].tolist()):
+                attributes[self.keys[col]] = pair
+            player['attributes'] = attributes
+        self.assigned[dirty] = False
+        return len(dirty)
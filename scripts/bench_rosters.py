@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Benchmark the roster update pipeline on synthetic saves
+Generates a mobile-format save with a configurable number of leagues, teams,
+roster size and career-stat history, then times each phase of the update
+separately. One extra run under tracemalloc gives each phase's peak of
+traced (Python and NumPy) memory; the peak RSS is reported for the whole
+process only. Results can be appended to a JSON Lines file to compare runs.
+
+Usage:
+    python3 bench_rosters.py --leagues 4 --teams 64 --history 10 --output bench_results.jsonl
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+
+try:
+    import resource
+except ImportError:  # Windows - peak RSS is not reported
+    resource = None
+
+import update_all_rosters as rosters
+from save_index import SaveIndex, team_display_name
+from run_profile import RunProfile
+from save_stream import StreamedSave
+
+SYNTHETIC_ATTRIBUTES = rosters.ATTRIBUTE_KEYS + ('SPD', 'STR', 'STM')
+
+
+def synthetic_player(rng, pid, history):
+    """A roster entry shaped like the ones in real mobile saves"""
+    attributes = {}
+    for key in SYNTHETIC_ATTRIBUTES:
+        max_val = rng.randint(8, 19)
+        attributes[key] = [rng.randint(0, max_val), max_val]
+    return {
+        'pid': pid,
+        'fn': rng.choice(rosters.FIRST_NAMES),
+        'ln': rng.choice(rosters.LAST_NAMES),
+        'pos': rng.randint(0, 4),
+        'num': rng.randint(0, 55),
+        'ht': rng.choice(rosters.HEIGHTS[2]),
+        'wt': rng.choice(rosters.WEIGHTS[2]),
+        'age': rng.randint(18, 35),
+        'rating': rng.randint(60, 95),
+        'attributes': attributes,
+        'skills': [],
+        'stats': [{'season': {'gp': 30, 'ppg': round(rng.uniform(0, 25), 1)}}],
+        'careerStats': [
+            {'year': 2025 - year, 'gp': rng.randint(10, 82), 'pts': rng.randint(0, 2000),
+             'reb': rng.randint(0, 900), 'ast': rng.randint(0, 700), 'min': round(rng.uniform(5, 38), 1)}
+            for year in range(history)
+        ],
+    }
+
+
+def make_synthetic_save(leagues=3, teams=64, roster_size=11, history=5, seed=0):
+    """Build a save dict: league 0 is college (TEAM_QUALITY team names), the rest are pro
+
+    The career player (pid CAREER_PID) is placed on the second college team.
+    """
+    rng = random.Random(seed)
+    team_names = list(rosters.TEAM_QUALITY)
+    pid = 1000
+    season_leagues = []
+    for league_idx in range(leagues):
+        college = league_idx == 0
+        league_teams = []
+        for team_idx in range(teams):
+            if college:
+                city, name = team_names[team_idx % len(team_names)].rsplit(' ', 1)
+            else:
+                city, name = f"City {league_idx}-{team_idx}", "Pros"
+            roster = []
+            for _ in range(roster_size):
+                pid += 1
+                roster.append(synthetic_player(rng, pid, history))
+            league_teams.append({'id': team_idx, 'city': city, 'name': name, 'roster': roster})
+        season_leagues.append({
+            'leagueName': 'College' if college else f"Pro {league_idx}",
+            'leagueType': 1 if college else 0,
+            'teams': league_teams,
+            'draftClass': [synthetic_player(rng, 900000 + league_idx * 1000 + i, 0) for i in range(60)],
+        })
+
+    if teams > 1 and roster_size:
+        career = season_leagues[0]['teams'][1]['roster'][0]
+        career.update({'pid': rosters.CAREER_PID, 'fn': 'Isaac', 'ln': 'Condrey'})
+        career['attributes'] = {key: [20, 20] for key in SYNTHETIC_ATTRIBUTES}
+    return {'version': 1, 'seasonLeagues': season_leagues}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_once(save_path, seed, scratch_dir, profile=None):
+    """Time every phase of one update; returns the RunProfile holding them
+
+    With a RunProfile('memory') the phases also record their tracemalloc
+    peak, which slows them down, so main() does that in a run of its own.
+    """
+    if profile is None:
+        profile = RunProfile()
+    source = rosters.ROSTER_SOURCE
+    profile.start()
+    try:
+        with profile.phase('load'):
+            with open(save_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+        with profile.phase('stream_load'):
+            with StreamedSave(save_path) as streamed:
+                college = {span.index: streamed.load_league(span)
+                           for span in streamed.leagues if span.league_type == 1}
+
+        with profile.phase('career_search'):
+            index = SaveIndex(data['seasonLeagues'], league_types={1}, career_check=rosters.is_career_player)
+            index.find_pid(rosters.CAREER_PID)
+
+        generator = rosters.RosterGenerator(seed)
+        with profile.phase('update'):
+            for _, _, team in index.teams(1):
+                if team.get('roster'):
+                    team_name = team_display_name(team)
+                    rosters.update_team(team, source.get(team_name, []),
+                                        rosters.TEAM_QUALITY.get(team_name, "average"), index, generator,
+                                        verbose=False)
+
+        out_path = os.path.join(scratch_dir, 'dump.json')
+        with profile.phase('dump'):
+            with open(out_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+        splice_path = os.path.join(scratch_dir, 'splice.json')
+        with profile.phase('splice_write'):
+            with StreamedSave(save_path) as streamed:
+                dirty = {i: set(range(len(league.get('teams') or []))) for i, league in college.items()}
+                streamed.write_leagues(splice_path, college, dirty)
+    finally:
+        profile.stop()
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark update_all_rosters.py on a synthetic save")
+    parser.add_argument('--leagues', type=int, default=3, help="Leagues in the save (first one is college)")
+    parser.add_argument('--teams', type=int, default=64, help="Teams per league")
+    parser.add_argument('--roster-size', type=int, default=11, help="Players per team")
+    parser.add_argument('--history', type=int, default=5, help="careerStats seasons per player")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per phase (min and median are reported)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic save and generated players")
+    parser.add_argument('--output', help="Append the results as one JSON line to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        save_path = os.path.join(scratch_dir, 'synthetic_save.json')
+        with open(save_path, 'w', encoding='utf-8') as f:
+            json.dump(make_synthetic_save(args.leagues, args.teams, args.roster_size, args.history, args.seed),
+                      f, ensure_ascii=False, indent=2)
+        save_bytes = os.path.getsize(save_path)
+        print(f"Synthetic save: {save_bytes / 1e6:.1f} MB "
+              f"({args.leagues} leagues x {args.teams} teams x {args.roster_size} players, "
+              f"{args.history} seasons of history)")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            rosters.ROSTER_SOURCE.load()
+
+        runs = [run_once(save_path, args.seed, scratch_dir).phases for _ in range(args.repeat)]
+        # One more run under tracemalloc for per-phase memory, kept out of the timings
+        memory = run_once(save_path, args.seed, scratch_dir, RunProfile('memory')).memory
+
+    phases = {}
+    for phase in runs[0]:
+        samples = [run[phase] for run in runs]
+        phases[phase] = {'min_s': min(samples), 'median_s': statistics.median(samples),
+                         'peak_mb': memory[phase] / 1e6}
+        print(f"  {phase:<14} min {min(samples) * 1000:9.1f} ms   median {statistics.median(samples) * 1000:9.1f} ms"
+              f"   traced peak {memory[phase] / 1e6:8.1f} MB")
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"  process peak RSS (whole benchmark, including setup) {peak:.1f} MB")
+
+    if args.output:
+        record = {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'numpy': rosters.np.__version__ if rosters.np is not None else None,
+            'params': {'leagues': args.leagues, 'teams': args.teams, 'roster_size': args.roster_size,
+                       'history': args.history, 'repeat': args.repeat, 'seed': args.seed},
+            'save_bytes': save_bytes,
+            'phases': phases,
+            # Whole-process high-water mark; per-phase memory is phases[...]['peak_mb']
+            'peak_rss_mb': peak,
+        }
+        with open(args.output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+        print(f"✅ Results appended to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Fetch provider rosters for every college team into the *_rosters.json files
+Requests for all teams run concurrently (asyncio, with the blocking
+http.client calls in a small thread pool), reusing a few keep-alive
+connections per host and staying under each provider's rate limit. Responses
+are cached on disk: within --ttl they are reused without a request, after
+that they are revalidated with ETag/Last-Modified, so a warm refresh is mostly
+304s. Each provider file is written atomically and picked up by RosterStore
+on the next run of update_all_rosters.py.
+
+Usage:
+    python3 fetch_rosters_from_api.py                       # every configured provider
+    python3 fetch_rosters_from_api.py --provider TheSportsDB --ttl 3600
+    SPORTSDATAIO_KEY=... python3 fetch_rosters_from_api.py --provider SportsDataIO
+    python3 fetch_rosters_from_api.py --base-url TheSportsDB=http://127.0.0.1:8080/api/v1/json/3
+"""
+
+import argparse
+import asyncio
+import datetime
+import hashlib
+import http.client
+import json
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+import update_all_rosters as rosters_cli
+from atomic_file import atomic_write
+from team_match import TeamMatcher
+
+CACHE_DIR = os.path.join(rosters_cli.BASE_DIR, '.http_cache')
+
+# Seconds a cached response is used without asking the server again
+DEFAULT_TTL = 6 * 3600
+
+# Keep-alive connections per provider host
+POOL_SIZE = 4
+
+REQUEST_TIMEOUT = 20.0
+MAX_RETRIES = 3
+
+POSITION_CODES = {
+    'pg': 0, 'point guard': 0, 'sg': 1, 'shooting guard': 1, 'sf': 2, 'small forward': 2,
+    'pf': 3, 'power forward': 3, 'c': 4, 'center': 4, 'centre': 4, 'g': 5, 'guard': 5,
+    'f': 6, 'forward': 6, 'fc': 7, 'f-c': 7, 'forward-center': 7, 'gf': 8, 'g-f': 8, 'guard-forward': 8,
+}
+
+
+class FetchError(Exception):
+    pass
+
+
+def position_code(text):
+    return POSITION_CODES.get(str(text or '').strip().lower().replace('/', '-'))
+
+
+def inches_to_height(inches):
+    """74 -> 6'2\""""
+    try:
+        inches = int(inches)
+    except (TypeError, ValueError):
+        return None
+    return f"{inches // 12}'{inches % 12}\""
+
+
+def _jersey(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _age(born):
+    try:
+        born = datetime.date.fromisoformat(str(born)[:10])
+    except ValueError:
+        return None
+    today = datetime.date.today()
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+
+def _player(first_name, last_name, position=None, jersey=None, height=None, weight=None, age=None):
+    """A roster entry in the REAL_ROSTERS format, leaving out anything the provider didn't send"""
+    player = {'first_name': first_name, 'last_name': last_name, 'position': position, 'jersey': jersey,
+              'height': height, 'weight': weight, 'age': age}
+    return {key: value for key, value in player.items() if value is not None}
+
+
+def parse_thesportsdb(payload, team_name):
+    roster = []
+    for entry in (payload or {}).get('player') or []:
+        if entry.get('strSport') not in (None, 'Basketball'):
+            continue
+        first, _, last = (entry.get('strPlayer') or '').partition(' ')
+        weight = (entry.get('strWeight') or '').split(' ')[0] or None
+        roster.append(_player(first, last, position_code(entry.get('strPosition')), _jersey(entry.get('strNumber')),
+                              entry.get('strHeight') or None, weight, _age(entry.get('dateBorn'))))
+    return roster
+
+
+def parse_sportsdataio(payload, team_name):
+    roster = []
+    for entry in payload or []:
+        if entry.get('Status') not in (None, 'Active'):
+            continue
+        weight = entry.get('Weight')
+        roster.append(_player(entry.get('FirstName'), entry.get('LastName'), position_code(entry.get('Position')),
+                              _jersey(entry.get('Jersey')), inches_to_height(entry.get('Height')),
+                              None if weight is None else str(weight), _age(entry.get('BirthDate'))))
+    return roster
+
+
+def sportsdataio_team_keys(payload):
+    """(display name, city) -> team Key from the SportsDataIO Teams endpoint"""
+    return {
+        (f"{team.get('School', '')} {team.get('Name', '')}".strip(), team.get('School')): team['Key']
+        for team in payload or [] if team.get('Key')
+    }
+
+
+class ProviderAPI:
+    """How to ask one provider for one team's roster
+
+    roster_path(team_key) gives the request path under base_url. When
+    teams_path is set, team names are first resolved to the provider's own
+    keys through that endpoint (team_keys turns its payload into
+    {(name, city): key}); otherwise the team name itself is the key.
+    """
+
+    def __init__(self, name, base_url, roster_path, parse, rate=2.0, headers=None, teams_path=None,
+                 team_keys=None, key_env=None):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.roster_path = roster_path
+        self.parse = parse
+        self.rate = rate
+        self.headers = dict(headers or {})
+        self.teams_path = teams_path
+        self.team_keys = team_keys
+        self.key_env = key_env
+
+
+API_PROVIDERS = [
+    ProviderAPI('SportsDataIO', 'https://api.sportsdata.io/v3/cbb/scores/json',
+                lambda key: f"/Players/{quote(key)}", parse_sportsdataio, rate=5.0,
+                teams_path='/teams', team_keys=sportsdataio_team_keys, key_env='SPORTSDATAIO_KEY'),
+    ProviderAPI('TheSportsDB', 'https://www.thesportsdb.com/api/v1/json/3',
+                lambda key: f"/searchplayers.php?t={quote(key.replace(' ', '_'))}", parse_thesportsdb, rate=0.5),
+]
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` requests per second, bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ConnectionPool:
+    """Keep-alive http.client connections to one host, handed out one per request"""
+
+    def __init__(self, base_url, size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._size = size
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return cls(self.host, timeout=self.timeout)
+
+    def request(self, path, headers):
+        """Blocking GET; returns (status, headers dict, body bytes)"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        for attempt in range(2):
+            try:
+                conn.request('GET', self.prefix + path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError, OSError):
+                conn.close()
+                if attempt:
+                    raise
+                # The server may have dropped an idle keep-alive connection
+                conn = self._connect()
+        if response.will_close:
+            conn.close()
+        elif self._idle.qsize() < self._size:
+            self._idle.put(conn)
+        return response.status, {key.lower(): value for key, value in response.getheaders()}, body
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class ResponseCache:
+    """One JSON file per URL with the body and its ETag/Last-Modified validators"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, url):
+        return os.path.join(self.root, f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json")
+
+    def get(self, url):
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable cached response for {url}: {e}")
+            return None
+
+    def put(self, url, entry):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(url)
+        with atomic_write(path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+
+
+class Fetcher:
+    """Cached, rate-limited GETs for one provider; counts what it did in stats"""
+
+    def __init__(self, api, cache, ttl, executor, limiter=None):
+        self.api = api
+        self.cache = cache
+        self.ttl = ttl
+        self.executor = executor
+        self.pool = ConnectionPool(api.base_url)
+        self.limiter = limiter or RateLimiter(api.rate, burst=max(1, int(api.rate)))
+        self.headers = {'Accept': 'application/json', 'User-Agent': 'hoopland-roster-fetcher'}
+        self.headers.update(api.headers)
+        if api.key_env and os.environ.get(api.key_env):
+            self.headers['Ocp-Apim-Subscription-Key'] = os.environ[api.key_env]
+        self.stats = {'requests': 0, 'fresh': 0, 'not_modified': 0, 'downloaded': 0, 'errors': 0}
+
+    async def get_json(self, path):
+        url = self.api.base_url + path
+        cached = self.cache.get(url)
+        if cached is not None and time.time() - cached['fetched_at'] < self.ttl:
+            self.stats['fresh'] += 1
+            return json.loads(cached['body'])
+
+        headers = dict(self.headers)
+        if cached is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(MAX_RETRIES):
+            await self.limiter.acquire()
+            self.stats['requests'] += 1
+            try:
+                status, response_headers, body = await loop.run_in_executor(
+                    self.executor, self.pool.request, path, headers)
+            except (http.client.HTTPException, OSError) as e:
+                error = FetchError(f"{url}: {e}")
+                await asyncio.sleep(2 ** attempt)
+                continue
+            if status == 304 and cached is not None:
+                cached['fetched_at'] = time.time()
+                self.cache.put(url, cached)
+                self.stats['not_modified'] += 1
+                return json.loads(cached['body'])
+            if status == 200:
+                text = body.decode('utf-8')
+                payload = json.loads(text)
+                self.cache.put(url, {
+                    'url': url,
+                    'fetched_at': time.time(),
+                    'etag': response_headers.get('etag'),
+                    'last_modified': response_headers.get('last-modified'),
+                    'body': text,
+                })
+                self.stats['downloaded'] += 1
+                return payload
+            error = FetchError(f"{url}: HTTP {status}")
+            if status != 429 and status < 500:
+                break
+            retry_after = response_headers.get('retry-after', '')
+            await asyncio.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+        self.stats['errors'] += 1
+        raise error
+
+    def close(self):
+        self.pool.close()
+
+
+async def fetch_provider(api, teams, cache, ttl, executor):
+    """{team name: roster} for every team the provider answered for"""
+    fetcher = Fetcher(api, cache, ttl, executor)
+    try:
+        keys = {team: team for team in teams}
+        if api.teams_path:
+            provider_teams = api.team_keys(await fetcher.get_json(api.teams_path))
+            matcher = TeamMatcher(provider_teams)
+            keys = {}
+            for team in teams:
+                found = matcher.match(team)
+                if found.team is not None:
+                    keys[team] = next(key for (name, _), key in provider_teams.items() if name == found.team)
+            missing = len(teams) - len(keys)
+            if missing:
+                print(f"⚠️  {api.name}: {missing} teams have no provider team key")
+
+        async def one(team):
+            try:
+                return team, api.parse(await fetcher.get_json(api.roster_path(keys[team])), team)
+            except (FetchError, ValueError) as e:
+                print(f"⚠️  {api.name}: {team} skipped ({e})")
+                return team, None
+
+        results = await asyncio.gather(*(one(team) for team in keys))
+    finally:
+        fetcher.close()
+    rosters = {team: roster for team, roster in results if roster}
+    return rosters, fetcher.stats
+
+
+def write_provider_file(path, rosters):
+    """Replace a provider file atomically so RosterStore never sees half of one"""
+    with atomic_write(path, 'w', encoding='utf-8') as f:
+        json.dump(rosters, f, ensure_ascii=False, indent=2)
+
+
+async def fetch_all(apis, teams, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL, outputs=None):
+    """Fetch every provider concurrently and write its file; returns {provider: stats}"""
+    outputs = outputs or {provider.name: provider.path for provider in rosters_cli.PROVIDERS}
+    cache = ResponseCache(cache_dir)
+    with ThreadPoolExecutor(max_workers=POOL_SIZE * max(1, len(apis))) as executor:
+        results = await asyncio.gather(*(fetch_provider(api, teams, cache, ttl, executor) for api in apis),
+                                       return_exceptions=True)
+    summary = {}
+    for api, result in zip(apis, results):
+        if isinstance(result, Exception):
+            print(f"❌ {api.name}: {result}")
+            continue
+        rosters, stats = result
+        if rosters:
+            write_provider_file(outputs[api.name], rosters)
+        summary[api.name] = dict(stats, teams=len(rosters))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch provider rosters for every college team")
+    parser.add_argument('--provider', action='append', choices=[api.name for api in API_PROVIDERS],
+                        help="Only fetch this provider (repeatable; default: all)")
+    parser.add_argument('--base-url', action='append', default=[], metavar='NAME=URL',
+                        help="Point a provider at another server, e.g. a local mirror")
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL,
+                        help=f"Seconds to reuse cached responses without revalidating (default: {DEFAULT_TTL})")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="Response cache directory")
+    parser.add_argument('--teams', nargs='+', help="Only these teams (default: every team in TEAM_QUALITY)")
+    args = parser.parse_args()
+
+    apis = [api for api in API_PROVIDERS if not args.provider or api.name in args.provider]
+    for override in args.base_url:
+        name, _, url = override.partition('=')
+        matching = [api for api in apis if api.name == name]
+        if not matching or not url:
+            print(f"Error: --base-url expects NAME=URL with NAME one of {', '.join(a.name for a in apis)}")
+            sys.exit(1)
+        matching[0].base_url = url.rstrip('/')
+    for api in apis:
+        if api.key_env and not os.environ.get(api.key_env):
+            print(f"⚠️  {api.name}: {api.key_env} is not set - requests will likely be rejected")
+
+    teams = args.teams or list(rosters_cli.TEAM_QUALITY)
+    started = time.perf_counter()
+    summary = asyncio.run(fetch_all(apis, teams, args.cache_dir, args.ttl))
+    for name, stats in summary.items():
+        print(f"✅ {name}: {stats['teams']} teams ({stats['requests']} requests, {stats['fresh']} cached, "
+              f"{stats['not_modified']} not modified, {stats['downloaded']} downloaded, {stats['errors']} errors)")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
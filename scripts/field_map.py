@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Declarative source -> save field mappings for roster updates
+A mapping is a dict of save field -> node, written like the save_schema
+layout, that says where each player field comes from in roster source data
+(REAL_ROSTERS / provider / generated player dicts). compile_field_map()
+turns it once into apply(player, real_data, attributes=None, matrix=None),
+a closure over the mapping's precomputed (source, field, kind) steps: when
+a record has every copied field, as generated and most provider players do,
+the fields are copied without any per-field membership tests.
+"""
+
+# Mapping nodes
+def Copy(source):
+    """Save field takes real_data[source] as is"""
+    return ('copy', source)
+
+
+def Attributes(source, from_stats, from_row):
+    """Attributes derived from real_data[source] stats
+
+    from_stats(stats) returns an attributes dict; from_row(row) turns a
+    precomputed attribute row (see calculate_attributes_batch) into one.
+    Either is merged over the player's existing attributes.
+    """
+    return ('attributes', source, from_stats, from_row)
+
+
+def Stats(source):
+    """Season stats merged from real_data[source] (list-shaped save stats are left alone)"""
+    return ('stats', source)
+
+
+def compile_field_map(fields):
+    """Turn a field mapping into apply(player, real_data, attributes=None, matrix=None)
+
+    attributes is an optional precomputed row for real_data's stats; with an
+    AttributeMatrix holding the player it is written there and only reaches
+    the player dict on matrix.sync(). The mapping is flattened once into
+    (source, field, kind) steps that the applier walks in order.
+    """
+    copies = []
+    steps = []
+    converters = {}
+    for field, node in fields.items():
+        kind = node[0]
+        if kind == 'copy':
+            copies.append((node[1], field))
+        elif kind in ('attributes', 'stats'):
+            steps.append((node[1], field, kind))
+            converters[field] = node[2:]
+        else:
+            raise ValueError(f"Unknown field mapping node {kind!r} for '{field}'")
+    copies = tuple(copies)
+    steps = tuple(steps)
+
+    def apply(player, real_data, attributes=None, matrix=None):
+        try:
+            # Records usually have every field; a missing one falls back to per-field checks
+            for source, field in copies:
+                player[field] = real_data[source]
+        except KeyError:
+            for source, field in copies:
+                if source in real_data:
+                    player[field] = real_data[source]
+
+        for source, field, kind in steps:
+            if kind == 'attributes':
+                from_stats, from_row = converters[field]
+                if attributes is not None:
+                    if matrix is not None and matrix.row(player) is not None:
+                        matrix.assign(player, attributes)
+                    else:
+                        player[field] = {**player.get(field, {}), **from_row(attributes)}
+                elif source in real_data:
+                    player[field] = {**player.get(field, {}), **from_stats(real_data[source])}
+            elif source in real_data:
+                current = player.get(field)
+                if isinstance(current, dict):
+                    current.update(real_data[source])
+                elif not isinstance(current, list):
+                    # List-shaped stats (per-season entries) are left alone
+                    player[field] = real_data[source]
+        return player
+
+    apply.fields = dict(fields)
+    apply.steps = tuple((source, field, 'copy') for source, field in copies) + steps
+    return apply
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Indexed player queries over a Hoop Land save
+Every player on a roster or in free agency becomes one row. Name and team
+words get inverted indexes (a sorted vocabulary, so prefixes work too), and
+position and league type get value -> rows tables. Rating, age, jersey, pid
+and every attribute get a sorted column. A query starts from its most
+selective filter and checks the rest row by row. Top-k sorts walk the sorted
+column from the best end and stop after k hits. The index is pickled next to
+the save and reused until the save changes.
+
+Usage:
+    python3 player_query.py save.json league=1 pos=C 'BLK>=15' 'age<=19'
+    python3 player_query.py save.json team=duke --sort rating --top 5
+    python3 player_query.py save.json name=jam --sort TPT
+"""
+
+import argparse
+import bisect
+import heapq
+import json
+import operator
+import os
+import pickle
+import re
+import sys
+import time
+
+from atomic_file import atomic_write
+from roster_store import file_digest
+from team_match import normalize_team
+
+# Bump when the row layout or the indexes change
+INDEX_VERSION = 1
+
+INDEX_SUFFIX = '.query-index.pickle'
+
+POSITIONS = ['PG', 'SG', 'SF', 'PF', 'C', 'G', 'F', 'FC', 'GF']
+
+NUMERIC_FIELDS = ('rating', 'age', 'num', 'pid')
+
+TEXT_FIELDS = ('name', 'team')
+
+FREE_AGENTS = 'Free Agents'
+
+OPERATORS = {
+    '>=': operator.ge, '<=': operator.le, '!=': operator.ne,
+    '=': operator.eq, '>': operator.gt, '<': operator.lt,
+}
+
+_FILTER = re.compile(r'^\s*([A-Za-z_]+)\s*(>=|<=|!=|=|>|<)\s*(.+?)\s*$')
+
+
+def index_path_for(save_file):
+    return f"{save_file}{INDEX_SUFFIX}"
+
+
+def position_code(value):
+    """0-8 for a position code or abbreviation (PG, c, '4'), else None"""
+    text = str(value).strip().upper()
+    if text in POSITIONS:
+        return POSITIONS.index(text)
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+def parse_filter(text):
+    """'BLK>=15' -> ('BLK', '>=', '15')"""
+    found = _FILTER.match(text)
+    if not found:
+        raise ValueError(f"Can't parse filter '{text}' (use field=value, field>=value, ...)")
+    field, op, value = found.groups()
+    return (field if field.isupper() else field.lower()), op, value
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+class SortedColumn:
+    """Row ids ordered by value, for range filters and top-k walks"""
+
+    def __init__(self, values, rows):
+        self.values = values
+        self.rows = rows
+
+    @classmethod
+    def build(cls, column):
+        order = sorted((value, row) for row, value in enumerate(column) if value is not None)
+        return cls([value for value, _ in order], [row for _, row in order])
+
+    def range(self, op, value):
+        """(lo, hi) slice of self.rows whose values satisfy op value"""
+        if op in ('>=', '>'):
+            side = bisect.bisect_left if op == '>=' else bisect.bisect_right
+            return side(self.values, value), len(self.values)
+        if op in ('<=', '<'):
+            side = bisect.bisect_right if op == '<=' else bisect.bisect_left
+            return 0, side(self.values, value)
+        return bisect.bisect_left(self.values, value), bisect.bisect_right(self.values, value)
+
+
+class TokenIndex:
+    """Inverted index from normalized words to row ids, with prefix lookups"""
+
+    def __init__(self, postings):
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+
+    @classmethod
+    def build(cls, texts):
+        postings = {}
+        for row, text in enumerate(texts):
+            for token in set(normalize_team(text).split()):
+                postings.setdefault(token, []).append(row)
+        return cls(postings)
+
+    def rows_with_prefix(self, prefix):
+        rows = set()
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            rows.update(self.postings[token])
+        return rows
+
+    def match(self, text):
+        """Rows containing every word of text (each word may be a prefix)"""
+        rows = None
+        for word in normalize_team(text).split():
+            found = self.rows_with_prefix(word)
+            rows = found if rows is None else rows & found
+            if not rows:
+                return set()
+        return rows if rows is not None else set()
+
+
+class PlayerIndex:
+    """Rows, columns and indexes for every player in a save"""
+
+    def __init__(self, leagues):
+        self.rows = []
+        for league_pos, league in enumerate(leagues):
+            league_type = league.get('leagueType')
+            for team in league.get('teams') or []:
+                team_name = f"{team.get('city', '')} {team.get('name', '')}".strip()
+                for player in team.get('roster') or []:
+                    self.rows.append(self._row(player, team_name, league_pos, league_type))
+            for player in league.get('freeAgents') or []:
+                self.rows.append(self._row(player, FREE_AGENTS, league_pos, league_type))
+
+        self.attribute_keys = sorted({key for row in self.rows for key in row['attributes']})
+        self.columns = {}
+        for field in NUMERIC_FIELDS:
+            self.columns[field] = [row[field] for row in self.rows]
+        for key in self.attribute_keys:
+            self.columns[key] = [row['attributes'].get(key) for row in self.rows]
+        self.sorted = {field: SortedColumn.build(values) for field, values in self.columns.items()}
+        self.text = {
+            'name': TokenIndex.build(row['name'] for row in self.rows),
+            'team': TokenIndex.build(row['team'] for row in self.rows),
+        }
+        self.by_value = {'pos': {}, 'league': {}}
+        for row_id, row in enumerate(self.rows):
+            self.by_value['pos'].setdefault(row['pos'], []).append(row_id)
+            self.by_value['league'].setdefault(row['league_type'], []).append(row_id)
+
+    def state(self):
+        """Plain lists and dicts, so the cached pickle doesn't depend on how this module was imported"""
+        return {
+            'rows': self.rows,
+            'attribute_keys': self.attribute_keys,
+            'columns': self.columns,
+            'sorted': {field: (index.values, index.rows) for field, index in self.sorted.items()},
+            'text': {field: index.postings for field, index in self.text.items()},
+            'by_value': self.by_value,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls.__new__(cls)
+        index.rows = state['rows']
+        index.attribute_keys = state['attribute_keys']
+        index.columns = state['columns']
+        index.sorted = {field: SortedColumn(*lists) for field, lists in state['sorted'].items()}
+        index.text = {field: TokenIndex(postings) for field, postings in state['text'].items()}
+        index.by_value = state['by_value']
+        return index
+
+    @staticmethod
+    def _row(player, team_name, league_pos, league_type):
+        attributes = {}
+        for key, value in (player.get('attributes') or {}).items():
+            if isinstance(value, list) and value:
+                value = value[0]
+            if _number(value) is not None:
+                attributes[key] = value
+        return {
+            'pid': _number(player.get('pid', player.get('id'))),
+            'name': f"{player.get('fn', '')} {player.get('ln', '')}".strip(),
+            'team': team_name,
+            'league': league_pos,
+            'league_type': _league_type(league_type),
+            'pos': position_code(player.get('pos')) if player.get('pos') is not None else None,
+            'num': _number(player.get('num')),
+            'age': _number(player.get('age')),
+            'rating': _number(player.get('rating')),
+            'attributes': attributes,
+        }
+
+    def _plan(self, field, op, value):
+        """(estimated rows, rows(), test(row)) for one filter"""
+        if field in TEXT_FIELDS:
+            if op not in ('=', '!='):
+                raise ValueError(f"{field} only supports = and !=")
+            matched = self.text[field].match(value)
+            if op == '!=':
+                return len(self.rows) - len(matched), None, lambda row: row not in matched
+            return len(matched), lambda: matched, lambda row: row in matched
+
+        if field in self.by_value:
+            key = position_code(value) if field == 'pos' else _parse_number(field, value)
+            if key is None:
+                raise ValueError(f"Unknown position '{value}' (use {', '.join(POSITIONS)} or 0-8)")
+            if op in ('=', '!='):
+                matched = set(self.by_value[field].get(key, ()))
+                if op == '!=':
+                    return len(self.rows) - len(matched), None, lambda row: row not in matched
+                return len(matched), lambda: matched, lambda row: row in matched
+            column = [row[field if field == 'pos' else 'league_type'] for row in self.rows]
+            compare = OPERATORS[op]
+            return len(self.rows), None, lambda row: _number(column[row]) is not None and compare(column[row], key)
+
+        if field not in self.columns:
+            known = ', '.join(TEXT_FIELDS + ('pos', 'league') + NUMERIC_FIELDS + tuple(self.attribute_keys))
+            raise ValueError(f"Unknown field '{field}' (fields: {known})")
+        number = _parse_number(field, value)
+        column = self.columns[field]
+        compare = OPERATORS[op]
+
+        def test(row):
+            return column[row] is not None and compare(column[row], number)
+
+        if op == '!=':
+            return len(self.rows), None, test
+        index = self.sorted[field]
+        lo, hi = index.range(op, number)
+        return hi - lo, lambda: set(index.rows[lo:hi]), test
+
+    def search(self, filters, sort=None, top=None, ascending=False):
+        """Row ids matching every (field, op, value) filter, best first when sorted"""
+        plans = sorted((self._plan(*f) for f in filters), key=lambda plan: plan[0])
+        drivers = [plan for plan in plans if plan[1] is not None]
+        driver = drivers[0] if drivers else None
+        tests = [plan[2] for plan in plans if plan is not driver]
+
+        def matches(row):
+            return all(test(row) for test in tests)
+
+        if sort is not None and sort not in self.sorted:
+            raise ValueError(f"Can't sort by '{sort}'")
+        estimate = driver[0] if driver else len(self.rows)
+        if sort and top and estimate and top * len(self.rows) < estimate * estimate:
+            # Walking the sorted column finds k hits after ~k * rows / estimate steps
+            index = self.sorted[sort]
+            candidates = driver[1]() if driver else None
+            order = index.rows if ascending else reversed(index.rows)
+            found = []
+            for row in order:
+                if (candidates is None or row in candidates) and matches(row):
+                    found.append(row)
+                    if len(found) == top:
+                        break
+            return found
+
+        candidates = driver[1]() if driver else range(len(self.rows))
+        found = [row for row in candidates if matches(row)]
+        if sort:
+            column = self.columns[sort]
+            found = [row for row in found if column[row] is not None]
+            if top:
+                pick = heapq.nsmallest if ascending else heapq.nlargest
+                return pick(top, found, key=lambda row: (column[row], row))
+            return sorted(found, key=lambda row: (column[row], row), reverse=not ascending)
+        found = sorted(found)
+        return found[:top] if top else found
+
+
+def _league_type(value):
+    """leagueType as an int when it is numeric (some saves store it as a string)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _parse_number(field, value):
+    try:
+        return float(value) if '.' in value else int(value)
+    except ValueError:
+        raise ValueError(f"{field} needs a number, got '{value}'") from None
+
+
+def _save_key(save_file):
+    st = os.stat(save_file)
+    return {'version': INDEX_VERSION, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'digest': None}
+
+
+def load_index(save_file, use_cache=True):
+    """PlayerIndex for save_file, from the pickle next to it when the save is unchanged
+
+    Returns (index, cache_hit).
+    """
+    key = _save_key(save_file)
+    cache_path = index_path_for(save_file)
+    if use_cache:
+        cached = _read_index(cache_path)
+        if cached is not None and cached['key']['version'] == INDEX_VERSION and cached['key']['size'] == key['size']:
+            if cached['key']['mtime_ns'] == key['mtime_ns']:
+                return PlayerIndex.from_state(cached['index']), True
+            key['digest'] = file_digest(save_file)
+            if cached['key']['digest'] == key['digest']:
+                # Same contents, new mtime - refresh the stored key
+                _write_index(cache_path, key, cached['index'])
+                return PlayerIndex.from_state(cached['index']), True
+
+    with open(save_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    leagues = data['seasonLeagues'] if 'seasonLeagues' in data else [data]
+    index = PlayerIndex(leagues)
+    del data
+    if use_cache:
+        if key['digest'] is None:
+            key['digest'] = file_digest(save_file)
+        _write_index(cache_path, key, index.state())
+    return index, False
+
+
+def _read_index(path):
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError) as e:
+        print(f"⚠️  Ignoring unreadable query index {path}: {e}")
+        return None
+
+
+def _write_index(path, key, state):
+    try:
+        with atomic_write(path) as f:
+            pickle.dump({'key': key, 'index': state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"⚠️  Could not write query index {path}: {e}")
+
+
+def format_row(row, extra_columns):
+    pos = POSITIONS[row['pos']] if row['pos'] is not None and 0 <= row['pos'] < len(POSITIONS) else '?'
+    extras = ''.join(f"  {key} {row['attributes'].get(key, '-')}" for key in extra_columns)
+    return (f"{row['pid'] if row['pid'] is not None else '-':>6}  {row['name'][:24]:<24}  {row['team'][:28]:<28}  "
+            f"{pos:<2}  age {row['age'] if row['age'] is not None else '-'}  "
+            f"rating {row['rating'] if row['rating'] is not None else '-'}{extras}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find players in a Hoop Land save with indexed filters")
+    parser.add_argument('save_file', help="Save file (.json)")
+    parser.add_argument('filters', nargs='*',
+                        help="Filters like pos=C 'BLK>=15' 'age<=19' team=duke name=james league=1")
+    parser.add_argument('--sort', help="Sort by rating, age, num, pid or an attribute key (best first)")
+    parser.add_argument('--ascending', action='store_true', help="Sort lowest first")
+    parser.add_argument('--top', type=int, default=25, help="Show at most this many players (default: 25, 0 = all)")
+    parser.add_argument('--no-cache', action='store_true', help=f"Don't read or write the {INDEX_SUFFIX} file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        filters = [parse_filter(text) for text in args.filters]
+        index, hit = load_index(args.save_file, use_cache=not args.no_cache)
+        loaded = time.perf_counter()
+        sort = args.sort if args.sort is None or args.sort.isupper() else args.sort.lower()
+        found = index.search(filters, sort, args.top or None, args.ascending)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    queried = time.perf_counter()
+
+    extra_columns = []
+    for field in [f for f, _, _ in filters] + [sort]:
+        if field in index.attribute_keys and field not in extra_columns:
+            extra_columns.append(field)
+    for row in found:
+        print(format_row(index.rows[row], extra_columns))
+    status = "cached index" if hit else "built index"
+    print(f"\n{len(found)} players ({status} {(loaded - started) * 1000:.0f} ms, "
+          f"query {(queried - loaded) * 1000:.2f} ms, {len(index.rows)} players indexed)")
+
+
+if __name__ == '__main__':
+    main()
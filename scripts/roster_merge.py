@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Player-level merge of the manual and provider rosters
+Provider files are read one team at a time straight from a memory map, and
+every player is deduplicated against the players already merged for that
+team through a (normalized name, jersey) index. Each field of a merged player
+comes from the highest-priority source that has it, so a provider that only
+knows a player's jersey never hides another provider's stats.
+"""
+
+import json
+import mmap
+import operator
+import os
+
+from save_index import normalize_name
+from save_stream import iter_members, skip_whitespace
+from team_match import apply_aliases, normalize_team
+
+# Source name used for the hand-maintained REAL_ROSTERS
+MANUAL_SOURCE = 'REAL_ROSTERS'
+
+RULE_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, options: value in options,
+}
+
+
+def compile_rule(conditions):
+    """Turn [(field, op, value), ...] into a predicate that is True if any condition holds
+
+    Players missing the field never match that condition.
+    """
+    checks = [(field, RULE_OPERATORS[op], value) for field, op, value in conditions]
+
+    def matches(player):
+        for field, check, value in checks:
+            if player.get(field) is None:
+                continue
+            try:
+                if check(player[field], value):
+                    return True
+            except TypeError:
+                continue
+        return False
+
+    return matches
+
+
+def player_key(player):
+    """(normalized full name, jersey) used to recognise one player across providers"""
+    name = normalize_name(f"{player.get('first_name', '')} {player.get('last_name', '')}")
+    return name, player.get('jersey')
+
+
+def iter_provider_teams(path):
+    """Yield (team name, roster) from a provider file without loading the whole file"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for team_name, start, end in iter_members(buf, skip_whitespace(buf, 0)):
+                yield team_name, json.loads(buf[start:end])
+
+
+class RosterMerger:
+    """Accumulates rosters from several sources into one merged roster per team
+
+    priority lists source names, best first. field_priority optionally gives
+    a different order for single fields ({'rating': [MANUAL_SOURCE, ...]});
+    sources missing from a list rank after the ones in it.
+    """
+
+    def __init__(self, priority, field_priority=None):
+        self.rank = {name: pos for pos, name in enumerate(priority)}
+        self.field_rank = {
+            field: {name: pos for pos, name in enumerate(order)}
+            for field, order in (field_priority or {}).items()
+        }
+        self.teams = {}
+
+    def _source_rank(self, source, field=None):
+        ranks = self.field_rank.get(field)
+        if ranks is not None and source in ranks:
+            return ranks[source]
+        base = len(ranks) if ranks is not None else 0
+        return base + self.rank.get(source, len(self.rank))
+
+    def add_team(self, source, team_name, roster, exclude=None):
+        """Merge one source's roster for a team; returns how many players it kept"""
+        team_key = apply_aliases(normalize_team(team_name))
+        team = self.teams.get(team_key)
+        kept = 0
+        for player in roster or []:
+            if not isinstance(player, dict) or (exclude and exclude(player)):
+                continue
+            if team is None:
+                team = self.teams[team_key] = {
+                    'name': team_name, 'rank': self._source_rank(source),
+                    'players': [], 'field_ranks': [], 'by_key': {}, 'by_name': {},
+                }
+            self._add_player(team, source, player)
+            kept += 1
+        if team is not None and kept and self._source_rank(source) < team['rank']:
+            team['name'] = team_name
+            team['rank'] = self._source_rank(source)
+        return kept
+
+    def _add_player(self, team, source, player):
+        name, jersey = player_key(player)
+        slot = None
+        if name:
+            slot = team['by_key'].get((name, jersey))
+            if slot is None:
+                # A missing jersey on either side still matches a unique name
+                loose = [s for s in team['by_name'].get(name, [])
+                         if jersey is None or team['players'][s].get('jersey') is None]
+                if len(loose) == 1:
+                    slot = loose[0]
+
+        if slot is None:
+            slot = len(team['players'])
+            team['players'].append(dict(player))
+            team['field_ranks'].append({field: self._source_rank(source, field) for field in player})
+            if name:
+                team['by_name'].setdefault(name, []).append(slot)
+        else:
+            merged = team['players'][slot]
+            ranks = team['field_ranks'][slot]
+            for field, value in player.items():
+                rank = self._source_rank(source, field)
+                if field not in ranks or rank < ranks[field]:
+                    merged[field] = value
+                    ranks[field] = rank
+        if name:
+            team['by_key'].setdefault((name, team['players'][slot].get('jersey')), slot)
+
+    def rosters(self):
+        """Team name -> merged roster"""
+        return {team['name']: team['players'] for team in self.teams.values()}
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+One-pass roster filling
+Given the players a team keeps (real or protected), plans the open slots so
+that positions stay balanced, every jersey on the team is unique and the
+team's ratings follow its quality tier's curve. Each step is a single pass
+over the roster, so a whole save's teams are planned in milliseconds.
+"""
+
+from itertools import islice
+
+# Position codes generated players use (PG, SG, SF, PF, C)
+POSITIONS = (0, 1, 2, 3, 4)
+
+# Preferred order for free jersey numbers - low numbers first, 0 last
+JERSEY_NUMBERS = tuple(range(1, 100)) + (0,)
+
+
+def fill_positions(kept_positions, count):
+    """Positions for count open slots, each going to the position the team has fewest of
+
+    Ties go to the lower position code; callers shuffle the result.
+    """
+    counts = {position: 0 for position in POSITIONS}
+    for position in kept_positions:
+        if position in counts:
+            counts[position] += 1
+    positions = []
+    for _ in range(count):
+        position = min(POSITIONS, key=counts.__getitem__)
+        counts[position] += 1
+        positions.append(position)
+    return positions
+
+
+def free_jerseys(kept_jerseys, count):
+    """The first count JERSEY_NUMBERS nobody on the team wears"""
+    taken = set(kept_jerseys)
+    jerseys = list(islice((number for number in JERSEY_NUMBERS if number not in taken), count))
+    if len(jerseys) < count:
+        raise ValueError(f"Only {len(jerseys)} free jersey numbers for {count} players")
+    return jerseys
+
+
+def rating_curve(roster_size, best, worst):
+    """Target ratings for a whole roster, best player first"""
+    if roster_size <= 1:
+        return [best] * roster_size
+    step = (best - worst) / (roster_size - 1)
+    return [round(best - step * i) for i in range(roster_size)]
+
+
+def fit_ratings(scores, kept_ratings, roster_size, best, worst):
+    """Ratings for the generated players so the whole team follows rating_curve
+
+    Each kept rating takes the closest target off the curve; the targets left
+    go to the generated players in order of score (ties keep input order).
+    """
+    targets = rating_curve(roster_size, best, worst)
+    for rating in kept_ratings:
+        if not targets:
+            break
+        if isinstance(rating, (int, float)) and not isinstance(rating, bool):
+            targets.pop(min(range(len(targets)), key=lambda i: abs(targets[i] - rating)))
+        else:
+            targets.pop()
+    # Rosters are never longer than the curve, but keep any extras at the floor
+    targets.extend([worst] * (len(scores) - len(targets)))
+    order = sorted(range(len(scores)), key=lambda i: -scores[i])
+    ratings = [None] * len(scores)
+    for target, i in zip(targets, order):
+        ratings[i] = target
+    return ratings
+
+
+def plan_roster(kept_players, count, shuffle=None):
+    """(positions, jerseys) for count generated players joining kept_players
+
+    kept_players are save player dicts staying on the team; shuffle (e.g.
+    RosterGenerator.shuffle) spreads the positions over the open slots.
+    """
+    positions = fill_positions((player.get('pos') for player in kept_players), count)
+    if shuffle is not None:
+        shuffle(positions)
+    jerseys = free_jerseys((player.get('num') for player in kept_players), count)
+    return positions, jerseys
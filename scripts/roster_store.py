@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Lazily loaded, cached roster source
+Merges the manual REAL_ROSTERS with the provider JSON files once (player by
+player, see roster_merge.py), stores the result in a binary cache keyed by
+each provider file, and only rebuilds it when one of those files actually
+changes
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+
+from atomic_file import atomic_write
+from roster_merge import MANUAL_SOURCE, RULE_OPERATORS, RosterMerger, compile_rule, iter_provider_teams
+
+# Bump when the merge rules change so old caches are rebuilt
+CACHE_VERSION = 2
+
+
+def file_digest(path):
+    """sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_exclusions(path):
+    """Provider name -> exclude rules listed in a roster overrides file
+
+    The file holds {"exclude": {provider name: [[field, op, value], ...]}}
+    for players that only a hand-kept list can tell apart (e.g. a staff
+    member a provider lists as a player). A missing file means no extra
+    rules; unreadable files and malformed rules are skipped with a warning.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable roster overrides {path}: {e}")
+        return {}
+
+    exclusions = {}
+    for name, rules in (overrides.get('exclude') or {}).items():
+        for rule in rules:
+            if not isinstance(rule, list) or len(rule) != 3 or rule[1] not in RULE_OPERATORS:
+                print(f"⚠️  Ignoring bad exclude rule for {name} in {path}: {rule!r}")
+                continue
+            exclusions.setdefault(name, []).append(tuple(rule))
+    return exclusions
+
+
+class Provider:
+    """One provider roster file
+
+    exclude is a list of (field, op, value) rules, e.g. ('age', '>=', 40);
+    players matching any rule are dropped before merging.
+    """
+
+    def __init__(self, name, path, exclude=None):
+        self.name = name
+        self.path = path
+        self.exclude = list(exclude or [])
+        self.excluded = compile_rule(self.exclude) if self.exclude else None
+
+
+class RosterStore:
+    """Merged team name -> roster mapping, compiled on first access
+
+    priority lists source names best first (MANUAL_SOURCE for the manual
+    rosters; by default manual first, then providers in order) and
+    field_priority overrides that order per player field. After a load,
+    stats holds the load time in milliseconds, whether the cache was hit and
+    how many rosters each provider contributed.
+    """
+
+    def __init__(self, manual_rosters, providers, cache_path, priority=None, field_priority=None):
+        self.manual_rosters = manual_rosters
+        self.providers = providers
+        self.cache_path = cache_path
+        names = [MANUAL_SOURCE] + [provider.name for provider in providers]
+        self.priority = list(priority or names) + [name for name in names if name not in (priority or names)]
+        self.field_priority = field_priority or {}
+        self.stats = {}
+        self._rosters = None
+
+    @property
+    def rosters(self):
+        if self._rosters is None:
+            self.load()
+        return self._rosters
+
+    def get(self, team_name, default=None):
+        return self.rosters.get(team_name, default)
+
+    def __contains__(self, team_name):
+        return team_name in self.rosters
+
+    def __len__(self):
+        return len(self.rosters)
+
+    def items(self):
+        return self.rosters.items()
+
+    def team_count(self):
+        """Number of teams with a non-empty roster"""
+        return len([name for name, roster in self.rosters.items() if roster])
+
+    def load(self):
+        """Load the merged rosters from the cache, rebuilding it if any input changed"""
+        started = time.perf_counter()
+        key = self._cache_key()
+        cached = self._read_cache()
+
+        if cached is not None and self._matches(cached['key'], key):
+            self._rosters = cached['rosters']
+            contributed = cached['contributed']
+            hit = True
+            if cached['key'] != key:
+                # Same contents, new mtimes - refresh the stored key
+                self._write_cache(key, self._rosters, contributed)
+        else:
+            self._rosters, contributed = self._compile()
+            if None not in contributed.values():
+                # Don't cache a merge that skipped a broken provider file
+                self._write_cache(key, self._rosters, contributed)
+            hit = False
+
+        self.stats = {
+            'cache_hit': hit,
+            'load_ms': (time.perf_counter() - started) * 1000,
+            'teams': len(self._rosters),
+            'contributed': contributed,
+        }
+        return self._rosters
+
+    def _manual_digest(self):
+        """Hash of the manual rosters and the merge configuration"""
+        config = {
+            'rosters': self.manual_rosters,
+            'priority': self.priority,
+            'field_priority': self.field_priority,
+            'exclude': {provider.name: provider.exclude for provider in self.providers},
+        }
+        encoded = json.dumps(config, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _cache_key(self):
+        files = []
+        for provider in self.providers:
+            try:
+                st = os.stat(provider.path)
+                files.append((provider.name, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                files.append((provider.name, None, None))
+        return {'version': CACHE_VERSION, 'manual': self._manual_digest(), 'files': files, 'digests': None}
+
+    def _matches(self, cached_key, key):
+        """Compare keys by mtime/size, falling back to content hashes when only mtimes moved"""
+        if cached_key['version'] != key['version'] or cached_key['manual'] != key['manual']:
+            return False
+        if cached_key['files'] == key['files']:
+            return True
+        if [size for _, _, size in cached_key['files']] != [size for _, _, size in key['files']]:
+            return False
+        digests = self._provider_digests()
+        key['digests'] = digests
+        return cached_key.get('digests') == digests
+
+    def _provider_digests(self):
+        return [
+            file_digest(provider.path) if os.path.exists(provider.path) else None
+            for provider in self.providers
+        ]
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError) as e:
+            print(f"⚠️  Ignoring unreadable roster cache {self.cache_path}: {e}")
+            return None
+
+    def _write_cache(self, key, rosters, contributed):
+        if key['digests'] is None:
+            key['digests'] = self._provider_digests()
+        try:
+            with atomic_write(self.cache_path) as f:
+                pickle.dump({'key': key, 'rosters': rosters, 'contributed': contributed},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            print(f"⚠️  Could not write roster cache {self.cache_path}: {e}")
+
+    def _compile(self):
+        """Merge the manual rosters with every provider file in one pass, best source first"""
+        merger = RosterMerger(self.priority, self.field_priority)
+        providers = {provider.name: provider for provider in self.providers}
+        contributed = {}
+        for source in self.priority:
+            if source == MANUAL_SOURCE:
+                for team_name, roster in self.manual_rosters.items():
+                    merger.add_team(MANUAL_SOURCE, team_name, roster)
+                continue
+            provider = providers.get(source)
+            if provider is None or not os.path.exists(provider.path):
+                continue
+
+            loaded_count = 0
+            try:
+                for team_name, roster in iter_provider_teams(provider.path):
+                    if merger.add_team(provider.name, team_name, roster, provider.excluded):
+                        loaded_count += 1
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipping the rest of {provider.name} rosters ({provider.path}): {e}")
+                contributed[provider.name] = None
+                continue
+            contributed[provider.name] = loaded_count
+            if loaded_count > 0:
+                print(f"✅ Loaded {loaded_count} rosters from {provider.name}")
+        return merger.rosters(), contributed
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Phase timing, counters and progress output for roster updates
+A RunProfile records the wall time of each named phase and a set of counters;
+it can also capture a cProfile of the whole run and the tracemalloc peak of
+each phase. Progress prints a summary line at a limited rate instead of one
+line per team.
+"""
+
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+
+PROFILE_MODES = ('time', 'cpu', 'memory', 'all')
+
+
+class RunProfile:
+    """Wall time per phase plus counters for one run
+
+    mode is one of PROFILE_MODES: 'cpu' adds a cProfile capture, 'memory'
+    adds the tracemalloc peak of each phase, 'all' does both.
+    """
+
+    def __init__(self, mode='time'):
+        self.mode = mode
+        self.phases = {}
+        self.memory = {}
+        self.counters = {}
+        self._cpu = cProfile.Profile() if mode in ('cpu', 'all') else None
+        self._trace_memory = mode in ('memory', 'all')
+
+    def start(self):
+        if self._trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self._cpu is not None:
+            self._cpu.enable()
+
+    def stop(self):
+        if self._cpu is not None:
+            self._cpu.disable()
+        if self._trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time the body; repeated phases accumulate"""
+        if self._trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+            if self._trace_memory and tracemalloc.is_tracing():
+                peak = tracemalloc.get_traced_memory()[1]
+                self.memory[name] = max(self.memory.get(name, 0), peak)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def as_dict(self):
+        return {
+            'mode': self.mode,
+            'phases': {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            'memory_peak_bytes': dict(self.memory) if self._trace_memory else None,
+            'counters': dict(self.counters),
+        }
+
+    def cpu_report(self, limit=20):
+        """Top functions by cumulative time, or '' when cProfile was not enabled"""
+        if self._cpu is None:
+            return ''
+        out = io.StringIO()
+        pstats.Stats(self._cpu, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+    def report(self):
+        total = sum(self.phases.values())
+        print(f"\n{'='*50}")
+        print("Profile")
+        for name, seconds in self.phases.items():
+            share = (seconds / total * 100) if total else 0.0
+            line = f"  {name:<20} {seconds * 1000:10.1f} ms  {share:5.1f}%"
+            if name in self.memory:
+                line += f"  peak {self.memory[name] / 1e6:8.1f} MB"
+            print(line)
+        for name, value in self.counters.items():
+            print(f"  {name:<20} {value:10}")
+        print(f"{'='*50}")
+        cpu = self.cpu_report()
+        if cpu:
+            print(cpu)
+
+    def write(self, path):
+        """Write as_dict() as JSON; a cProfile capture goes next to it as <path>.prof"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+        if self._cpu is not None:
+            self._cpu.dump_stats(f"{path}.prof")
+
+
+class Progress:
+    """'Updated N/total teams' at most once per interval seconds, plus a final line"""
+
+    def __init__(self, total, label, interval=1.0):
+        self.total = total
+        self.label = label
+        self.interval = interval
+        self.done = 0
+        self._started = time.perf_counter()
+        self._last = self._started
+
+    def step(self, amount=1):
+        self.done += amount
+        now = time.perf_counter()
+        if now - self._last >= self.interval and self.done < self.total:
+            self._last = now
+            print(f"   ... {self.label} {self.done}/{self.total} ({now - self._started:.1f}s)")
+
+    def finish(self):
+        print(f"   ... {self.label} {self.done}/{self.total} ({time.perf_counter() - self._started:.1f}s)")
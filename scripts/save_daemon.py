@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Local roster server for one Hoop Land save
+Loads the save, its SaveIndex and the roster source once and answers JSON
+requests on 127.0.0.1, so repeated edits cost milliseconds instead of a full
+load/update/dump cycle. Changes stay in memory until /flush writes them
+(through the same validated write as update_all_rosters.py).
+
+Usage:
+    python3 save_daemon.py NBA_CAREER_Y1_2025_SAVE_FILE_09.json --port 8765
+
+    curl localhost:8765/status
+    curl 'localhost:8765/player?pid=706'
+    curl 'localhost:8765/team?name=Duke'          # any unique prefix works
+
+    # POSTs need JSON and the token printed at startup
+    H=(-H 'Content-Type: application/json' -H "X-Roster-Token: $TOKEN")
+    curl "${H[@]}" localhost:8765/team/update -d '{"team": "Duke Blue Devils"}'
+    curl "${H[@]}" localhost:8765/team/generate -d '{"team": "Kansas", "quality": "elite"}'
+    curl "${H[@]}" -X POST localhost:8765/teams/update-all
+    curl "${H[@]}" -X POST localhost:8765/flush
+"""
+
+import argparse
+import hmac
+import json
+import os
+import secrets
+import sys
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import update_all_rosters as rosters_cli
+from save_index import SaveIndex, team_display_name
+from save_schema import SchemaError
+from team_match import TeamMatcher, normalize_team
+
+
+class SaveSession:
+    """A loaded save plus everything needed to update its college teams
+
+    Career relocation is left to update_all_rosters.py; protected players
+    are never touched here either.
+    """
+
+    def __init__(self, save_file, rosters, seed=None):
+        self.save_file = save_file
+        self.source = rosters
+        self.seed = seed
+        self.load()
+
+    def load(self):
+        with open(self.save_file, 'r', encoding='utf-8') as f:
+            self.data = json.load(f)
+        if 'seasonLeagues' not in self.data:
+            raise ValueError("Not a mobile save file")
+        self.index = SaveIndex(self.data['seasonLeagues'], league_types={1},
+                               career_check=rosters_cli.is_career_player)
+        self.matcher = TeamMatcher((team_display_name(team), team.get('city')) for _, _, team in self.index.teams(1))
+        self.rosters, self.match_report = self.matcher.resolve(self.source.items())
+        # Each team draws from its own stream, so with --seed a team comes out
+        # the same as in update_all_rosters.py --seed no matter what else was edited
+        self.master_seed = self.seed if self.seed is not None else secrets.randbits(64)
+        self.dirty = set()
+
+    def status(self):
+        return {
+            'file': self.save_file,
+            'teams': sum(1 for _ in self.index.teams(1)),
+            'players': len(self.index.by_pid),
+            'real_rosters': len(self.rosters),
+            'unsaved_teams': sorted(self.dirty),
+            'unmatched_provider_teams': self.match_report['unmatched'],
+            'loose_provider_teams': self.match_report['candidates'],
+        }
+
+    def find_team(self, name):
+        """(league, team_idx, display name) for a unique name prefix or a close provider-style name"""
+        prefix = normalize_team(name)
+        starts = [team_name for team_name in self.index.by_team_name if normalize_team(team_name).startswith(prefix)]
+        if prefix and len(starts) == 1:
+            league_pos, team_idx = self.index.by_team_name[starts[0]][0]
+            return league_pos, team_idx, starts[0]
+        found = self.matcher.match(name)
+        if found.team is None:
+            detail = f" (could be {', '.join(found.candidates)})" if found.candidates else ""
+            raise LookupError(f"No single college team matches '{name}'{detail}")
+        league_pos, team_idx = self.index.by_team_name[found.team][0]
+        return league_pos, team_idx, found.team
+
+    def find_player(self, pid):
+        loc = self.index.find_pid(pid)
+        if loc is None:
+            raise LookupError(f"No college player with pid {pid}")
+        return {
+            'team': team_display_name(self.index.team(loc.league, loc.team)),
+            'slot': loc.slot,
+            'protected': self.index.is_protected(self.index.player(loc)),
+            'player': self.index.player(loc),
+        }
+
+    def team(self, name):
+        league_pos, team_idx, team_name = self.find_team(name)
+        team = self.index.team(league_pos, team_idx)
+        return {
+            'team': team_name,
+            'quality': rosters_cli.TEAM_QUALITY.get(team_name, "average"),
+            'has_real_roster': team_name in self.rosters,
+            'roster': [
+                {'pid': p.get('pid'), 'fn': p.get('fn'), 'ln': p.get('ln'), 'pos': p.get('pos'),
+                 'num': p.get('num'), 'rating': p.get('rating')}
+                for p in team.get('roster') or []
+            ],
+        }
+
+    def generator(self, league_pos, team_idx):
+        team = self.index.team(league_pos, team_idx)
+        return rosters_cli.RosterGenerator.for_team(
+            self.master_seed, rosters_cli.team_stream_key(league_pos, team_idx, team))
+
+    def update_team(self, name, generate=False, quality=None):
+        """Apply the real roster (or, with generate, a generated one) to one team"""
+        league_pos, team_idx, team_name = self.find_team(name)
+        team = self.index.team(league_pos, team_idx)
+        if not team.get('roster'):
+            raise ValueError(f"{team_name} has no roster")
+        real_roster = [] if generate else self.rosters.get(team_name, [])
+        quality = quality or rosters_cli.TEAM_QUALITY.get(team_name, "average")
+        if quality not in rosters_cli.QUALITY_MULTIPLIERS:
+            raise ValueError(f"Unknown quality '{quality}' (use {', '.join(rosters_cli.QUALITY_MULTIPLIERS)})")
+        skill_targets = []
+        updated, preserved, generated = rosters_cli.update_team(team, real_roster, quality, self.index,
+                                                                self.generator(league_pos, team_idx), verbose=False,
+                                                                skill_targets=skill_targets)
+        self.assign_skills(skill_targets)
+        self.dirty.add(team_name)
+        return {'team': team_name, 'updated': updated, 'preserved': preserved, 'generated': generated}
+
+    def update_all(self):
+        totals = {'teams': 0, 'updated': 0, 'preserved': 0, 'generated': 0}
+        skill_targets = []
+        for league_pos, team_idx, team in self.index.teams(1):
+            if not team.get('roster'):
+                continue
+            team_name = team_display_name(team)
+            updated, preserved, generated = rosters_cli.update_team(
+                team, self.rosters.get(team_name, []), rosters_cli.TEAM_QUALITY.get(team_name, "average"),
+                self.index, self.generator(league_pos, team_idx), verbose=False, skill_targets=skill_targets)
+            self.dirty.add(team_name)
+            totals['teams'] += 1
+            totals['updated'] += updated
+            totals['preserved'] += preserved
+            totals['generated'] += generated
+        totals['skills'] = self.assign_skills(skill_targets)
+        return totals
+
+    def assign_skills(self, players):
+        """Give generated players skills, ranked against every college player as in a full update"""
+        league = rosters_cli.SKILLS.reference_rows(
+            player for _, _, team in self.index.teams(1) for player in team.get('roster') or [])
+        return rosters_cli.SKILLS.assign(players, league)
+
+    def flush(self):
+        rosters_cli.write_save(self.save_file, self.data)
+        written = sorted(self.dirty)
+        self.dirty.clear()
+        return {'file': self.save_file, 'teams_written': written}
+
+
+class MissingParameter(Exception):
+    """A query or body parameter the endpoint needs was not sent"""
+
+
+class Params(dict):
+    """Query/body parameters; a missing one is the client's mistake, not a KeyError bug"""
+
+    def __missing__(self, key):
+        raise MissingParameter(key)
+
+
+class RosterRequestHandler(BaseHTTPRequestHandler):
+    """Routes GET/POST paths to the server's SaveSession; every reply is JSON
+
+    Only requests addressed to this host are served, and POSTs must be
+    application/json and carry the server's token in X-Roster-Token, so a
+    web page open in the browser can't change or discard the save.
+    """
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        body = json.loads(self.rfile.read(length))
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        return Params(body)
+
+    def _refusal(self):
+        """(status, message) if this request must not be served, else None"""
+        host = (self.headers.get('Host') or '').rsplit(':', 1)[0]
+        if host not in ('127.0.0.1', 'localhost'):
+            # A page on another domain resolved to 127.0.0.1 (DNS rebinding)
+            return 403, "Unexpected Host header"
+        if self.command != 'POST':
+            return None
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            return 415, "POST requests must be sent as Content-Type: application/json"
+        if not hmac.compare_digest(self.headers.get('X-Roster-Token') or '', self.server.token):
+            return 403, "Missing or wrong X-Roster-Token (printed when the server started)"
+        return None
+
+    def _handle(self, routes):
+        url = urlparse(self.path)
+        refusal = self._refusal()
+        if refusal is not None:
+            self._send(refusal[0], {'error': refusal[1]})
+            return
+        handler = routes.get(url.path)
+        if handler is None:
+            self._send(404, {'error': f"Unknown endpoint {url.path}"})
+            return
+        started = time.perf_counter()
+        try:
+            query = Params((key, values[-1]) for key, values in parse_qs(url.query).items())
+            result = handler(self.server.session, query, self._body() if self.command == 'POST' else Params())
+        except MissingParameter as e:
+            self._send(400, {'error': f"Missing parameter {e}"})
+            return
+        except KeyError as e:
+            # A bug, not a lookup that found nothing
+            traceback.print_exc()
+            self._send(500, {'error': f"Internal error: KeyError {e}"})
+            return
+        except LookupError as e:
+            self._send(404, {'error': str(e)})
+            return
+        except SchemaError as e:
+            self._send(422, {'error': f"Save failed validation at {e}; file not written"})
+            return
+        except (ValueError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+            return
+        except Exception as e:
+            traceback.print_exc()
+            self._send(500, {'error': f"Internal error: {type(e).__name__}: {e}"})
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"✅ {self.command} {url.path} ({elapsed:.1f} ms)")
+        self._send(200, {'ok': True, 'ms': round(elapsed, 3), **result})
+
+    def do_GET(self):
+        self._handle(GET_ROUTES)
+
+    def do_POST(self):
+        self._handle(POST_ROUTES)
+
+    def log_message(self, format, *args):
+        # Replaced by the one-line summary in _handle
+        pass
+
+
+def _shutdown(session, query, body):
+    if body.get('flush'):
+        result = session.flush()
+    elif session.dirty:
+        result = {'discarded_teams': sorted(session.dirty)}
+    else:
+        result = {}
+    RosterServer.running = False
+    return result
+
+
+GET_ROUTES = {
+    '/status': lambda session, query, body: session.status(),
+    '/player': lambda session, query, body: session.find_player(int(query['pid'])),
+    '/team': lambda session, query, body: session.team(query['name']),
+}
+
+POST_ROUTES = {
+    '/team/update': lambda session, query, body: session.update_team(body['team']),
+    '/team/generate': lambda session, query, body: session.update_team(body['team'], True, body.get('quality')),
+    '/teams/update-all': lambda session, query, body: session.update_all(),
+    '/flush': lambda session, query, body: session.flush(),
+    '/reload': lambda session, query, body: (session.load(), session.status())[1],
+    '/shutdown': _shutdown,
+}
+
+
+class RosterServer(HTTPServer):
+    """Single-threaded, so requests never see a half-applied update"""
+
+    running = True
+
+    def __init__(self, port, session, token=None):
+        super().__init__(('127.0.0.1', port), RosterRequestHandler)
+        self.session = session
+        # Required on every POST; a new one each run unless given
+        self.token = token or secrets.token_urlsafe(16)
+
+    def serve(self):
+        while RosterServer.running:
+            self.handle_request()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve roster operations on one loaded Hoop Land save")
+    parser.add_argument('save_file', help="Mobile save file (.json)")
+    parser.add_argument('--port', type=int, default=8765, help="Port on 127.0.0.1 (default: 8765)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for generated players")
+    parser.add_argument('--token', default=os.environ.get('ROSTER_SERVER_TOKEN'),
+                        help="Token POSTs must send in X-Roster-Token (default: $ROSTER_SERVER_TOKEN, "
+                             "or a random one printed at startup)")
+    args = parser.parse_args()
+
+    rosters_cli.report_roster_source()
+    started = time.perf_counter()
+    try:
+        session = SaveSession(args.save_file, rosters_cli.ROSTER_SOURCE, args.seed)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Loaded {args.save_file} in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    server = RosterServer(args.port, session, args.token)
+    print(f"🏀 Serving on http://127.0.0.1:{args.port} (POST /shutdown or Ctrl+C to stop)")
+    print(f"🔑 POSTs need -H 'Content-Type: application/json' -H 'X-Roster-Token: {server.token}'")
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        if session.dirty:
+            print(f"\n⚠️  {len(session.dirty)} updated teams were not flushed")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
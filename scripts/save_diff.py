@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Diff and patch Hoop Land mobile saves
+Hashes every seasonLeagues entry, team and roster entry Merkle-style so two
+saves are compared by descending only into subtrees whose hashes differ. The
+result is an RFC 6902 JSON Patch that can be applied to another copy.
+
+Hashes cover the raw bytes, so only subtrees written with different formatting
+(or actually changed) are parsed and compared.
+
+Usage:
+    python3 save_diff.py hashes save.json
+    python3 save_diff.py diff old.json new.json [-o patch.json]
+    python3 save_diff.py apply save.json patch.json [-o out.json]
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import sys
+
+from save_stream import StreamedSave, find_member, iter_elements, iter_members, skip_whitespace
+
+
+class Node:
+    """Hash of one subtree: own covers the bytes outside the children
+
+    children is None when the node has no child array to descend into.
+    """
+
+    def __init__(self, start, end, own, digest, children):
+        self.start = start
+        self.end = end
+        self.own = own
+        self.digest = digest
+        self.children = children
+
+
+def _child_spans(buf, start, member):
+    """Element spans of the array member of the object at start (None if absent)"""
+    if buf[start:start + 1] != b'{':
+        return None
+    span = find_member(buf, start, member)
+    if span is None or buf[span[0]:span[0] + 1] != b'[':
+        return None
+    return list(iter_elements(buf, span[0]))
+
+
+def hash_node(buf, start, end, levels):
+    """Merkle hash of buf[start:end]; levels names the child array at each depth
+
+    e.g. ('teams', 'roster') hashes a league from its teams, and each team
+    from its roster entries. Every byte is hashed exactly once.
+    """
+    spans = _child_spans(buf, start, levels[0]) if levels else None
+    if spans is None:
+        digest = hashlib.sha256(buf[start:end]).hexdigest()
+        return Node(start, end, digest, digest, None)
+
+    children = [hash_node(buf, child_start, child_end, levels[1:]) for child_start, child_end in spans]
+    own = hashlib.sha256()
+    pos = start
+    for child in children:
+        own.update(buf[pos:child.start])
+        pos = child.end
+    own.update(buf[pos:end])
+    own = own.hexdigest()
+
+    combined = hashlib.sha256(own.encode('ascii'))
+    for child in children:
+        combined.update(child.digest.encode('ascii'))
+    return Node(start, end, own, combined.hexdigest(), children)
+
+
+def save_hashes(save):
+    """Hash tree for every league -> team -> roster entry of a StreamedSave"""
+    if save.leagues is None:
+        raise ValueError(f"{save.path} is not a mobile save file")
+    return [hash_node(save.buf, span.start, span.end, ('teams', 'roster')) for span in save.leagues]
+
+
+def escape_pointer(token):
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def unescape_pointer(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def diff_values(path, old, new, ops):
+    """Append the ops that turn old into new (already parsed values)"""
+    if type(old) is type(new) and old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f"{path}/{escape_pointer(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{escape_pointer(key)}"
+            if key in old:
+                diff_values(child, old[key], value, ops)
+            else:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+    elif isinstance(old, list) and isinstance(new, list):
+        common = min(len(old), len(new))
+        for i in range(common):
+            diff_values(f"{path}/{i}", old[i], new[i], ops)
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({'op': 'remove', 'path': f"{path}/{i}"})
+        for i in range(common, len(new)):
+            ops.append({'op': 'add', 'path': f"{path}/{i}", 'value': new[i]})
+    else:
+        ops.append({'op': 'replace', 'path': path, 'value': new})
+
+
+def _diff_own(old_buf, old_node, new_buf, new_node, path, member, ops):
+    """Diff the members of two objects except the hashed child array"""
+    old_members = {key: (s, e) for key, s, e in iter_members(old_buf, old_node.start) if key != member}
+    new_members = {key: (s, e) for key, s, e in iter_members(new_buf, new_node.start) if key != member}
+    for key in old_members:
+        if key not in new_members:
+            ops.append({'op': 'remove', 'path': f"{path}/{escape_pointer(key)}"})
+    for key, (start, end) in new_members.items():
+        child = f"{path}/{escape_pointer(key)}"
+        if key not in old_members:
+            ops.append({'op': 'add', 'path': child, 'value': json.loads(new_buf[start:end])})
+            continue
+        old_start, old_end = old_members[key]
+        # Only parse members whose bytes actually differ
+        if old_buf[old_start:old_end] != new_buf[start:end]:
+            diff_values(child, json.loads(old_buf[old_start:old_end]), json.loads(new_buf[start:end]), ops)
+
+
+def diff_nodes(old_buf, old_node, new_buf, new_node, path, levels, ops):
+    """Descend into two hashed subtrees, only visiting children whose hashes differ"""
+    if old_node.digest == new_node.digest:
+        return
+    if old_node.children is None or new_node.children is None:
+        diff_values(path, json.loads(old_buf[old_node.start:old_node.end]),
+                    json.loads(new_buf[new_node.start:new_node.end]), ops)
+        return
+
+    member = levels[0]
+    if old_node.own != new_node.own:
+        _diff_own(old_buf, old_node, new_buf, new_node, path, member, ops)
+    diff_children(old_buf, old_node.children, new_buf, new_node.children,
+                  f"{path}/{member}", levels[1:], ops)
+
+
+def diff_children(old_buf, old_children, new_buf, new_children, path, levels, ops):
+    """Align two child lists by hash and emit ops; indices track earlier inserts/removes"""
+    matcher = difflib.SequenceMatcher(
+        None, [c.digest for c in old_children], [c.digest for c in new_children], autojunk=False
+    )
+    shift = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        paired = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
+        for k in range(paired):
+            diff_nodes(old_buf, old_children[i1 + k], new_buf, new_children[j1 + k],
+                       f"{path}/{i1 + k + shift}", levels, ops)
+        for k in range(i1 + paired, i2):
+            ops.append({'op': 'remove', 'path': f"{path}/{i1 + paired + shift}"})
+        shift -= (i2 - i1) - paired
+        for k in range(j1 + paired, j2):
+            child = new_children[k]
+            ops.append({'op': 'add', 'path': f"{path}/{k - j1 + i1 + shift}",
+                        'value': json.loads(new_buf[child.start:child.end])})
+        shift += (j2 - j1) - paired
+
+
+def _root_members(buf):
+    root = skip_whitespace(buf, 0)
+    return {key: (s, e) for key, s, e in iter_members(buf, root) if key != 'seasonLeagues'}
+
+
+def diff_saves(old_path, new_path):
+    """Return an RFC 6902 patch turning old_path's save into new_path's"""
+    with StreamedSave(old_path) as old, StreamedSave(new_path) as new:
+        old_tree = save_hashes(old)
+        new_tree = save_hashes(new)
+        ops = []
+
+        # Top-level members other than seasonLeagues are compared byte-wise
+        old_root = _root_members(old.buf)
+        new_root = _root_members(new.buf)
+        for key in old_root:
+            if key not in new_root:
+                ops.append({'op': 'remove', 'path': f"/{escape_pointer(key)}"})
+        for key, (start, end) in new_root.items():
+            if key not in old_root:
+                ops.append({'op': 'add', 'path': f"/{escape_pointer(key)}",
+                            'value': json.loads(new.buf[start:end])})
+            elif old.buf[old_root[key][0]:old_root[key][1]] != new.buf[start:end]:
+                diff_values(f"/{escape_pointer(key)}", json.loads(old.buf[old_root[key][0]:old_root[key][1]]),
+                            json.loads(new.buf[start:end]), ops)
+
+        diff_children(old.buf, old_tree, new.buf, new_tree, '/seasonLeagues', ('teams', 'roster'), ops)
+        return ops
+
+
+def _resolve(doc, tokens):
+    for token in tokens:
+        doc = doc[int(token)] if isinstance(doc, list) else doc[token]
+    return doc
+
+
+def apply_ops(doc, ops, prefix=()):
+    """Apply RFC 6902 add/remove/replace ops in place; prefix is stripped from each path"""
+    for op in ops:
+        tokens = [unescape_pointer(t) for t in op['path'].split('/')[1:]][len(prefix):]
+        if not tokens:
+            if op['op'] not in ('replace', 'add'):
+                raise ValueError(f"Cannot {op['op']} the document root")
+            doc = op['value']
+            continue
+        parent = _resolve(doc, tokens[:-1])
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = len(parent) if last == '-' else int(last)
+            if op['op'] == 'add':
+                parent.insert(index, op['value'])
+            elif op['op'] == 'remove':
+                del parent[index]
+            elif op['op'] == 'replace':
+                parent[index] = op['value']
+            else:
+                raise ValueError(f"Unsupported patch op: {op['op']}")
+        else:
+            if op['op'] in ('add', 'replace'):
+                if op['op'] == 'replace' and last not in parent:
+                    raise KeyError(f"Cannot replace missing path {op['path']}")
+                parent[last] = op['value']
+            elif op['op'] == 'remove':
+                del parent[last]
+            else:
+                raise ValueError(f"Unsupported patch op: {op['op']}")
+    return doc
+
+
+def _patch_scope(op):
+    """(league, team) the op is confined to; None entries mean a wider scope"""
+    tokens = op['path'].split('/')[1:]
+    if len(tokens) < 2 or tokens[0] != 'seasonLeagues' or not tokens[1].isdigit():
+        return None, None
+    league = int(tokens[1])
+    if len(tokens) == 2:
+        # Replacing a league keeps the other indices intact; add/remove does not
+        return (league, None) if op['op'] == 'replace' else (None, None)
+    if tokens[2] == 'teams' and len(tokens) > 4:
+        return league, int(tokens[3])
+    return league, None
+
+
+def apply_patch(save_path, ops, dest):
+    """Apply a patch to save_path and write the result to dest
+
+    Ops confined to one team (or league) are applied to just that subtree,
+    which is then spliced back into the original bytes; patches that change
+    the seasonLeagues array itself fall back to rewriting the whole file.
+    """
+    scopes = [_patch_scope(op) for op in ops]
+    save = StreamedSave(save_path)
+    if save.leagues is None or any(league is None for league, _ in scopes):
+        save.close()
+        with open(save_path, 'r', encoding='utf-8') as f:
+            doc = json.load(f)
+        doc = apply_ops(doc, ops)
+        with open(dest, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, ensure_ascii=False, indent=2)
+        return
+
+    # A league-level op may shift team indices, so its league is patched whole
+    whole_leagues = {league for league, team in scopes if team is None}
+    groups = {}
+    for op, (league, team) in zip(ops, scopes):
+        key = (league, None) if league in whole_leagues else (league, team)
+        groups.setdefault(key, []).append(op)
+
+    patches = []
+    for (league, team), group in groups.items():
+        span = save.leagues[league]
+        if team is None:
+            value = apply_ops(save.load_league(span), group, ('seasonLeagues', str(league)))
+            patches.append((span.start, span.end, value))
+        else:
+            team_span = save.team_spans(span)[team]
+            value = json.loads(save.buf[team_span.start:team_span.end])
+            value = apply_ops(value, group, ('seasonLeagues', str(league), 'teams', str(team)))
+            patches.append((team_span.start, team_span.end, value))
+    save.write_patches(dest, patches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff and patch Hoop Land mobile saves")
+    sub = parser.add_subparsers(dest='command', required=True)
+    hashes = sub.add_parser('hashes', help="Print the league/team hash tree of a save")
+    hashes.add_argument('save_file')
+    diff = sub.add_parser('diff', help="Write an RFC 6902 patch from old to new")
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('-o', '--output', help="Patch file (default: stdout)")
+    apply = sub.add_parser('apply', help="Apply a patch to a save")
+    apply.add_argument('save_file')
+    apply.add_argument('patch')
+    apply.add_argument('-o', '--output', help="Output file (default: update save_file in place)")
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'hashes':
+            with StreamedSave(args.save_file) as save:
+                for i, league in enumerate(save_hashes(save)):
+                    # children is None for a league without teams or a team without a roster
+                    print(f"seasonLeagues/{i}: {league.digest[:16]} ({len(league.children or ())} teams)")
+                    for j, team in enumerate(league.children or ()):
+                        print(f"  teams/{j}: {team.digest[:16]} ({len(team.children or ())} players)")
+        elif args.command == 'diff':
+            ops = diff_saves(args.old, args.new)
+            text = json.dumps(ops, ensure_ascii=False)
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                print(f"✅ Wrote {len(ops)} operations to {args.output}")
+            else:
+                print(text)
+        else:
+            with open(args.patch, 'r', encoding='utf-8') as f:
+                ops = json.load(f)
+            apply_patch(args.save_file, ops, args.output or args.save_file)
+            print(f"✅ Applied {len(ops)} operations")
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
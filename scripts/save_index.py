@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Player index for Hoop Land mobile saves
+Built in a single walk over seasonLeagues -> teams -> roster so lookups by pid,
+name or team never have to rescan the save
+"""
+
+from collections import namedtuple
+
+# Where a player lives: position in seasonLeagues, team index, roster slot
+Location = namedtuple('Location', ['league', 'team', 'slot'])
+
+
+def normalize_name(value):
+    """Lowercase and collapse whitespace so names compare reliably"""
+    return ' '.join(str(value or '').lower().split())
+
+
+def team_display_name(team):
+    """'City Name' as used by REAL_ROSTERS and TEAM_QUALITY"""
+    return f"{team.get('city', '')} {team.get('name', '')}".strip()
+
+
+def has_maxed_attributes(player):
+    """True if any attribute is at 20/20"""
+    for attr_value in (player.get('attributes') or {}).values():
+        if isinstance(attr_value, list) and len(attr_value) == 2:
+            if attr_value[0] == 20 and attr_value[1] == 20:
+                return True
+    return False
+
+
+class SaveIndex:
+    """Lookup tables over every roster slot of the indexed leagues
+
+    leagues is the seasonLeagues list; only leagues whose leagueType is in
+    league_types are indexed (all of them when league_types is None).
+    career_check is called once per player and marks players that must never
+    be overwritten; players with a 20/20 attribute are always protected.
+    """
+
+    def __init__(self, leagues, league_types=None, career_check=None):
+        self.leagues = leagues
+        self.career_check = career_check
+        self.by_pid = {}
+        self.by_name = {}
+        self.by_team_name = {}
+        self.by_league_type = {}
+        self.career = []
+        self._protected = set()
+
+        for league_pos, league in enumerate(leagues):
+            league_type = league.get('leagueType')
+            self.by_league_type.setdefault(league_type, []).append(league_pos)
+            if league_types is not None and league_type not in league_types:
+                continue
+            for team_idx, team in enumerate(league.get('teams') or []):
+                self.by_team_name.setdefault(team_display_name(team), []).append((league_pos, team_idx))
+                self._index_team(league_pos, team_idx)
+
+    def _index_team(self, league_pos, team_idx):
+        for slot, player in enumerate(self.team(league_pos, team_idx).get('roster') or []):
+            loc = Location(league_pos, team_idx, slot)
+            pid = player.get('pid')
+            if pid is not None:
+                self.by_pid.setdefault(pid, loc)
+            name = normalize_name(f"{player.get('fn', '')} {player.get('ln', '')}")
+            self.by_name.setdefault(name, []).append(loc)
+            if self.career_check and self.career_check(player):
+                self.career.append(loc)
+                self._protected.add(id(player))
+            elif has_maxed_attributes(player):
+                self._protected.add(id(player))
+
+    def _unindex_team(self, league_pos, team_idx):
+        def keep(loc):
+            return (loc.league, loc.team) != (league_pos, team_idx)
+
+        for player in self.team(league_pos, team_idx).get('roster') or []:
+            pid = player.get('pid')
+            if pid is not None and pid in self.by_pid and not keep(self.by_pid[pid]):
+                del self.by_pid[pid]
+            name = normalize_name(f"{player.get('fn', '')} {player.get('ln', '')}")
+            locs = [loc for loc in self.by_name.get(name, []) if keep(loc)]
+            if locs:
+                self.by_name[name] = locs
+            else:
+                self.by_name.pop(name, None)
+            self._protected.discard(id(player))
+        self.career = [loc for loc in self.career if keep(loc)]
+
+    def team(self, league_pos, team_idx):
+        return self.leagues[league_pos]['teams'][team_idx]
+
+    def player(self, loc):
+        return self.leagues[loc.league]['teams'][loc.team]['roster'][loc.slot]
+
+    def is_protected(self, player):
+        """True for the career player and anyone with maxed attributes"""
+        return id(player) in self._protected
+
+    def find_pid(self, pid):
+        return self.by_pid.get(pid)
+
+    def find_name(self, first, last):
+        return list(self.by_name.get(normalize_name(f"{first} {last}"), []))
+
+    def find_team(self, name, *fragments):
+        """Return (league, team) for the exact team name, else the first name containing a fragment"""
+        if self.by_team_name.get(name):
+            return self.by_team_name[name][0]
+        for team_name, locs in self.by_team_name.items():
+            if any(fragment in team_name for fragment in fragments):
+                return locs[0]
+        return None
+
+    def teams(self, league_type):
+        """Yield (league, team_idx, team) for every team in leagues of this type"""
+        for league_pos in self.by_league_type.get(league_type, []):
+            for team_idx, team in enumerate(self.leagues[league_pos].get('teams') or []):
+                yield league_pos, team_idx, team
+
+    def replace_roster(self, league_pos, team_idx, roster):
+        """Swap in a whole new roster list for a team (e.g. one updated in another process)"""
+        self._unindex_team(league_pos, team_idx)
+        self.team(league_pos, team_idx)['roster'] = roster
+        self._index_team(league_pos, team_idx)
+
+    def move_player(self, loc, dest, slot=0):
+        """Move the player at loc into roster slot of dest (league, team); returns the new Location"""
+        affected = {(loc.league, loc.team), tuple(dest)}
+        for team_loc in affected:
+            self._unindex_team(*team_loc)
+        player = self.team(loc.league, loc.team)['roster'].pop(loc.slot)
+        self.team(*dest)['roster'].insert(slot, player)
+        for team_loc in affected:
+            self._index_team(*team_loc)
+        return Location(dest[0], dest[1], slot)
+
+    def insert_player(self, dest, player, slot=0):
+        """Insert a new player into roster slot of dest (league, team); returns its Location"""
+        self._unindex_team(*dest)
+        self.team(*dest).setdefault('roster', []).insert(slot, player)
+        self._index_team(*dest)
+        return Location(dest[0], dest[1], slot)
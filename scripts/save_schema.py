@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Schema checks for Hoop Land saves
+The save layout from src/types/hoopland.ts, written as plain Python schema
+nodes and compiled once into nested check functions. validate_file() walks a
+written save with the C JSON decoder one team (or one small league field)
+at a time, so even large saves are checked without building the whole
+object tree. The first violation is raised as a SchemaError carrying
+its path, e.g. seasonLeagues[0].teams[12].roster[3].attributes.LAY.
+
+As in hoopland.ts, unknown fields are allowed everywhere. Optional fields
+may also be null. Player 'id' is not required because mobile saves use
+'pid'.
+"""
+
+import json
+import mmap
+import re
+
+from save_stream import skip_value, skip_whitespace, walk_elements, walk_members
+
+
+class SchemaError(ValueError):
+    """A value that does not match the schema; path is where it was found"""
+
+    def __init__(self, message, path=''):
+        super().__init__(message)
+        self.message = message
+        self.path = path
+
+    def within(self, step):
+        """Re-raise with step prepended to the path"""
+        if isinstance(step, int):
+            path = f"[{step}]{self.path}"
+        else:
+            path = f".{step}{self.path}" if self.path else f".{step}"
+        return SchemaError(self.message, path)
+
+    def __str__(self):
+        return f"{self.path.lstrip('.') or '<root>'}: {self.message}"
+
+
+# Schema nodes - plain tuples so the layout below reads like the TypeScript
+def Obj(fields, required=()):
+    return ('object', fields, tuple(required))
+
+
+def ArrayOf(item):
+    return ('array', item)
+
+
+def MapOf(value):
+    return ('map', value)
+
+
+def OneOf(*options):
+    return ('union', options)
+
+
+def Pair(item):
+    return ('pair', item)
+
+
+INT = ('int',)
+NUMBER = ('number',)
+STRING = ('string',)
+BOOL = ('bool',)
+ANY = ('any',)
+
+_TYPE_NAMES = {dict: 'object', list: 'array', str: 'string', bool: 'boolean', type(None): 'null'}
+
+
+_EXPECTED = {
+    'int': 'an integer', 'number': 'a number', 'string': 'a string', 'bool': 'a boolean',
+    'pair': 'a [current, max] pair', 'array': 'an array', 'map': 'an object', 'object': 'an object',
+}
+
+
+def _type_name(value):
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    return _TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+SKILL = Obj({'id': STRING, 'xp': NUMBER, 'level': NUMBER, 'equipped': BOOL})
+
+PLAYER = Obj({
+    'pid': INT,
+    'id': INT,
+    'fn': STRING,
+    'ln': STRING,
+    'tid': INT,
+    'pos': OneOf(INT, STRING),
+    'age': NUMBER,
+    'ht': OneOf(STRING, NUMBER),
+    'wt': OneOf(STRING, NUMBER),
+    'num': INT,
+    'rating': NUMBER,
+    'attributes': MapOf(Pair(NUMBER)),
+    'skills': ArrayOf(SKILL),
+    'stats': OneOf(Obj({}), ArrayOf(ANY)),
+})
+
+TEAM = Obj({
+    'id': INT,
+    'name': STRING,
+    'city': STRING,
+    'shortName': STRING,
+    'roster': ArrayOf(PLAYER),
+})
+
+LEAGUE = Obj({
+    'leagueName': STRING,
+    'shortName': STRING,
+    'leagueType': OneOf(INT, STRING),
+    'teams': ArrayOf(TEAM),
+    'player': PLAYER,
+    'conferences': ArrayOf(ANY),
+    'divisions': ArrayOf(ANY),
+    'draftClass': ArrayOf(ANY),
+    'freeAgents': ArrayOf(PLAYER),
+})
+
+# HooplandSave (Steam) is a single league; MobileHooplandSave wraps several
+STEAM_SAVE = LEAGUE
+MOBILE_SAVE = Obj({'seasonLeagues': ArrayOf(LEAGUE)}, required=('seasonLeagues',))
+
+
+def compile_schema(node):
+    """Turn a schema node into check(value), which raises SchemaError on a mismatch"""
+    kind = node[0]
+
+    if kind == 'any':
+        def check(value):
+            pass
+    elif kind == 'int':
+        def check(value):
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise SchemaError(f"expected an integer, got {_type_name(value)}")
+    elif kind == 'number':
+        def check(value):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise SchemaError(f"expected a number, got {_type_name(value)}")
+    elif kind == 'string':
+        def check(value):
+            if not isinstance(value, str):
+                raise SchemaError(f"expected a string, got {_type_name(value)}")
+    elif kind == 'bool':
+        def check(value):
+            if not isinstance(value, bool):
+                raise SchemaError(f"expected a boolean, got {_type_name(value)}")
+    elif kind == 'pair':
+        check_item = compile_schema(node[1])
+
+        def check(value):
+            if not isinstance(value, list) or len(value) != 2:
+                raise SchemaError(f"expected a [current, max] pair, got {json.dumps(value)[:40]}")
+            for pos, item in enumerate(value):
+                try:
+                    check_item(item)
+                except SchemaError as e:
+                    raise e.within(pos) from None
+    elif kind == 'array':
+        check_item = compile_schema(node[1])
+
+        def check(value):
+            if not isinstance(value, list):
+                raise SchemaError(f"expected an array, got {_type_name(value)}")
+            for pos, item in enumerate(value):
+                try:
+                    check_item(item)
+                except SchemaError as e:
+                    raise e.within(pos) from None
+        check.item = check_item
+    elif kind == 'map':
+        check_value = compile_schema(node[1])
+
+        def check(value):
+            if not isinstance(value, dict):
+                raise SchemaError(f"expected an object, got {_type_name(value)}")
+            for key, item in value.items():
+                try:
+                    check_value(item)
+                except SchemaError as e:
+                    raise e.within(key) from None
+    elif kind == 'union':
+        options = [compile_schema(option) for option in node[1]]
+
+        def check(value):
+            errors = []
+            for option in options:
+                try:
+                    option(value)
+                    return
+                except SchemaError as e:
+                    errors.append(e)
+            deepest = max(errors, key=lambda e: len(e.path))
+            if deepest.path:
+                # One option matched the outer type - its error is the useful one
+                raise deepest
+            raise SchemaError(f"expected {expected}, got {_type_name(value)}")
+        expected = ' or '.join(option.expected for option in options)
+    elif kind == 'object':
+        fields = {key: compile_schema(child) for key, child in node[1].items()}
+        required = node[2]
+
+        def check(value):
+            if not isinstance(value, dict):
+                raise SchemaError(f"expected an object, got {_type_name(value)}")
+            for key in required:
+                if key not in value:
+                    raise SchemaError(f"missing required field '{key}'")
+            for key, check_field in fields.items():
+                item = value.get(key)
+                if item is None:
+                    continue
+                try:
+                    check_field(item)
+                except SchemaError as e:
+                    raise e.within(key) from None
+        check.fields = fields
+    else:
+        raise ValueError(f"Unknown schema node {kind!r}")
+    check.expected = _EXPECTED.get(kind, 'a matching value')
+    return check
+
+
+check_mobile_save = compile_schema(MOBILE_SAVE)
+check_steam_save = compile_schema(STEAM_SAVE)
+check_league = check_mobile_save.fields['seasonLeagues'].item
+
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def _skip(text, pos):
+    return _WHITESPACE.match(text, pos).end()
+
+
+def decode_at(text, pos, path):
+    """Parse the single JSON value at pos; returns (value, end)"""
+    try:
+        return _DECODER.raw_decode(text, pos)
+    except ValueError as e:
+        raise SchemaError(f"invalid JSON ({e})", path) from None
+
+
+def _expect(text, pos, char, path):
+    pos = _skip(text, pos)
+    if text[pos:pos + 1] != char:
+        raise SchemaError(f"invalid JSON (expected '{char}' at char {pos})", path)
+    return pos + 1
+
+
+def walk_object(text, pos, path, on_member):
+    """Call on_member(key, value_start) -> value_end for each member of the object at pos"""
+    pos = _skip(text, _expect(text, pos, '{', path))
+    if text[pos:pos + 1] == '}':
+        return pos + 1
+    while True:
+        key, pos = decode_at(text, pos, path)
+        if not isinstance(key, str):
+            raise SchemaError(f"invalid JSON (expected a key at char {pos})", path)
+        pos = _skip(text, _expect(text, pos, ':', path))
+        pos = _skip(text, on_member(key, pos))
+        if text[pos:pos + 1] == '}':
+            return pos + 1
+        pos = _skip(text, _expect(text, pos, ',', path))
+
+
+def walk_array(text, pos, path, on_element):
+    """Call on_element(index, start) -> end for each element of the array at pos"""
+    pos = _skip(text, _expect(text, pos, '[', path))
+    if text[pos:pos + 1] == ']':
+        return pos + 1
+    index = 0
+    while True:
+        pos = _skip(text, on_element(index, pos))
+        if text[pos:pos + 1] == ']':
+            return pos + 1
+        pos = _skip(text, _expect(text, pos, ',', path))
+        index += 1
+
+
+def _check_at(check, text, pos, path):
+    """Parse the value at pos, check it and return its end"""
+    value, end = decode_at(text, pos, path)
+    try:
+        check(value)
+    except SchemaError as e:
+        raise SchemaError(e.message, path + e.path) from None
+    return end
+
+
+def _check_array_items(check_array, text, pos, path):
+    """Check an array one element at a time so only one element is ever parsed"""
+    if text[pos:pos + 1] != '[':
+        return _check_at(check_array, text, pos, path)
+    return walk_array(text, pos, path,
+                       lambda index, start: _check_at(check_array.item, text, start, f"{path}[{index}]"))
+
+
+def _check_league_at(text, pos, path):
+    if text[pos:pos + 1] != '{':
+        return _check_at(check_league, text, pos, path)
+
+    def on_member(key, start):
+        check_field = check_league.fields.get(key)
+        if check_field is None:
+            return decode_at(text, start, f"{path}.{key}")[1]
+        if hasattr(check_field, 'item') and text[start:start + 1] == '[':
+            return _check_array_items(check_field, text, start, f"{path}.{key}")
+        if text[start:start + 4] == 'null':
+            return start + 4
+        return _check_at(check_field, text, start, f"{path}.{key}")
+
+    return walk_object(text, pos, path, on_member)
+
+
+def _decode_range(buf, start, end, path):
+    """buf[start:end] as text for the str-based walkers"""
+    try:
+        return buf[start:end].decode('utf-8')
+    except UnicodeDecodeError as e:
+        raise SchemaError(f"invalid UTF-8 at byte {start + e.start}", path) from None
+
+
+def _check_range(buf, start, end, path, check=None):
+    """Check (or, without check, just parse) the single value in buf[start:end]"""
+    text = _decode_range(buf, start, end, path)
+    value_end = check(text, path) if check else decode_at(text, 0, path)[1]
+    if value_end != len(text):
+        raise SchemaError(f"invalid JSON (extra data at byte {start + value_end})", path)
+
+
+def _walk_leagues(buf, pos, leagues):
+    """Check the seasonLeagues array at pos one league at a time; returns its end
+
+    Leagues outside `leagues` are only stepped over by the byte scanner.
+    """
+
+    def walk(index, start):
+        end = skip_value(buf, start)
+        if index in leagues:
+            _check_range(buf, start, end, f".seasonLeagues[{index}]",
+                         lambda text, path: _check_league_at(text, 0, path))
+        return end
+
+    return walk_elements(buf, pos, walk)
+
+
+def _validate_mobile(buf, leagues):
+    root = skip_whitespace(buf, 0)
+    if buf[root:root + 1] != b'{':
+        raise SchemaError(f"invalid JSON (expected '{{' at byte {root})")
+
+    seen = set()
+
+    def walk(key, start):
+        seen.add(key)
+        if key == 'seasonLeagues' and buf[start:start + 1] == b'[':
+            return _walk_leagues(buf, start, leagues)
+        end = skip_value(buf, start)
+        if key == 'seasonLeagues':
+            _check_range(buf, start, end, '.seasonLeagues',
+                         lambda text, path: _check_at(check_mobile_save.fields['seasonLeagues'], text, 0, path))
+        else:
+            _check_range(buf, start, end, f".{key}")
+        return end
+
+    end = walk_members(buf, root, walk)
+    if 'seasonLeagues' not in seen:
+        raise SchemaError("missing required field 'seasonLeagues'")
+    if skip_whitespace(buf, end) != len(buf):
+        raise SchemaError(f"invalid JSON (extra data at byte {skip_whitespace(buf, end)})")
+
+
+def _validate_text(text, mobile):
+    """Full check of a whole save's text"""
+    if not mobile:
+        _check_at(check_steam_save, text, _skip(text, 0), '')
+        return
+
+    seen = set()
+
+    def on_member(key, start):
+        seen.add(key)
+        if key == 'seasonLeagues' and text[start:start + 1] == '[':
+            return walk_array(text, start, '.seasonLeagues',
+                              lambda index, start: _check_league_at(text, start, f".seasonLeagues[{index}]"))
+        if key == 'seasonLeagues':
+            return _check_at(check_mobile_save.fields['seasonLeagues'], text, start, '.seasonLeagues')
+        return decode_at(text, start, f".{key}")[1]
+
+    end = walk_object(text, _skip(text, 0), '', on_member)
+    if 'seasonLeagues' not in seen:
+        raise SchemaError("missing required field 'seasonLeagues'")
+    if _skip(text, end) != len(text):
+        raise SchemaError(f"invalid JSON (extra data at char {_skip(text, end)})")
+
+
+def validate_file(path, leagues=None, mobile=True):
+    """Check a written save; raises SchemaError at the first violation
+
+    Leagues are checked one team (or one small league field) at a time, so the
+    whole object tree is never built. A full check reads the text once, as
+    every byte gets decoded anyway. leagues limits the check to those
+    seasonLeagues indices: the save is then memory-mapped, only those leagues
+    are decoded and the others are stepped over by the save_stream byte
+    scanner (brackets and strings only), so memory stays at about the largest
+    checked league. mobile=False checks a Steam save, which is a single league.
+    """
+    if leagues is None or not mobile:
+        with open(path, 'r', encoding='utf-8') as f:
+            _validate_text(f.read(), mobile)
+        return
+
+    with open(path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap refuses empty files
+            buf = f.read()
+        try:
+            _validate_mobile(buf, leagues)
+        except ValueError as e:
+            if isinstance(e, SchemaError):
+                raise
+            # Structure errors from the byte scanner
+            raise SchemaError(f"invalid JSON ({e})") from None
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
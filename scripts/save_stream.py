@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Streaming access to Hoop Land mobile save files
+Finds every seasonLeagues entry (and each of its teams) by byte offset so only
+the leagues that are actually edited ever get turned into Python objects, and
+only the teams that changed get re-encoded on write
+"""
+
+import json
+import mmap
+import re
+from collections import namedtuple
+
+from atomic_file import atomic_write
+
+# Everything up to and including the next bracket outside a string; group 1 is
+# set when it opens a value. Strings are stepped over whole (escapes included)
+# so brackets inside player names never affect the depth count. The patterns
+# are "unrolled" (plain runs, then one special piece at a time) so the regex
+# engine moves through long runs in C instead of one alternation per byte.
+_TO_BRACKET = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*(?:([\[{])|[\]}])', re.S)
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SCALAR = re.compile(rb'[^\s,\]}]+')
+_WHITESPACE = re.compile(rb'\s*')
+
+# Unchanged byte ranges are copied in slices of this size to keep memory flat
+COPY_CHUNK_SIZE = 1 << 20
+
+# First slice decode_value tries; doubled until the value fits
+DECODE_WINDOW = 1 << 16
+
+_DECODER = json.JSONDecoder()
+
+LeagueSpan = namedtuple('LeagueSpan', ['index', 'start', 'end', 'league_type'])
+TeamSpan = namedtuple('TeamSpan', ['index', 'start', 'end'])
+
+
+def skip_whitespace(buf, pos):
+    """Return the position of the next non-whitespace byte"""
+    return _WHITESPACE.match(buf, pos).end()
+
+
+def skip_value(buf, pos):
+    """Return the end offset of the JSON value starting at pos (no objects are built)"""
+    first = buf[pos:pos + 1]
+    if first not in (b'{', b'['):
+        match = (_STRING if first == b'"' else _SCALAR).match(buf, pos)
+        if match is None:
+            raise ValueError(f"Expected a JSON value at byte {pos}")
+        return match.end()
+
+    # Anchored matches, one per bracket: a truncated value fails at once
+    # instead of finditer retrying the rest of the file from every byte
+    start = pos
+    depth = 0
+    match = _TO_BRACKET.match
+    while True:
+        token = match(buf, pos)
+        if token is None:
+            raise ValueError(f"Unterminated JSON value starting at byte {start}")
+        pos = token.end()
+        if token.lastindex:
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def iter_members(buf, pos, walk=None):
+    """Yield (key, value_start, value_end) for each member of the object at pos
+
+    walk(key, value_start) -> value_end, if given, steps over each value
+    instead of skip_value, e.g. to check a value while passing it.
+    """
+    if buf[pos:pos + 1] != b'{':
+        raise ValueError(f"Expected object at byte {pos}")
+    pos = skip_whitespace(buf, pos + 1)
+    if buf[pos:pos + 1] == b'}':
+        return
+    while True:
+        key_match = _STRING.match(buf, pos)
+        if not key_match:
+            raise ValueError(f"Expected object key at byte {pos}")
+        key = json.loads(key_match.group())
+        pos = skip_whitespace(buf, key_match.end())
+        if buf[pos:pos + 1] != b':':
+            raise ValueError(f"Expected ':' at byte {pos}")
+        value_start = skip_whitespace(buf, pos + 1)
+        value_end = skip_value(buf, value_start) if walk is None else walk(key, value_start)
+        yield key, value_start, value_end
+        pos = skip_whitespace(buf, value_end)
+        sep = buf[pos:pos + 1]
+        if sep == b'}':
+            return
+        if sep != b',':
+            raise ValueError(f"Expected ',' or '}}' at byte {pos}")
+        pos = skip_whitespace(buf, pos + 1)
+
+
+def iter_elements(buf, pos, walk=None):
+    """Yield (start, end) for each element of the array at pos
+
+    walk(index, start) -> end, if given, steps over each element instead of
+    skip_value.
+    """
+    if buf[pos:pos + 1] != b'[':
+        raise ValueError(f"Expected array at byte {pos}")
+    pos = skip_whitespace(buf, pos + 1)
+    if buf[pos:pos + 1] == b']':
+        return
+    index = 0
+    while True:
+        end = skip_value(buf, pos) if walk is None else walk(index, pos)
+        index += 1
+        yield pos, end
+        pos = skip_whitespace(buf, end)
+        sep = buf[pos:pos + 1]
+        if sep == b']':
+            return
+        if sep != b',':
+            raise ValueError(f"Expected ',' or ']' at byte {pos}")
+        pos = skip_whitespace(buf, pos + 1)
+
+
+def walk_members(buf, pos, walk):
+    """Step through the object at pos with walk(key, value_start) -> value_end; returns its end"""
+    end = pos + 1
+    for _, _, end in iter_members(buf, pos, walk):
+        pass
+    return skip_whitespace(buf, end) + 1
+
+
+def walk_elements(buf, pos, walk):
+    """Step through the array at pos with walk(index, start) -> end; returns its end"""
+    end = pos + 1
+    for _, end in iter_elements(buf, pos, walk):
+        pass
+    return skip_whitespace(buf, end) + 1
+
+
+def decode_value(buf, pos, window=DECODE_WINDOW):
+    """(value, end) for the JSON value at pos, decoded by the C decoder
+
+    Only a window of bytes is decoded, doubled until the value fits, so
+    memory stays at about the size of the value and nothing has to scan
+    ahead for its end first.
+    """
+    while True:
+        stop = min(len(buf), pos + window)
+        chunk = buf[pos:stop]
+        try:
+            text = chunk.decode('utf-8')
+        except UnicodeDecodeError as e:
+            # The window may end inside a multi-byte character
+            if stop == len(buf) or e.start < len(chunk) - 3:
+                raise ValueError(f"Invalid UTF-8 at byte {pos + e.start}") from None
+            text = chunk[:e.start].decode('utf-8')
+        try:
+            value, end = _DECODER.raw_decode(text)
+        except ValueError:
+            if stop == len(buf):
+                raise
+            window *= 2
+            continue
+        if end == len(text) and stop < len(buf):
+            # A number can stop at the window's edge and still parse
+            window *= 2
+            continue
+        if not chunk.isascii():
+            end = len(text[:end].encode('utf-8'))
+        return value, pos + end
+
+
+def find_member(buf, pos, name):
+    """Return (start, end) of member `name` in the object at pos, or None"""
+    for key, start, end in iter_members(buf, pos):
+        if key == name:
+            return start, end
+    return None
+
+
+def scan_leagues(buf):
+    """Return a LeagueSpan per seasonLeagues entry, or None if this is not a mobile save"""
+    root = skip_whitespace(buf, 0)
+    if buf[root:root + 1] != b'{':
+        return None
+    leagues_span = find_member(buf, root, 'seasonLeagues')
+    if leagues_span is None or buf[leagues_span[0]:leagues_span[0] + 1] != b'[':
+        return None
+
+    spans = []
+    for index, (start, end) in enumerate(iter_elements(buf, leagues_span[0])):
+        league_type = None
+        if buf[start:start + 1] == b'{':
+            type_span = find_member(buf, start, 'leagueType')
+            if type_span:
+                league_type = json.loads(buf[type_span[0]:type_span[1]])
+        spans.append(LeagueSpan(index, start, end, league_type))
+    return spans
+
+
+def scan_teams(buf, span):
+    """Return a TeamSpan per entry of the league's teams array (empty if it has none)"""
+    teams_span = find_member(buf, span.start, 'teams')
+    if teams_span is None or buf[teams_span[0]:teams_span[0] + 1] != b'[':
+        return []
+    return [
+        TeamSpan(index, start, end)
+        for index, (start, end) in enumerate(iter_elements(buf, teams_span[0]))
+    ]
+
+
+def encode_like(buf, start, end, value):
+    """Encode value with the indentation and separators of the bytes it replaces"""
+    newline = buf.find(b'\n', start, end)
+    if newline == -1:
+        # Single-line value - keep compact saves compact
+        spaced = buf.find(b'": ', start, min(end, start + 4096)) != -1
+        separators = (', ', ': ') if spaced else (',', ':')
+        return json.dumps(value, ensure_ascii=False, separators=separators)
+
+    line_start = buf.rfind(b'\n', 0, start) + 1
+    base = buf[line_start:skip_whitespace(buf, line_start)].decode('ascii')
+    inner = buf[newline + 1:skip_whitespace(buf, newline + 1)].decode('ascii')
+    indent = inner[len(base):] if inner.startswith(base) and len(inner) > len(base) else 2
+    text = json.dumps(value, ensure_ascii=False, indent=indent)
+    # JSON strings never contain raw newlines, so this only touches layout
+    return text.replace('\n', '\n' + base)
+
+
+class StreamedSave:
+    """Read-only memory-mapped view of a save with the league offsets indexed
+
+    index=False skips the league scan (leagues stays None) for callers that
+    walk buf themselves.
+    """
+
+    def __init__(self, path, index=True):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap refuses empty files - fall back to an in-memory buffer
+            self.buf = self._file.read()
+        self.leagues = scan_leagues(self.buf) if index else None
+        self._team_spans = {}
+
+    def copy_range(self, out, start, end):
+        """Copy buf[start:end] to out without holding the whole range in memory"""
+        while start < end:
+            stop = min(end, start + COPY_CHUNK_SIZE)
+            out.write(self.buf[start:stop])
+            start = stop
+
+    def load_league(self, span):
+        """Materialize a single league as Python objects"""
+        self.team_spans(span)
+        return json.loads(self.buf[span.start:span.end])
+
+    def team_spans(self, span):
+        """Byte offsets of each team in the league (scanned once, then cached)"""
+        if span.index not in self._team_spans:
+            self._team_spans[span.index] = scan_teams(self.buf, span)
+        return self._team_spans[span.index]
+
+    def write_leagues(self, dest, leagues, dirty_teams=None, validate=None):
+        """Write the save to dest with the given {index: league} entries spliced in
+
+        dirty_teams maps a league index to the team indices that changed. For
+        those leagues only the dirty teams are re-encoded; leagues without an
+        entry are re-encoded whole. validate is passed on to write_patches.
+        """
+        patches = []
+        for index, league in leagues.items():
+            span = self.leagues[index]
+            teams = league.get('teams')
+            team_spans = self.team_spans(span)
+            if (dirty_teams is not None and index in dirty_teams
+                    and isinstance(teams, list) and len(teams) == len(team_spans)):
+                for team_idx in sorted(dirty_teams[index]):
+                    team_span = team_spans[team_idx]
+                    patches.append((team_span.start, team_span.end, teams[team_idx]))
+            else:
+                patches.append((span.start, span.end, league))
+        self.write_patches(dest, patches, validate)
+
+    def write_patches(self, dest, patches, validate=None):
+        """Write the save to dest, replacing each (start, end, value) byte range
+
+        Every byte outside the patched ranges is copied over unchanged, so
+        write time scales with the size of the edit. The output goes to a
+        temporary file first so dest may be the source path. If given,
+        validate(tmp_path) runs before dest is replaced; when it raises, the
+        temporary file is removed and dest is left as it was.
+        """
+        with atomic_write(dest, validate=validate) as out:
+            pos = 0
+            for start, end, value in sorted(patches, key=lambda patch: patch[0]):
+                self.copy_range(out, pos, start)
+                out.write(encode_like(self.buf, start, end, value).encode('utf-8'))
+                pos = end
+            self.copy_range(out, pos, len(self.buf))
+            self.close()
+
+    def close(self):
+        if isinstance(self.buf, mmap.mmap) and not self.buf.closed:
+            self.buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
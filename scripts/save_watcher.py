@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Poll a SaveGames directory for saves the game has finished writing
+A save counts as changed once its size and mtime have stayed the same for a
+full poll interval (so half-written files are never picked up) and its
+contents hash differently from the last version we saw or wrote ourselves.
+Polling only stats the directory, so an idle watcher costs almost nothing.
+"""
+
+import glob
+import os
+import time
+
+from roster_store import file_digest
+
+
+class SaveWatcher:
+    """Tracks (size, mtime) and content hashes for every save matching pattern
+
+    pattern is a glob (a directory means every *.json in it); exclude is a
+    predicate for paths to ignore, such as our own sidecar files.
+    """
+
+    def __init__(self, pattern, interval=2.0, exclude=None):
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*.json')
+        self.pattern = pattern
+        self.interval = interval
+        self.exclude = exclude
+        # path -> (size, mtime_ns) seen on the previous poll
+        self._pending = {}
+        # path -> (size, mtime_ns, sha256) of the version last handled
+        self._known = {}
+        for path, stat in self._scan().items():
+            self._known[path] = stat + (file_digest(path),)
+
+    def _scan(self):
+        stats = {}
+        for path in glob.glob(self.pattern):
+            if self.exclude and self.exclude(path):
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if st.st_size:
+                stats[path] = (st.st_size, st.st_mtime_ns)
+        return stats
+
+    def poll(self):
+        """Return the saves that changed and have settled since the last poll"""
+        stats = self._scan()
+        changed = []
+        for path, stat in stats.items():
+            known = self._known.get(path)
+            if known and known[:2] == stat:
+                self._pending.pop(path, None)
+                continue
+            if self._pending.get(path) != stat:
+                # Still being written (or first sighting) - look again next poll
+                self._pending[path] = stat
+                continue
+            del self._pending[path]
+            digest = file_digest(path)
+            if known and known[2] == digest:
+                self._known[path] = stat + (digest,)
+                continue
+            self._known[path] = stat + (digest,)
+            changed.append(path)
+        for path in set(self._pending) - set(stats):
+            del self._pending[path]
+        return sorted(changed)
+
+    def mark_handled(self, path):
+        """Record the current version of path (e.g. after we rewrote it) so it isn't picked up again"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self._known.pop(path, None)
+            return
+        self._known[path] = (st.st_size, st.st_mtime_ns, file_digest(path))
+
+    def wait(self):
+        """Block until saves change; returns them as one batch
+
+        While any other save is still being written, keep polling so a game
+        that writes several files at once produces a single batch.
+        """
+        changed = []
+        while True:
+            time.sleep(self.interval)
+            changed.extend(self.poll())
+            if changed and not self._pending:
+                return sorted(set(changed))
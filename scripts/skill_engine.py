@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Skill assignment for generated players
+Each of the 24 skills in skill_ids.json is scored as a weighted average of
+the attributes it depends on. A player earns the best-scoring skills of each
+category (as in src/utils/skills.ts) that clear SKILL_THRESHOLD and rank in
+the top SKILL_SHARE of the league, at most MAX_PER_CATEGORY per category and
+MAX_SKILLS in all (the game's equipped-skill limit). A whole batch of players is scored in one
+matrix product and the choices are packed into one bitset per player (bit i
+= SKILL_IDS[i]). Player dicts are only touched at the end, when each bitset
+is expanded into the save's skill list.
+"""
+
+import json
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SKILL_IDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'skill_ids.json')
+
+with open(SKILL_IDS_PATH, 'r', encoding='utf-8') as _f:
+    # id -> the entry the game writes for a fresh skill ({id, xp, level, equipped})
+    SKILL_TEMPLATES = json.load(_f)
+
+SKILL_IDS = tuple(SKILL_TEMPLATES)
+SKILL_BITS = {skill_id: 1 << bit for bit, skill_id in enumerate(SKILL_IDS)}
+
+# Categories from SKILL_DEFINITIONS in src/utils/skills.ts
+SKILL_CATEGORIES = {
+    'finishing': ('DUN', 'FOO', 'HIG'),
+    'shooting': ('SPA', 'SPO', 'HOT', 'MAG', 'TWO'),
+    'creating': ('CLA', 'CRA', 'DIM', 'LOC', 'CLE', 'CLU', 'VOL'),
+    'defense': ('STE', 'SNA', 'SOF', 'BAL', 'BUL', 'CHE', 'LIM', 'TEA', 'UNF'),
+}
+
+# At most this many from one category, so a player with four earned skills
+# gets a mix (e.g. two shooting and two defense) instead of one specialty
+MAX_PER_CATEGORY = 2
+# The game (and SkillEditor.tsx) equips at most 4 skills per player
+MAX_SKILLS = 4
+
+# Attribute weights per skill. Like the names in skills.ts these are educated
+# guesses; every skill mixes in an attribute that generated players don't
+# all max out, so LAY/INS/MID alone never hand out a skill
+SKILL_AFFINITY = {
+    'DUN': {'DNK': 1.0},
+    'FOO': {'LAY': 0.5, 'DRB': 0.5},
+    'HIG': {'DNK': 0.6, 'ORE': 0.4},
+    'SPA': {'TPT': 0.5, 'DRB': 0.5},
+    'SPO': {'TPT': 1.0},
+    'HOT': {'TPT': 0.6, 'MID': 0.4},
+    'MAG': {'DRB': 0.5, 'PAS': 0.5},
+    'TWO': {'TPT': 0.5, 'STL': 0.5},
+    'CLA': {'MID': 0.5, 'FTS': 0.5},
+    'CRA': {'DRB': 0.6, 'LAY': 0.4},
+    'DIM': {'PAS': 1.0},
+    'LOC': {'STL': 0.6, 'DRB': 0.4},
+    'CLE': {'PAS': 0.6, 'DRB': 0.4},
+    'CLU': {'PAS': 0.7, 'FTS': 0.3},
+    'VOL': {'TPT': 0.5, 'MID': 0.5},
+    'STE': {'STL': 1.0},
+    'SNA': {'DRE': 0.6, 'ORE': 0.4},
+    'SOF': {'INS': 0.5, 'FTS': 0.5},
+    'BAL': {'DRE': 0.5, 'BLK': 0.5},
+    'BUL': {'INS': 0.5, 'ORE': 0.5},
+    'CHE': {'DRB': 0.5, 'MID': 0.5},
+    'LIM': {'TPT': 0.5, 'FTS': 0.5},
+    'TEA': {'PAS': 0.5, 'DRE': 0.5},
+    'UNF': {'FTS': 0.6, 'STL': 0.4},
+}
+
+# Weighted attribute average (0-20) needed to earn a skill
+SKILL_THRESHOLD = 15.0
+# Measured against a reference population of at least SHARE_MIN_BATCH players
+# (normally the whole league), a skill also has to be in the top SKILL_SHARE,
+# so attributes the generator often maxes out don't hand it to everyone
+SKILL_SHARE = 0.15
+SHARE_MIN_BATCH = 50
+# Every LEVEL_STEP above the threshold adds a level, up to MAX_LEVEL
+LEVEL_STEP = 2.0
+MAX_LEVEL = 3
+SCORE_DIGITS = 6
+
+
+def skill_bits(skills):
+    """Bitset for a list of skill ids or save skill entries"""
+    bits = 0
+    for skill in skills or []:
+        bits |= SKILL_BITS.get(skill.get('id') if isinstance(skill, dict) else skill, 0)
+    return bits
+
+
+def skill_ids(bits):
+    """Skill ids set in a bitset, in SKILL_IDS order"""
+    return [skill_id for skill_id in SKILL_IDS if bits & SKILL_BITS[skill_id]]
+
+
+def skill_level(score, threshold=SKILL_THRESHOLD):
+    return min(MAX_LEVEL, 1 + int((score - threshold) // LEVEL_STEP))
+
+
+def _ranks(scores, eligible):
+    """Rank of each eligible column in its row, best score first (stable for ties)"""
+    order = np.argsort(np.where(eligible, -scores, np.inf), axis=1, kind='stable')
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(scores.shape[1])[None, :].repeat(len(scores), axis=0), axis=1)
+    return ranks
+
+
+class SkillEngine:
+    """Scores and assigns skills for batches of players with the given attribute keys"""
+
+    def __init__(self, attribute_keys, threshold=SKILL_THRESHOLD):
+        self.attribute_keys = tuple(attribute_keys)
+        self.threshold = threshold
+        columns = {key: col for col, key in enumerate(self.attribute_keys)}
+        # (skill, attribute) weights; skills whose attributes are all missing score 0
+        self.weights = [[0.0] * len(self.attribute_keys) for _ in SKILL_IDS]
+        for row, skill_id in enumerate(SKILL_IDS):
+            for key, weight in SKILL_AFFINITY[skill_id].items():
+                if key in columns:
+                    self.weights[row][columns[key]] = weight
+        self.categories = [[SKILL_IDS.index(skill_id) for skill_id in members]
+                           for members in SKILL_CATEGORIES.values()]
+        if np is not None:
+            self._weights = np.array(self.weights, dtype=np.float64).T
+            self._bit_values = np.array([1 << bit for bit in range(len(SKILL_IDS))], dtype=np.uint32)
+
+    def attribute_rows(self, players):
+        """Current attribute values, one row per player (missing attributes count as 0)"""
+        rows = []
+        for player in players:
+            attributes = player.get('attributes') or {}
+            row = []
+            for key in self.attribute_keys:
+                value = attributes.get(key)
+                if isinstance(value, list) and value:
+                    value = value[0]
+                row.append(value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0)
+            rows.append(row)
+        return rows
+
+    def thresholds(self, reference=None):
+        """Score each skill needs, given the attribute rows of the population to compare against"""
+        if reference is None or len(reference) < SHARE_MIN_BATCH:
+            return [self.threshold] * len(SKILL_IDS)
+        cut = min(len(reference) - 1, int(len(reference) * (1 - SKILL_SHARE)))
+        if np is not None:
+            scores = self._scores(np.asarray(reference, dtype=np.float64))
+            return np.maximum(self.threshold, np.sort(scores, axis=0)[cut]).tolist()
+        return [max(self.threshold, sorted(column)[cut]) for column in zip(*self._score_rows(reference))]
+
+    def reference_rows(self, players, matrix=None):
+        """Attribute rows for a reference population, read from an AttributeMatrix holding them when there is one"""
+        players = list(players)
+        matrix_rows = [matrix.row(player) for player in players] if matrix is not None else [None]
+        if None in matrix_rows:
+            return self.attribute_rows(players)
+        cols = [matrix.col_of.get(key) for key in self.attribute_keys]
+        values = matrix.values[matrix_rows]
+        rows = np.zeros((len(players), len(cols)), dtype=np.float64)
+        for i, col in enumerate(cols):
+            if col is not None:
+                rows[:, i] = np.maximum(values[:, col, 0], 0)
+        return rows
+
+    def select(self, rows, thresholds=None):
+        """(bitsets, scores) for attribute rows; scores[i][s] is player i's score for SKILL_IDS[s]"""
+        if thresholds is None:
+            thresholds = self.thresholds()
+        if np is not None:
+            return self._select_array(np.asarray(rows, dtype=np.float64), np.asarray(thresholds))
+        scores = self._score_rows(rows)
+        bitsets = []
+        for player_scores in scores:
+            picked = []
+            for members in self.categories:
+                earned = [s for s in members if player_scores[s] >= thresholds[s]]
+                # Best first; ties keep category order
+                earned.sort(key=lambda s: -player_scores[s])
+                picked += earned[:MAX_PER_CATEGORY]
+            # Best MAX_SKILLS overall; ties keep SKILL_IDS order
+            picked.sort(key=lambda s: (-player_scores[s], s))
+            bits = 0
+            for s in picked[:MAX_SKILLS]:
+                bits |= 1 << s
+            bitsets.append(bits)
+        return bitsets, scores
+
+    def _score_rows(self, rows):
+        # Rounded so both paths compare identical values against the thresholds
+        return [[round(sum(w * v for w, v in zip(weights, row)), SCORE_DIGITS) for weights in self.weights]
+                for row in rows]
+
+    def _scores(self, attributes):
+        attributes = attributes.reshape(len(attributes), len(self.attribute_keys))
+        return np.round(attributes @ self._weights, SCORE_DIGITS)
+
+    def _select_array(self, attributes, thresholds):
+        scores = self._scores(attributes)
+        keep = np.zeros(scores.shape, dtype=bool)
+        for members in self.categories:
+            block = scores[:, members]
+            earned = block >= thresholds[members]
+            keep[:, members] = earned & (_ranks(block, earned) < MAX_PER_CATEGORY)
+        keep &= _ranks(scores, keep) < MAX_SKILLS
+        bitsets = (keep * self._bit_values).sum(axis=1, dtype=np.uint32)
+        return bitsets.tolist(), scores.tolist()
+
+    def assign(self, players, reference=None):
+        """Replace each player's skills with the ones their attributes earn; returns skills given
+
+        reference is the attribute rows the top-SKILL_SHARE cut is taken
+        from (see reference_rows); without one only SKILL_THRESHOLD applies.
+        """
+        players = list(players)
+        if not players:
+            return 0
+        thresholds = self.thresholds(reference)
+        bitsets, scores = self.select(self.attribute_rows(players), thresholds)
+        given = 0
+        for player, bits, player_scores in zip(players, bitsets, scores):
+            skills = []
+            for s, skill_id in enumerate(SKILL_IDS):
+                if bits >> s & 1:
+                    skill = dict(SKILL_TEMPLATES[skill_id])
+                    skill['level'] = skill_level(player_scores[s], thresholds[s])
+                    skills.append(skill)
+            player['skills'] = skills
+            given += len(skills)
+        return given
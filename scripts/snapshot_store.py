@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Deduplicated snapshots of Hoop Land saves
+A save is cut into chunks at every league and team boundary; each chunk is
+stored once under its sha256 and a snapshot is just a manifest listing the
+chunks in order. Leagues and teams that did not change between two
+snapshots are shared, so backing up an unchanged save costs nothing and a
+roster update only stores the teams it touched.
+
+Usage:
+    python3 snapshot_store.py take save.json
+    python3 snapshot_store.py list save.json
+    python3 snapshot_store.py restore save.json SNAPSHOT_ID [-o out.json]
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+import zlib
+
+from atomic_file import atomic_write
+from save_stream import StreamedSave
+
+MANIFEST_VERSION = 1
+STORE_DIR_NAME = '.hoopland_snapshots'
+
+
+def default_store_dir(save_file):
+    """Snapshots live next to the save they back up"""
+    return os.path.join(os.path.dirname(os.path.abspath(save_file)), STORE_DIR_NAME)
+
+
+def chunk_bounds(save):
+    """Sorted byte offsets where chunks start/end: file ends, leagues and teams"""
+    bounds = {0, len(save.buf)}
+    for span in save.leagues or []:
+        bounds.update((span.start, span.end))
+        for team in save.team_spans(span):
+            bounds.update((team.start, team.end))
+    return sorted(bounds)
+
+
+class SnapshotStore:
+    """Chunk objects under objects/ and one manifest directory per save name"""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.manifests_dir = os.path.join(root, 'manifests')
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _manifest_dir(self, save_file):
+        return os.path.join(self.manifests_dir, os.path.basename(save_file))
+
+    def put_chunk(self, data):
+        """Store a chunk unless it is already present; returns (digest, bytes written)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(data, 6)
+        # Another process may store the same object meanwhile; its copy is as good
+        with atomic_write(path, keep_existing=True) as f:
+            f.write(compressed)
+        return digest, len(compressed)
+
+    def get_chunk(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Snapshot chunk {digest} is corrupt")
+        return data
+
+    def snapshots(self, save_file):
+        """Manifests for this save, oldest first"""
+        manifest_dir = self._manifest_dir(save_file)
+        if not os.path.isdir(manifest_dir):
+            return []
+        manifests = []
+        for name in sorted(os.listdir(manifest_dir)):
+            if name.endswith('.json'):
+                with open(os.path.join(manifest_dir, name), 'r', encoding='utf-8') as f:
+                    manifests.append(json.load(f))
+        return manifests
+
+    def take(self, save_file):
+        """Snapshot save_file; returns (manifest, bytes written)
+
+        Nothing new is written when the save matches its latest snapshot.
+        """
+        file_hash = hashlib.sha256()
+        chunks = []
+        written = 0
+        with StreamedSave(save_file) as save:
+            bounds = chunk_bounds(save)
+            for start, end in zip(bounds, bounds[1:]):
+                data = save.buf[start:end]
+                file_hash.update(data)
+                digest, size = self.put_chunk(data)
+                written += size
+                chunks.append([digest, end - start])
+            total = len(save.buf)
+
+        sha256 = file_hash.hexdigest()
+        previous = self.snapshots(save_file)
+        if previous and previous[-1]['sha256'] == sha256:
+            return previous[-1], written
+
+        created = datetime.datetime.now(datetime.timezone.utc)
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'id': f"{created.strftime('%Y%m%dT%H%M%S%fZ')}-{sha256[:8]}",
+            'save': os.path.basename(save_file),
+            'created': created.isoformat(),
+            'size': total,
+            'sha256': sha256,
+            'chunks': chunks,
+        }
+        manifest_dir = self._manifest_dir(save_file)
+        os.makedirs(manifest_dir, exist_ok=True)
+        with atomic_write(os.path.join(manifest_dir, f"{manifest['id']}.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        return manifest, written
+
+    def find(self, save_file, snapshot_id):
+        """Manifest whose id starts with snapshot_id ('latest' for the newest)"""
+        manifests = self.snapshots(save_file)
+        if snapshot_id == 'latest' and manifests:
+            return manifests[-1]
+        matches = [m for m in manifests if m['id'].startswith(snapshot_id)]
+        if len(matches) != 1:
+            raise ValueError(f"{len(matches)} snapshots of {os.path.basename(save_file)} match '{snapshot_id}'")
+        return matches[0]
+
+    def restore(self, manifest, dest):
+        """Rebuild a snapshot byte-for-byte into dest, checking its size and sha256"""
+        file_hash = hashlib.sha256()
+        size = 0
+        with atomic_write(dest) as out:
+            for digest, length in manifest['chunks']:
+                data = self.get_chunk(digest)
+                if len(data) != length:
+                    raise ValueError(f"Snapshot chunk {digest} has the wrong length")
+                file_hash.update(data)
+                out.write(data)
+                size += length
+            if size != manifest['size'] or file_hash.hexdigest() != manifest['sha256']:
+                raise ValueError(f"Snapshot {manifest['id']} did not rebuild to the recorded save")
+
+
+def take_snapshot(save_file, store_dir=None):
+    """Snapshot save_file into its default store; prints a one-line summary"""
+    store = SnapshotStore(store_dir or default_store_dir(save_file))
+    manifest, written = store.take(save_file)
+    print(f"📦 Snapshot {manifest['id']} ({len(manifest['chunks'])} chunks, {written / 1024:.1f} KB new)")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicated snapshots of Hoop Land saves")
+    parser.add_argument('--store', help=f"Snapshot directory (default: {STORE_DIR_NAME} next to the save)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    take = sub.add_parser('take', help="Snapshot a save")
+    take.add_argument('save_file')
+    listing = sub.add_parser('list', help="List the snapshots of a save")
+    listing.add_argument('save_file')
+    restore = sub.add_parser('restore', help="Rebuild a snapshot")
+    restore.add_argument('save_file')
+    restore.add_argument('snapshot', help="Snapshot id (or a unique prefix, or 'latest')")
+    restore.add_argument('-o', '--output', help="Output file (default: overwrite save_file)")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.store or default_store_dir(args.save_file))
+    try:
+        if args.command == 'take':
+            take_snapshot(args.save_file, store.root)
+        elif args.command == 'list':
+            for manifest in store.snapshots(args.save_file):
+                print(f"{manifest['id']}  {manifest['created']}  {manifest['size'] / 1e6:.1f} MB")
+        else:
+            manifest = store.find(args.save_file, args.snapshot)
+            store.restore(manifest, args.output or args.save_file)
+            print(f"✅ Restored {manifest['id']} to {args.output or args.save_file}")
+    except (OSError, ValueError, KeyError, zlib.error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Match provider team names to the teams in a save
+Provider files spell schools their own way ("St John's", "UConn", "Miami (FL)
+Hurricanes"). TeamMatcher indexes the save's team names once - normalized
+full names, normalized school (city) names and character trigrams - and
+resolves each provider name through those tables instead of comparing it
+against every team.
+"""
+
+import re
+import unicodedata
+from collections import namedtuple
+
+# Provider spelling -> spelling used by the save, both normalized
+ALIASES = {
+    'uconn': 'connecticut',
+    'unc': 'north carolina',
+    'ole miss': 'mississippi',
+    'pitt': 'pittsburgh',
+    'umass': 'massachusetts',
+    'lsu': 'louisiana state',
+    'usc': 'southern california',
+    'ucf': 'central florida',
+    'smu': 'southern methodist',
+    'tcu': 'texas christian',
+    'byu': 'brigham young',
+    'vcu': 'virginia commonwealth',
+    'unlv': 'nevada las vegas',
+    'fiu': 'florida international',
+    'ualr': 'arkansas little rock',
+    'little rock': 'arkansas little rock',
+    'miami fl': 'miami',
+}
+
+# Minimum trigram similarity for a fuzzy match, and how far ahead of the
+# runner-up the best candidate must be
+FUZZY_THRESHOLD = 0.75
+FUZZY_MARGIN = 0.1
+FUZZY_CANDIDATES = 8
+
+# Each distinctive word of the team's school must appear in a fuzzy-matched
+# name at least this similar (so typos pass but "Kansas" never passes for "Weber")
+SCHOOL_WORD_THRESHOLD = 0.6
+
+# Words that say nothing about which school it is
+GENERIC_WORDS = {'state', 'university', 'college', 'of', 'the', 'at'}
+
+_DROPPED = re.compile(r"['’.]")
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+# status is 'exact', 'school', 'alias', 'fuzzy', 'candidate' (a loose
+# resemblance that is reported but never applied), 'ambiguous' or 'unmatched';
+# team is the save's team name (None unless matched), candidates the runners-up
+Match = namedtuple('Match', ['team', 'status', 'score', 'candidates'])
+
+# Lower is better when two provider names resolve to the same team
+STATUS_RANK = {'exact': 0, 'school': 1, 'alias': 2, 'fuzzy': 3}
+
+
+def normalize_team(name):
+    """Lowercase ASCII words: "St. John's" -> "st johns", "Texas A&M" -> "texas am\""""
+    text = unicodedata.normalize('NFKD', str(name or '')).encode('ascii', 'ignore').decode('ascii')
+    text = _DROPPED.sub('', text.lower()).replace('&', '')
+    words = _SEPARATORS.sub(' ', text).split()
+    return ' '.join('st' if word == 'saint' else word for word in words)
+
+
+def apply_aliases(normalized):
+    """Replace a known leading alias ("uconn huskies" -> "connecticut huskies")"""
+    words = normalized.split()
+    for size in (3, 2, 1):
+        head = ' '.join(words[:size])
+        if len(words) >= size and head in ALIASES:
+            return ' '.join([ALIASES[head]] + words[size:])
+    return normalized
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a_grams, b_grams):
+    """Dice coefficient of two trigram sets"""
+    return 2 * len(a_grams & b_grams) / (len(a_grams) + len(b_grams))
+
+
+def school_words(school):
+    """The words of a normalized school name that identify it ("kansas state" -> ["kansas"])"""
+    words = school.split()
+    return [word for word in words if word not in GENERIC_WORDS] or words
+
+
+class TeamMatcher:
+    """Resolves provider team names to save team names
+
+    teams is an iterable of (team name, school) pairs - the 'City Name'
+    display name and the team's 'city' field.
+    """
+
+    def __init__(self, teams):
+        self.by_name = {}
+        self.by_school = {}
+        self.by_gram = {}
+        self.grams = {}
+        self.schools = {}
+        for team_name, school in teams:
+            if team_name in self.grams:
+                continue
+            normalized = apply_aliases(normalize_team(team_name))
+            self.by_name.setdefault(normalized, []).append(team_name)
+            if school:
+                school = apply_aliases(normalize_team(school))
+                self.by_school.setdefault(school, []).append(team_name)
+            else:
+                # No city field: everything but the mascot's last word
+                school = ' '.join(normalized.split()[:-1])
+            self.schools[team_name] = [trigrams(word) for word in school_words(school)]
+            grams = trigrams(normalized)
+            self.grams[team_name] = grams
+            for gram in grams:
+                self.by_gram.setdefault(gram, []).append(team_name)
+
+    def match(self, provider_name):
+        """Return a Match for one provider team name"""
+        plain = normalize_team(provider_name)
+        aliased = apply_aliases(plain)
+        status = 'exact' if aliased == plain else 'alias'
+
+        school_status = 'school' if status == 'exact' else status
+        for table, found_status in ((self.by_name, status), (self.by_school, school_status)):
+            teams = table.get(aliased)
+            if teams and len(teams) == 1:
+                return Match(teams[0], found_status, 1.0, [])
+            if teams:
+                return Match(None, 'ambiguous', 1.0, sorted(teams))
+
+        return self._fuzzy(aliased)
+
+    def _same_school(self, words, team_name):
+        """True if every distinctive word of the team's school is (nearly) one of words"""
+        return all(any(similarity(school, word) >= SCHOOL_WORD_THRESHOLD for word in words)
+                   for school in self.schools[team_name])
+
+    def _fuzzy(self, normalized):
+        grams = trigrams(normalized)
+        shared = {}
+        for gram in grams:
+            for team_name in self.by_gram.get(gram, ()):
+                shared[team_name] = shared.get(team_name, 0) + 1
+        if not shared:
+            return Match(None, 'unmatched', 0.0, [])
+
+        top = sorted(shared.items(), key=lambda item: (-item[1], item[0]))[:FUZZY_CANDIDATES]
+        scored = sorted(
+            ((2 * count / (len(grams) + len(self.grams[team_name])), team_name) for team_name, count in top),
+            key=lambda item: (-item[0], item[1]),
+        )
+        # A shared mascot or "State" alone is not the same school
+        words = [trigrams(word) for word in normalized.split()]
+        same_school = [(score, team_name) for score, team_name in scored if self._same_school(words, team_name)]
+        if not same_school or same_school[0][0] < FUZZY_THRESHOLD:
+            return Match(None, 'candidate', scored[0][0], [team_name for _, team_name in scored[:3]])
+        best_score, best_team = same_school[0]
+        runners_up = [team_name for score, team_name in same_school[1:] if best_score - score < FUZZY_MARGIN]
+        if runners_up:
+            return Match(None, 'ambiguous', best_score, sorted([best_team] + runners_up))
+        return Match(best_team, 'fuzzy', best_score, [])
+
+    def resolve(self, provider_rosters):
+        """Map provider rosters onto save team names
+
+        Returns (rosters keyed by save team name, report) where report holds
+        'matched' {provider name: Match}, 'ambiguous' {provider name: [teams]},
+        'candidates' {provider name: [teams it only loosely resembles]} and
+        'unmatched' [provider names]. Only 'matched' rosters are used. When
+        several provider names land on one team, the most direct match wins.
+        """
+        resolved = {}
+        chosen = {}
+        report = {'matched': {}, 'ambiguous': {}, 'candidates': {}, 'unmatched': []}
+        for provider_name, roster in provider_rosters:
+            if not roster:
+                continue
+            found = self.match(provider_name)
+            if found.team is None:
+                if found.status == 'ambiguous':
+                    report['ambiguous'][provider_name] = found.candidates
+                elif found.status == 'candidate':
+                    report['candidates'][provider_name] = found.candidates
+                else:
+                    report['unmatched'].append(provider_name)
+                continue
+            report['matched'][provider_name] = found
+            rank = (STATUS_RANK[found.status], -found.score)
+            if found.team not in chosen or rank < chosen[found.team]:
+                chosen[found.team] = rank
+                resolved[found.team] = roster
+        return resolved, report
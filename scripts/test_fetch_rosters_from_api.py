@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+fetch_rosters_from_api.py against a local stub of both providers
+Checks that provider files are written, that a second run within the TTL
+makes no requests, and that after the TTL a 304 reuses the cached body.
+
+Usage:
+    python3 -m pytest test_fetch_rosters_from_api.py    # or python3 test_fetch_rosters_from_api.py
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fetch_rosters_from_api as fetcher
+
+TEAMS = ['Duke Blue Devils', 'Kansas Jayhawks']
+
+# Path -> JSON payload the stub serves
+PAYLOADS = {
+    '/sdio/teams': [
+        {'Key': 'DUKE', 'School': 'Duke', 'Name': 'Blue Devils'},
+        {'Key': 'KU', 'School': 'Kansas', 'Name': 'Jayhawks'},
+    ],
+    '/sdio/Players/DUKE': [
+        {'FirstName': 'Cooper', 'LastName': 'Flagg', 'Position': 'F', 'Jersey': 2, 'Height': 81,
+         'Weight': 205, 'Status': 'Active'},
+    ],
+    '/sdio/Players/KU': [
+        {'FirstName': 'Darryn', 'LastName': 'Peterson', 'Position': 'G', 'Jersey': 0, 'Height': 77,
+         'Weight': 195, 'Status': 'Active'},
+    ],
+    '/tsdb/searchplayers.php?t=Duke_Blue_Devils': {
+        'player': [{'strPlayer': 'Cooper Flagg', 'strSport': 'Basketball', 'strPosition': 'Forward',
+                    'strNumber': '2'}],
+    },
+    '/tsdb/searchplayers.php?t=Kansas_Jayhawks': {
+        'player': [{'strPlayer': 'Darryn Peterson', 'strSport': 'Basketball', 'strPosition': 'Guard',
+                    'strNumber': '0'}],
+    },
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOADS with an ETag and answers a matching If-None-Match with 304"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        payload = PAYLOADS.get(self.path)
+        if payload is None:
+            self._reply(404, b'{}')
+            return
+        body = json.dumps(payload).encode('utf-8')
+        etag = f'"{len(body)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.server.not_modified += 1
+            self._reply(304, b'', etag)
+        else:
+            self._reply(200, body, etag)
+
+    def _reply(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FetchRostersTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.requests = []
+        self.server.not_modified = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        self.tmp = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp, 'cache')
+        self.outputs = {'SportsDataIO': os.path.join(self.tmp, 'sportsdataio_rosters.json'),
+                        'TheSportsDB': os.path.join(self.tmp, 'thesportsdb_rosters.json')}
+        # The real providers, pointed at the stub as --base-url would, without their rate limits
+        self.apis = []
+        for api in fetcher.API_PROVIDERS:
+            prefix = '/sdio' if api.name == 'SportsDataIO' else '/tsdb'
+            self.apis.append(fetcher.ProviderAPI(
+                api.name, base + prefix, api.roster_path, api.parse, rate=100.0, headers=api.headers,
+                teams_path=api.teams_path, team_keys=api.team_keys))
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp)
+
+    def fetch(self, ttl):
+        return asyncio.run(fetcher.fetch_all(self.apis, TEAMS, self.cache_dir, ttl, self.outputs))
+
+    def read_output(self, name):
+        with open(self.outputs[name], 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_provider_files_are_written(self):
+        summary = self.fetch(ttl=3600)
+        self.assertEqual(summary['SportsDataIO']['teams'], 2)
+        self.assertEqual(summary['TheSportsDB']['teams'], 2)
+        sportsdataio = self.read_output('SportsDataIO')
+        self.assertEqual(sportsdataio['Duke Blue Devils'][0]['last_name'], 'Flagg')
+        self.assertEqual(sportsdataio['Duke Blue Devils'][0]['height'], '6\'9"')
+        self.assertEqual(self.read_output('TheSportsDB')['Kansas Jayhawks'][0]['jersey'], 0)
+        # Teams endpoint once, then one roster per team and provider
+        self.assertEqual(len(self.server.requests), 5)
+
+    def test_second_run_within_ttl_makes_no_requests(self):
+        self.fetch(ttl=3600)
+        first = {name: self.read_output(name) for name in self.outputs}
+        self.server.requests.clear()
+
+        summary = self.fetch(ttl=3600)
+        self.assertEqual(self.server.requests, [])
+        self.assertEqual(sum(stats['requests'] for stats in summary.values()), 0)
+        self.assertEqual(summary['SportsDataIO']['fresh'], 3)
+        self.assertEqual({name: self.read_output(name) for name in self.outputs}, first)
+
+    def test_expired_cache_revalidates_with_304(self):
+        self.fetch(ttl=3600)
+        first = {name: self.read_output(name) for name in self.outputs}
+        self.server.requests.clear()
+
+        summary = self.fetch(ttl=0)
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertEqual(self.server.not_modified, 5)
+        self.assertEqual(sum(stats['not_modified'] for stats in summary.values()), 5)
+        self.assertEqual(sum(stats['downloaded'] for stats in summary.values()), 0)
+        self.assertEqual({name: self.read_output(name) for name in self.outputs}, first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+save_diff.py diff/apply round trips
+A patch from diff_saves(old, new) applied to old must rebuild new byte for
+byte, whether it is spliced in per team, per league or applied to the whole
+document.
+
+Usage:
+    python3 -m pytest test_save_diff.py    # or python3 test_save_diff.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import save_diff
+import update_all_rosters as rosters_cli
+from test_update_all_rosters import ROSTERS, write_test_save
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class SaveDiffTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.old = os.path.join(self.tmp, 'old.json')
+        self.new = os.path.join(self.tmp, 'new.json')
+        write_test_save(self.old)
+        shutil.copyfile(self.old, self.new)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def edit_new(self, change):
+        with open(self.new, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        change(data)
+        with open(self.new, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def round_trip(self):
+        """Diff old -> new, apply the patch to old and return the result's bytes"""
+        ops = save_diff.diff_saves(self.old, self.new)
+        self.assertTrue(ops)
+        out = os.path.join(self.tmp, 'applied.json')
+        save_diff.apply_patch(self.old, ops, out)
+        return read_bytes(out)
+
+    def test_roster_update_round_trips_exactly(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            rosters_cli.update_save(self.new, seed='test-seed', rosters=ROSTERS, quiet=True)
+        self.assertEqual(self.round_trip(), read_bytes(self.new))
+
+    def test_league_level_change_round_trips_exactly(self):
+        def change(data):
+            college = data['seasonLeagues'][1]
+            del college['teams'][1]
+            college['shortName'] = 'NCAA'
+        self.edit_new(change)
+        self.assertEqual(self.round_trip(), read_bytes(self.new))
+
+    def test_top_level_change_round_trips_exactly(self):
+        def change(data):
+            data['settings'] = {'difficulty': 'Hall of Fame'}
+            data['seasonLeagues'][0]['teams'][0]['roster'][0]['fn'] = 'Zé'
+        self.edit_new(change)
+        self.assertEqual(self.round_trip(), read_bytes(self.new))
+
+
+if __name__ == '__main__':
+    unittest.main()
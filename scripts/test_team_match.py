@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+TeamMatcher fuzzy matching: typos still match, other schools never do
+
+Usage:
+    python3 -m pytest test_team_match.py
+"""
+
+import unittest
+
+from team_match import TeamMatcher
+
+TEAMS = [
+    ('Weber State Wildcats', 'Weber State'),
+    ('Kentucky Wildcats', 'Kentucky'),
+    ('Kansas Jayhawks', 'Kansas'),
+    ('Connecticut Huskies', 'Connecticut'),
+    ('Michigan State Spartans', 'Michigan State'),
+]
+
+
+class TeamMatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.matcher = TeamMatcher(TEAMS)
+
+    def test_shared_mascot_and_state_are_not_the_same_school(self):
+        found = self.matcher.match('Kansas State Wildcats')
+        self.assertIsNone(found.team)
+        self.assertEqual(found.status, 'candidate')
+        self.assertIn('Weber State Wildcats', found.candidates)
+
+    def test_loose_match_is_reported_not_applied(self):
+        rosters, report = self.matcher.resolve([('Kansas State Wildcats', [{'first_name': 'A'}])])
+        self.assertEqual(rosters, {})
+        self.assertIn('Kansas State Wildcats', report['candidates'])
+        self.assertEqual(report['matched'], {})
+
+    def test_typos_still_match(self):
+        self.assertEqual(self.matcher.match('Conneticut Huskies').team, 'Connecticut Huskies')
+        self.assertEqual(self.matcher.match('Weber St Wildcats').team, 'Weber State Wildcats')
+        self.assertEqual(self.matcher.match('Michigan St Spartans').status, 'fuzzy')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+update_save on a small generated save
+Checks that a full, a --jobs and a --stream run of the same seed write
+byte-identical saves, and that a second --incremental run skips every team
+without touching the file.
+
+Usage:
+    python3 -m pytest test_update_all_rosters.py    # or python3 test_update_all_rosters.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import update_all_rosters as rosters_cli
+
+SEED = 'test-seed'
+
+# College teams in the test save; the first two have real rosters
+COLLEGE_TEAMS = ['Duke Blue Devils', 'North Carolina Tar Heels', 'Kentucky Wildcats', 'Weber State Wildcats']
+ROSTERS = {name: rosters_cli.REAL_ROSTERS[name][:3] for name in COLLEGE_TEAMS[:2]}
+
+
+def write_test_save(path, roster_size=8):
+    """A small mobile save: one pro and one college league, with the career player at Duke"""
+    rng = random.Random(0)
+    next_pid = iter(range(1000, 100000))
+
+    def player(maxed=False):
+        return {
+            'pid': next(next_pid), 'fn': rng.choice(['Al', 'Bo', 'Cy']), 'ln': rng.choice(['Ng', 'Ox', 'Py']),
+            'pos': rng.randint(0, 4), 'num': rng.randint(0, 40), 'ht': "6'5\"", 'wt': '200', 'age': 20,
+            'rating': 70, 'skills': [], 'stats': {'ppg': 1.0},
+            'attributes': {key: [20 if maxed else rng.randint(1, 19), 20] for key in rosters_cli.ATTRIBUTE_KEYS},
+        }
+
+    def team(i, city, name):
+        return {'id': i, 'city': city, 'name': name, 'shortName': name[:3].upper(),
+                'roster': [player() for _ in range(roster_size)]}
+
+    college = [team(i, *name.split(' ', 1)) for i, name in enumerate(COLLEGE_TEAMS)]
+    career = player(maxed=True)
+    career.update(pid=rosters_cli.CAREER_PID, fn='Isaac', ln='Condrey')
+    college[0]['roster'][3] = career
+    data = {
+        'seasonLeagues': [
+            {'leagueName': 'Pro', 'shortName': 'PRO', 'leagueType': 0,
+             'teams': [team(i, f"City{i}", 'Pros') for i in range(2)], 'draftClass': [], 'freeAgents': []},
+            {'leagueName': 'College', 'shortName': 'COL', 'leagueType': 1,
+             'teams': college, 'draftClass': [player() for _ in range(3)], 'freeAgents': []},
+        ],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class UpdateSaveTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmp, 'source.json')
+        write_test_save(self.source)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def update(self, name, **options):
+        """Copy the test save to name, update it and return (path, summary)"""
+        path = os.path.join(self.tmp, name)
+        shutil.copyfile(self.source, path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = rosters_cli.update_save(path, seed=SEED, rosters=ROSTERS, quiet=True, **options)
+        return path, summary
+
+    def test_full_jobs_and_stream_runs_write_identical_saves(self):
+        full, summary = self.update('full.json')
+        self.assertEqual(summary['teams'], len(COLLEGE_TEAMS))
+        self.assertEqual(summary['preserved'], 1)
+        self.assertNotEqual(read_bytes(full), read_bytes(self.source))
+
+        jobs, _ = self.update('jobs.json', jobs=2)
+        stream, _ = self.update('stream.json', stream=True)
+        self.assertEqual(read_bytes(jobs), read_bytes(full))
+        self.assertEqual(read_bytes(stream), read_bytes(full))
+
+    def test_second_incremental_run_skips_every_team(self):
+        path, first = self.update('incremental.json', incremental=True)
+        self.assertEqual(first['teams'], len(COLLEGE_TEAMS))
+        written = read_bytes(path)
+        mtime = os.stat(path).st_mtime_ns
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            second = rosters_cli.update_save(path, seed=SEED, rosters=ROSTERS, quiet=True, incremental=True)
+        self.assertEqual(second['skipped'], len(COLLEGE_TEAMS))
+        self.assertEqual(second['teams'], 0)
+        self.assertEqual(read_bytes(path), written)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+
+
+if __name__ == '__main__':
+    unittest.main()
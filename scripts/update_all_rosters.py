@@ -4,9 +4,63 @@ Update All College Basketball Rosters with 2025-26 Data
 This script updates all 64 college teams with real or realistic rosters
 """
 
+import argparse
+import contextlib
+import glob
+import hashlib
+import io
 import json
+import os
 import random
+import secrets
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # Only the batch helpers need NumPy
+    np = None
+
+from atomic_file import atomic_write
+from attribute_matrix import AttributeMatrix
+from field_map import Attributes, Copy, Stats, compile_field_map
+from roster_merge import MANUAL_SOURCE, iter_provider_teams
+from roster_solver import fit_ratings, plan_roster
+from roster_store import Provider, RosterStore, load_exclusions
+from run_profile import PROFILE_MODES, Progress, RunProfile
+from save_index import SaveIndex, has_maxed_attributes, team_display_name
+from save_schema import SchemaError, validate_file
+from save_stream import StreamedSave
+from snapshot_store import take_snapshot
+from team_match import TeamMatcher
+from save_watcher import SaveWatcher
+from skill_engine import SkillEngine
+from update_cache import CACHE_SUFFIX, TeamCache, cache_path_for, inputs_digest
+
+# The user's career player - never overwritten by roster updates
+CAREER_PID = 706
+
+# Seconds between progress lines in --quiet mode
+PROGRESS_INTERVAL = 2.0
+
+# Attribute order of calculate_attributes_batch rows
+ATTRIBUTE_KEYS = ('LAY', 'DNK', 'INS', 'MID', 'TPT', 'FTS', 'DRB', 'PAS', 'ORE', 'DRE', 'STL', 'BLK')
+
+# Picks generated players' skills from their attributes, a whole batch at a time
+SKILLS = SkillEngine(ATTRIBUTE_KEYS)
+
+# Stat columns read by the attribute calculation, with the defaults used when missing
+STAT_DEFAULTS = {
+    'ppg': 10,
+    'rpg': 5,
+    'apg': 3,
+    'fg_pct': 0.45,
+    'three_pct': 0.35,
+    'ft_pct': 0.75,
+    'spg': 1,
+    'bpg': 0.5,
+}
 
 def calculate_attributes_from_stats(ppg, rpg, apg, fg_pct, three_pct, ft_pct, spg, bpg):
     """Calculate Hoopland attributes (0-20 scale) from real stats"""
@@ -39,93 +93,133 @@ def calculate_attributes_from_stats(ppg, rpg, apg, fg_pct, three_pct, ft_pct, sp
         'BLK': [block, block]
     }
 
-def generate_realistic_player(position, jersey, team_quality="average"):
+def stats_to_columns(stats_list):
+    """Turn a list of real_data['stats'] dicts into float64 columns for calculate_attributes_batch"""
+    if np is None:
+        raise ImportError("NumPy is required for batch attribute calculation (pip install numpy)")
+    return {
+        key: np.array([(stats or {}).get(key, default) for stats in stats_list], dtype=np.float64)
+        for key, default in STAT_DEFAULTS.items()
+    }
+
+def calculate_attributes_batch(stats):
+    """Vectorized calculate_attributes_from_stats for a whole league
+
+    stats is a mapping of column name -> array (see stats_to_columns) or a
+    NumPy structured array with the STAT_DEFAULTS field names. Returns an
+    (n_players, 12, 2) int array in ATTRIBUTE_KEYS order whose values match
+    the scalar function exactly.
+    """
+    if np is None:
+        raise ImportError("NumPy is required for batch attribute calculation (pip install numpy)")
+    ppg, rpg, apg, fg_pct, three_pct, ft_pct, spg, bpg = (
+        np.asarray(stats[key], dtype=np.float64) for key in STAT_DEFAULTS
+    )
+
+    def clamp(values):
+        # Same as min(20, max(0, int(values))) - int() truncates toward zero
+        return np.clip(np.trunc(values), 0, 20)
+
+    layup = clamp(ppg * 0.6 + fg_pct * 30)
+    columns = (
+        layup,
+        clamp(rpg * 0.5 + layup * 0.3),
+        clamp(fg_pct * 35 + rpg * 0.8),
+        clamp(fg_pct * 30 + ppg * 0.5),
+        clamp(three_pct * 40 + ppg * 0.3),
+        clamp(ft_pct * 20),
+        clamp(apg * 1.2 + ppg * 0.3),
+        clamp(apg * 1.0),
+        clamp(rpg * 0.6),
+        clamp(rpg * 0.8),
+        clamp(spg * 10),
+        clamp(bpg * 10),
+    )
+    values = np.stack(columns, axis=1).astype(np.int64)
+    # current == max for calculated attributes
+    return np.repeat(values[:, :, np.newaxis], 2, axis=2)
+
+def attributes_from_row(row):
+    """Convert one (12, 2) calculate_attributes_batch row back to the save's dict format"""
+    return dict(zip(ATTRIBUTE_KEYS, row.tolist()))
+
+# Name pools and per-position tables shared by every generated player
+FIRST_NAMES = ["James", "Michael", "Chris", "Derrick", "Kyrie", "Trae", "Ja", "De'Aaron", "Tyrese", "Devin",
+               "Bradley", "Zach", "CJ", "Jordan", "Jaylen", "DeMar", "Terry", "LeBron", "Kevin", "Paul",
+               "Kawhi", "Jimmy", "Jayson", "Brandon", "Mikal", "OG", "Harrison", "Anthony", "Pascal", "Julius",
+               "Zion", "Evan", "Jaren", "Lauri", "Kristaps", "Alperen", "Bam", "Joel", "Nikola", "Rudy",
+               "Myles", "Jarrett", "Clint", "Jakob", "Steven", "Brook", "Marcus", "DeAndre", "Kyle", "Tyler"]
+
+LAST_NAMES = ["Johnson", "Williams", "Brown", "Jones", "Davis", "Miller", "Wilson", "Moore", "Taylor", "Anderson",
+              "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson", "Garcia", "Martinez", "Robinson", "Clark",
+              "Lewis", "Walker", "Hall", "Allen", "Young", "King", "Wright", "Lopez", "Hill", "Scott",
+              "Green", "Adams", "Baker", "Nelson", "Carter", "Mitchell", "Perez", "Roberts", "Turner", "Phillips"]
+
+QUALITY_MULTIPLIERS = {"elite": 1.15, "good": 1.05, "average": 1.0, "poor": 0.95}
+# (best, worst) rating on a generated team of each tier; roster_solver spreads
+# the roster evenly between them around any real players
+QUALITY_RATINGS = {"elite": (90, 76), "good": (86, 72), "average": (82, 68), "poor": (78, 64)}
+
+# (low, high) uniform ranges per position; ppg/apg/rpg are scaled by quality and variation
+POSITION_STAT_RANGES = {
+    0: {"ppg": (8, 16), "apg": (4, 8), "rpg": (2, 5), "fg_pct": (0.40, 0.48), "three_pct": (0.32, 0.42)},  # PG
+    1: {"ppg": (10, 18), "apg": (2, 5), "rpg": (3, 6), "fg_pct": (0.42, 0.50), "three_pct": (0.35, 0.45)},  # SG
+    2: {"ppg": (12, 20), "apg": (2, 4), "rpg": (4, 8), "fg_pct": (0.44, 0.52), "three_pct": (0.33, 0.40)},  # SF
+    3: {"ppg": (10, 16), "apg": (1, 3), "rpg": (6, 10), "fg_pct": (0.46, 0.54), "three_pct": (0.28, 0.38)},  # PF
+    4: {"ppg": (8, 14), "apg": (1, 2), "rpg": (7, 12), "fg_pct": (0.50, 0.58), "three_pct": (0.20, 0.35)},  # C
+}
+
+# Height/weight based on position
+HEIGHTS = {
+    0: ["6'0\"", "6'1\"", "6'2\"", "6'3\""],
+    1: ["6'3\"", "6'4\"", "6'5\"", "6'6\""],
+    2: ["6'6\"", "6'7\"", "6'8\"", "6'9\""],
+    3: ["6'8\"", "6'9\"", "6'10\"", "6'11\""],
+    4: ["6'10\"", "6'11\"", "7'0\"", "7'1\"", "7'2\""]
+}
+WEIGHTS = {
+    0: ["170", "175", "180", "185", "190"],
+    1: ["185", "190", "195", "200"],
+    2: ["200", "210", "220", "230"],
+    3: ["220", "230", "240", "250"],
+    4: ["240", "250", "260", "270", "280"]
+}
+
+def generate_realistic_player(position, jersey, team_quality="average", rng=random):
     """Generate a realistic player based on position and team quality"""
-    # More diverse name pool
-    first_names = ["James", "Michael", "Chris", "Derrick", "Kyrie", "Trae", "Ja", "De'Aaron", "Tyrese", "Devin",
-                   "Bradley", "Zach", "CJ", "Jordan", "Jaylen", "DeMar", "Terry", "LeBron", "Kevin", "Paul",
-                   "Kawhi", "Jimmy", "Jayson", "Brandon", "Mikal", "OG", "Harrison", "Anthony", "Pascal", "Julius",
-                   "Zion", "Evan", "Jaren", "Lauri", "Kristaps", "Alperen", "Bam", "Joel", "Nikola", "Rudy",
-                   "Myles", "Jarrett", "Clint", "Jakob", "Steven", "Brook", "Marcus", "DeAndre", "Kyle", "Tyler"]
-    
-    last_names = ["Johnson", "Williams", "Brown", "Jones", "Davis", "Miller", "Wilson", "Moore", "Taylor", "Anderson",
-                  "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson", "Garcia", "Martinez", "Robinson", "Clark",
-                  "Lewis", "Walker", "Hall", "Allen", "Young", "King", "Wright", "Lopez", "Hill", "Scott",
-                  "Green", "Adams", "Baker", "Nelson", "Carter", "Mitchell", "Perez", "Roberts", "Turner", "Phillips"]
-    
-    first_name = random.choice(first_names)
-    last_name = random.choice(last_names)
+    first_name = rng.choice(FIRST_NAMES)
+    last_name = rng.choice(LAST_NAMES)
     
     # Generate stats based on position and team quality with more variation
-    quality_mult = {"elite": 1.15, "good": 1.05, "average": 1.0, "poor": 0.95}[team_quality]
+    quality_mult = QUALITY_MULTIPLIERS[team_quality]
     
     # Add variation - not all players are the same
-    variation = random.uniform(0.85, 1.15)
-    
-    if position == 0:  # PG
-        ppg = random.uniform(8, 16) * quality_mult * variation
-        apg = random.uniform(4, 8) * quality_mult * variation
-        rpg = random.uniform(2, 5) * quality_mult * variation
-        fg_pct = random.uniform(0.40, 0.48)
-        three_pct = random.uniform(0.32, 0.42)
-    elif position == 1:  # SG
-        ppg = random.uniform(10, 18) * quality_mult * variation
-        apg = random.uniform(2, 5) * quality_mult * variation
-        rpg = random.uniform(3, 6) * quality_mult * variation
-        fg_pct = random.uniform(0.42, 0.50)
-        three_pct = random.uniform(0.35, 0.45)
-    elif position == 2:  # SF
-        ppg = random.uniform(12, 20) * quality_mult * variation
-        apg = random.uniform(2, 4) * quality_mult * variation
-        rpg = random.uniform(4, 8) * quality_mult * variation
-        fg_pct = random.uniform(0.44, 0.52)
-        three_pct = random.uniform(0.33, 0.40)
-    elif position == 3:  # PF
-        ppg = random.uniform(10, 16) * quality_mult * variation
-        apg = random.uniform(1, 3) * quality_mult * variation
-        rpg = random.uniform(6, 10) * quality_mult * variation
-        fg_pct = random.uniform(0.46, 0.54)
-        three_pct = random.uniform(0.28, 0.38)
-    else:  # C
-        ppg = random.uniform(8, 14) * quality_mult * variation
-        apg = random.uniform(1, 2) * quality_mult * variation
-        rpg = random.uniform(7, 12) * quality_mult * variation
-        fg_pct = random.uniform(0.50, 0.58)
-        three_pct = random.uniform(0.20, 0.35)
-    
-    ft_pct = random.uniform(0.65, 0.85)
-    spg = random.uniform(0.5, 2.0) * quality_mult * variation
-    bpg = random.uniform(0.2, 1.5) * quality_mult * variation if position >= 3 else random.uniform(0.0, 0.5)
+    variation = rng.uniform(0.85, 1.15)
+    
+    ranges = POSITION_STAT_RANGES.get(position, POSITION_STAT_RANGES[4])
+    ppg = rng.uniform(*ranges["ppg"]) * quality_mult * variation
+    apg = rng.uniform(*ranges["apg"]) * quality_mult * variation
+    rpg = rng.uniform(*ranges["rpg"]) * quality_mult * variation
+    fg_pct = rng.uniform(*ranges["fg_pct"])
+    three_pct = rng.uniform(*ranges["three_pct"])
+    
+    ft_pct = rng.uniform(0.65, 0.85)
+    spg = rng.uniform(0.5, 2.0) * quality_mult * variation
+    bpg = rng.uniform(0.2, 1.5) * quality_mult * variation if position >= 3 else rng.uniform(0.0, 0.5)
     
     # Calculate rating more accurately with variation
     base_rating = (ppg * 3.0 + rpg * 2.5 + apg * 3.0 + fg_pct * 50 + three_pct * 30 + ft_pct * 20) / 15
     rating = int(base_rating * quality_mult * variation)
     rating = min(99, max(68, rating))
     
-    # Height/weight based on position
-    heights = {
-        0: ["6'0\"", "6'1\"", "6'2\"", "6'3\""],
-        1: ["6'3\"", "6'4\"", "6'5\"", "6'6\""],
-        2: ["6'6\"", "6'7\"", "6'8\"", "6'9\""],
-        3: ["6'8\"", "6'9\"", "6'10\"", "6'11\""],
-        4: ["6'10\"", "6'11\"", "7'0\"", "7'1\"", "7'2\""]
-    }
-    weights = {
-        0: ["170", "175", "180", "185", "190"],
-        1: ["185", "190", "195", "200"],
-        2: ["200", "210", "220", "230"],
-        3: ["220", "230", "240", "250"],
-        4: ["240", "250", "260", "270", "280"]
-    }
-    
     return {
         "first_name": first_name,
         "last_name": last_name,
         "position": position,
         "jersey": jersey,
-        "height": random.choice(heights[position]),
-        "weight": random.choice(weights[position]),
-        "age": random.randint(18, 23),
+        "height": rng.choice(HEIGHTS[position]),
+        "weight": rng.choice(WEIGHTS[position]),
+        "age": rng.randint(18, 23),
         "rating": rating,
         "stats": {
             "ppg": round(ppg, 1),
@@ -139,14 +233,139 @@ def generate_realistic_player(position, jersey, team_quality="average"):
         }
     }
 
+def stat_rating(stats):
+    """Unclamped rating score for a stat line - ranks generated players before their ratings are fitted"""
+    return (stats["ppg"] * 3.0 + stats["rpg"] * 2.5 + stats["apg"] * 3.0 + stats["fg_pct"] * 50
+            + stats["three_pct"] * 30 + stats["ft_pct"] * 20) / 15
+
+# Decimal places kept for each generated stat
+STAT_PRECISION = {"ppg": 1, "rpg": 1, "apg": 1, "fg_pct": 3, "three_pct": 3, "ft_pct": 3, "spg": 1, "bpg": 1}
+
+class RosterGenerator:
+    """Seedable generator for whole batches of realistic players
+
+    Uses the module-level name/height/weight tables and draws every player of
+    a position/quality tier in one vectorized call. With the same seed and the
+    same sequence of requests the output is identical. Without NumPy it falls
+    back to generate_realistic_player driven by a seeded random.Random.
+    """
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        if np is not None:
+            self._rng = np.random.default_rng(seed)
+        else:
+            self._rng = random.Random(seed)
+
+    @classmethod
+    def for_team(cls, seed, team_key):
+        """Generator with its own stream for one team, derived from the master seed and team_stream_key
+
+        A team's players don't depend on which other teams are generated, or
+        in what order, so teams can be updated in any worker.
+        """
+        digest = hashlib.sha256(f"{seed}|{team_key}".encode('utf-8')).digest()
+        return cls(int.from_bytes(digest[:8], 'big'))
+
+    def shuffle(self, items):
+        """Shuffle a list in place using this generator's stream"""
+        if np is not None:
+            items[:] = [items[i] for i in self._rng.permutation(len(items))]
+        else:
+            self._rng.shuffle(items)
+
+    def columns(self, position, team_quality, n):
+        """Draw n players for one position/quality tier as columns
+
+        Returns a dict of first_name, last_name, height, weight (lists) and
+        age, rating plus the STAT_PRECISION stats (arrays, or lists without NumPy).
+        """
+        if np is None:
+            players = [generate_realistic_player(position, 0, team_quality, self._rng) for _ in range(n)]
+            columns = {key: [p[key] for p in players]
+                       for key in ("first_name", "last_name", "height", "weight", "age", "rating")}
+            for key in STAT_PRECISION:
+                columns[key] = [p["stats"][key] for p in players]
+            return columns
+
+        rng = self._rng
+        quality_mult = QUALITY_MULTIPLIERS[team_quality]
+        ranges = POSITION_STAT_RANGES.get(position, POSITION_STAT_RANGES[4])
+        variation = rng.uniform(0.85, 1.15, n)
+        scale = quality_mult * variation
+
+        ppg = rng.uniform(*ranges["ppg"], n) * scale
+        apg = rng.uniform(*ranges["apg"], n) * scale
+        rpg = rng.uniform(*ranges["rpg"], n) * scale
+        fg_pct = rng.uniform(*ranges["fg_pct"], n)
+        three_pct = rng.uniform(*ranges["three_pct"], n)
+        ft_pct = rng.uniform(0.65, 0.85, n)
+        spg = rng.uniform(0.5, 2.0, n) * scale
+        if position >= 3:
+            bpg = rng.uniform(0.2, 1.5, n) * scale
+        else:
+            bpg = rng.uniform(0.0, 0.5, n)
+
+        base_rating = (ppg * 3.0 + rpg * 2.5 + apg * 3.0 + fg_pct * 50 + three_pct * 30 + ft_pct * 20) / 15
+        rating = np.clip(np.trunc(base_rating * scale), 68, 99).astype(np.int64)
+
+        heights = HEIGHTS[position]
+        weights = WEIGHTS[position]
+        stats = {"ppg": ppg, "rpg": rpg, "apg": apg, "fg_pct": fg_pct,
+                 "three_pct": three_pct, "ft_pct": ft_pct, "spg": spg, "bpg": bpg}
+        columns = {
+            "first_name": [FIRST_NAMES[i] for i in rng.integers(0, len(FIRST_NAMES), n)],
+            "last_name": [LAST_NAMES[i] for i in rng.integers(0, len(LAST_NAMES), n)],
+            "height": [heights[i] for i in rng.integers(0, len(heights), n)],
+            "weight": [weights[i] for i in rng.integers(0, len(weights), n)],
+            "age": rng.integers(18, 24, n),
+            "rating": rating,
+        }
+        for key, digits in STAT_PRECISION.items():
+            columns[key] = np.round(stats[key], digits)
+        return columns
+
+    def roster(self, positions, jerseys, team_quality="average"):
+        """Generate one player per (position, jersey) pair
+
+        Players are drawn per position in one batch each and returned in the
+        input order as real_data dicts for update_player, together with their
+        calculate_attributes_batch rows (None without NumPy).
+        """
+        players = [None] * len(positions)
+        by_position = {}
+        for i, position in enumerate(positions):
+            by_position.setdefault(position, []).append(i)
+
+        for position in sorted(by_position):
+            slots = by_position[position]
+            columns = self.columns(position, team_quality, len(slots))
+            for row, i in enumerate(slots):
+                players[i] = {
+                    "first_name": columns["first_name"][row],
+                    "last_name": columns["last_name"][row],
+                    "position": position,
+                    "jersey": jerseys[i],
+                    "height": columns["height"][row],
+                    "weight": columns["weight"][row],
+                    "age": int(columns["age"][row]),
+                    "rating": int(columns["rating"][row]),
+                    "stats": {key: float(columns[key][row]) for key in STAT_PRECISION},
+                }
+
+        attributes = None
+        if np is not None and players:
+            attributes = calculate_attributes_batch(stats_to_columns([p["stats"] for p in players]))
+        return players, attributes
+
 # Real roster data for 2025-26 season
 # NOTE: This dictionary should be populated with actual 2025-26 roster data.
 # The 2025-26 season is currently ongoing (started November 3, 2025).
 # 
 # OPTION 1: Use API to fetch rosters automatically
-#   - See fetch_rosters_from_api.py for TheSportsDB API integration
-#   - Free API: https://www.thesportsdb.com/
-#   - No API key required
+#   - fetch_rosters_from_api.py writes the provider files merged below
+#   - TheSportsDB is free, no API key required: https://www.thesportsdb.com/
+#   - SportsDataIO needs SPORTSDATAIO_KEY set
 #
 # OPTION 2: Manually add rosters here
 #   1. Visit ESPN, official team websites, or basketball reference sites
@@ -299,58 +518,35 @@ REAL_ROSTERS = {
     ],
 }
 
-# Auto-load rosters from API JSON files (if available)
-# Priority: SportsDataIO > API-Football > TheSportsDB > Manual REAL_ROSTERS
-try:
-    import os
-    base_dir = os.path.dirname(__file__)
-    
-    # 1. Try SportsDataIO first (most comprehensive, paid)
-    sportsdataio_file = os.path.join(base_dir, '..', 'sportsdataio_rosters.json')
-    if os.path.exists(sportsdataio_file):
-        with open(sportsdataio_file, 'r', encoding='utf-8') as f:
-            sportsdataio_rosters = json.load(f)
-            loaded_count = 0
-            for team_name, roster in sportsdataio_rosters.items():
-                if roster and len(roster) > 0:
-                    REAL_ROSTERS[team_name] = roster
-                    loaded_count += 1
-            if loaded_count > 0:
-                print(f"✅ Loaded {loaded_count} rosters from SportsDataIO")
-    
-    # 2. Try API-Football (free tier: 100 requests/month)
-    apifootball_file = os.path.join(base_dir, '..', 'apifootball_rosters.json')
-    if os.path.exists(apifootball_file):
-        with open(apifootball_file, 'r', encoding='utf-8') as f:
-            apifootball_rosters = json.load(f)
-            loaded_count = 0
-            for team_name, roster in apifootball_rosters.items():
-                # Only add if not already in REAL_ROSTERS
-                if team_name not in REAL_ROSTERS and roster and len(roster) > 0:
-                    REAL_ROSTERS[team_name] = roster
-                    loaded_count += 1
-            if loaded_count > 0:
-                print(f"✅ Loaded {loaded_count} additional rosters from API-Football")
-    
-    # 3. Then try TheSportsDB (free but limited)
-    thesportsdb_file = os.path.join(base_dir, '..', 'thesportsdb_rosters.json')
-    if os.path.exists(thesportsdb_file):
-        with open(thesportsdb_file, 'r', encoding='utf-8') as f:
-            thesportsdb_rosters = json.load(f)
-            loaded_count = 0
-            for team_name, roster in thesportsdb_rosters.items():
-                # Only add if not already in REAL_ROSTERS
-                if team_name not in REAL_ROSTERS and roster and len(roster) > 0:
-                    # Filter out invalid players (coaches, etc.)
-                    valid_roster = [p for p in roster if p.get('age', 0) < 40 and p.get('first_name') != 'Jay']
-                    if valid_roster:
-                        REAL_ROSTERS[team_name] = valid_roster
-                        loaded_count += 1
-            if loaded_count > 0:
-                print(f"✅ Loaded {loaded_count} additional rosters from TheSportsDB")
-except Exception as e:
-    # Silently fail - API files are optional
-    pass
+# Rosters from API JSON files (if available) are merged lazily on first use
+# and cached in .roster_cache.pickle until one of the files changes
+# Priority: SportsDataIO > Manual REAL_ROSTERS > API-Football > TheSportsDB
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Hand-kept per-provider exclusions (see roster_store.load_exclusions)
+ROSTER_OVERRIDES = os.path.join(BASE_DIR, 'roster_overrides.json')
+EXCLUSIONS = load_exclusions(ROSTER_OVERRIDES)
+
+PROVIDERS = [
+    # SportsDataIO (most comprehensive, paid)
+    Provider('SportsDataIO', os.path.join(BASE_DIR, '..', 'sportsdataio_rosters.json'),
+             exclude=EXCLUSIONS.get('SportsDataIO')),
+    # API-Football (free tier: 100 requests/month)
+    Provider('API-Football', os.path.join(BASE_DIR, '..', 'apifootball_rosters.json'),
+             exclude=EXCLUSIONS.get('API-Football')),
+    # TheSportsDB (free but limited) - its rosters include coaches and staff
+    Provider('TheSportsDB', os.path.join(BASE_DIR, '..', 'thesportsdb_rosters.json'),
+             exclude=[('age', '>=', 40)] + EXCLUSIONS.get('TheSportsDB', [])),
+]
+
+# Players are merged across sources by name + jersey; each field comes from
+# the first source in this order that has it
+ROSTER_PRIORITY = ['SportsDataIO', MANUAL_SOURCE, 'API-Football', 'TheSportsDB']
+# Per-field exceptions to ROSTER_PRIORITY, e.g. {'jersey': [MANUAL_SOURCE, ...]}
+FIELD_PRIORITY = {}
+
+ROSTER_SOURCE = RosterStore(REAL_ROSTERS, PROVIDERS, os.path.join(BASE_DIR, '.roster_cache.pickle'),
+                            priority=ROSTER_PRIORITY, field_priority=FIELD_PRIORITY)
 
 # Team quality mapping (for generating realistic rosters for teams without real data)
 TEAM_QUALITY = {
@@ -421,360 +617,736 @@ TEAM_QUALITY = {
     "Boston University Terriers": "poor",
 }
 
-def update_player(player, real_data):
-    """Update a player with real roster data"""
-    # CRITICAL: Preserve career player (Isaac Condrey) - never update if maxed attributes
-    # Check if this is the career player by name or pid
+def is_career_player(player):
+    """Check if this is the career player (Isaac Condrey) by pid or name"""
     fn = str(player.get('fn', '')).lower()
     ln = str(player.get('ln', '')).lower()
-    pid = player.get('pid')
-    
-    is_career_player = (
-        pid == 706 or
+    return (
+        player.get('pid') == CAREER_PID or
         (fn == 'isaac' and ln == 'condrey') or
         ('isaac' in fn and 'condrey' in ln)
     )
-    
-    # Also check if attributes are maxed (20/20) - likely career player
-    attrs = player.get('attributes', {})
-    has_maxed_attrs = False
-    if attrs:
-        for attr_value in attrs.values():
-            if isinstance(attr_value, list) and len(attr_value) == 2:
-                current, max_val = attr_value
-                if current == 20 and max_val == 20:
-                    has_maxed_attrs = True
-                    break
+
+def attributes_from_stats(stats):
+    """Attributes dict for one source stat line (missing stats count as STAT_DEFAULTS)"""
+    return calculate_attributes_from_stats(*(stats.get(key, default) for key, default in STAT_DEFAULTS.items()))
+
+# Where each save player field comes from in roster source data (REAL_ROSTERS,
+# provider files, --league files and generated players all use this schema)
+PLAYER_FIELDS = {
+    'fn': Copy('first_name'),
+    'ln': Copy('last_name'),
+    'pos': Copy('position'),
+    'num': Copy('jersey'),
+    'ht': Copy('height'),
+    'wt': Copy('weight'),
+    'age': Copy('age'),
+    'rating': Copy('rating'),
+    'attributes': Attributes('stats', attributes_from_stats, attributes_from_row),
+    'stats': Stats('stats'),
+}
+
+# Field mapping per leagueType (0 = pro, 1 = college, 2 = custom). Each
+# league's source (REAL_ROSTERS / providers for college, --league files for
+# the rest) is read through its own entry, so a league type whose source uses
+# another schema only needs its entry changed; types not listed use PLAYER_FIELDS
+LEAGUE_FIELDS = {
+    0: PLAYER_FIELDS,
+    1: PLAYER_FIELDS,
+    2: PLAYER_FIELDS,
+}
+
+# Names used in messages
+LEAGUE_LABELS = {0: 'pro', 1: 'college'}
+
+# league type -> compiled applier, built on first use
+_FIELD_PLANS = {}
+
+def field_plan(league_type):
+    """Compiled field mapping for one league type"""
+    plan = _FIELD_PLANS.get(league_type)
+    if plan is None:
+        plan = _FIELD_PLANS[league_type] = compile_field_map(LEAGUE_FIELDS.get(league_type, PLAYER_FIELDS))
+    return plan
+
+def update_player(player, real_data, index=None, attributes=None, matrix=None, apply_fields=None):
+    """Update a player with real roster data
+
+    When a SaveIndex is given, the career/maxed-attribute check is a lookup
+    into it instead of a scan of the player's name and attributes. attributes
+    may be a precomputed calculate_attributes_batch row for real_data's stats;
+    with an AttributeMatrix holding the player it is written there and only
+    reaches the player dict on matrix.sync(). apply_fields is the league's
+    field_plan (college by default).
+    """
+    # CRITICAL: Preserve career player (Isaac Condrey) - never update if maxed attributes
+    if index is not None:
+        preserve = index.is_protected(player)
+    else:
+        # Also check if attributes are maxed (20/20) - likely career player
+        preserve = is_career_player(player) or has_maxed_attributes(player)
     
     # If this is the career player or has maxed attributes, preserve everything
-    if is_career_player or has_maxed_attrs:
+    if preserve:
         return player  # Don't update - preserve completely
     
-    # Normal update for other players
-    if 'first_name' in real_data:
-        player['fn'] = real_data['first_name']
-    if 'last_name' in real_data:
-        player['ln'] = real_data['last_name']
-    if 'position' in real_data:
-        player['pos'] = real_data['position']
-    if 'jersey' in real_data:
-        player['num'] = real_data['jersey']
-    if 'height' in real_data:
-        player['ht'] = real_data['height']
-    if 'weight' in real_data:
-        player['wt'] = real_data['weight']
-    if 'age' in real_data:
-        player['age'] = real_data['age']
-    if 'rating' in real_data:
-        player['rating'] = real_data['rating']
-    
-    # Update attributes from stats
-    if 'stats' in real_data:
-        stats = real_data['stats']
-        attrs = calculate_attributes_from_stats(
-            stats.get('ppg', 10),
-            stats.get('rpg', 5),
-            stats.get('apg', 3),
-            stats.get('fg_pct', 0.45),
-            stats.get('three_pct', 0.35),
-            stats.get('ft_pct', 0.75),
-            stats.get('spg', 1),
-            stats.get('bpg', 0.5)
-        )
-        player['attributes'] = {**(player.get('attributes', {})), **attrs}
-        
-        # Update stats (stats might be a list or dict)
-        if 'stats' in real_data:
-            # If player stats is a list, convert to dict or handle appropriately
-            if isinstance(player.get('stats'), list):
-                # Stats is a list, might need different handling
-                pass  # Skip stats update if it's a list structure
-            elif isinstance(player.get('stats'), dict):
-                player['stats'].update(real_data['stats'])
-            else:
-                player['stats'] = real_data['stats']
-    
-    return player
+    if apply_fields is None:
+        apply_fields = field_plan(1)
+    return apply_fields(player, real_data, attributes, matrix)
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python update_all_rosters.py <save_file.json>")
-        sys.exit(1)
+def update_team(team, real_roster, team_quality, index, generator, verbose=True, matrix=None, skill_targets=None,
+                apply_fields=None):
+    """Refresh one team's roster in place from real data plus generated filler players
+
+    Protected players (see SaveIndex.is_protected) are left untouched. The
+    open slots are planned by roster_solver against everyone who stays, so
+    positions are balanced, jerseys unique and ratings follow the team's
+    QUALITY_RATINGS tier. Returns (players updated, players preserved,
+    players generated); verbose=False drops the per-team lines. Generated
+    player dicts are appended to skill_targets (if given) for a later
+    SKILLS.assign pass. apply_fields is the league's field_plan.
+    """
+    team_name = team_display_name(team)
+    roster = team['roster']
+    roster_size = len(roster)
+    updated = 0
+    preserved = 0
+    
+    # Players who stay on the team: real players and protected ones
+    kept = []
+    open_slots = []
+    for i, player in enumerate(roster):
+        if index.is_protected(player):
+            preserved += 1
+            kept.append(player)
+            if verbose and is_career_player(player):
+                print(f"   ✅ Preserved career player: {player.get('fn')} {player.get('ln')}")
+        elif i < len(real_roster):
+            # Use real roster data for the first N players
+            roster[i] = update_player(player, real_roster[i], index, apply_fields=apply_fields)
+            kept.append(roster[i])
+            updated += 1
+        else:
+            open_slots.append(i)
     
-    save_file = sys.argv[1]
+    if open_slots:
+        positions, jerseys = plan_roster(kept, len(open_slots), generator.shuffle)
+        # Draw all filler players for this team in one batch
+        generated, generated_attrs = generator.roster(positions, jerseys, team_quality)
+        ratings = fit_ratings([stat_rating(p['stats']) for p in generated], [p.get('rating') for p in kept],
+                              roster_size, *QUALITY_RATINGS[team_quality])
+        for row, player_idx in enumerate(open_slots):
+            generated[row]['rating'] = ratings[row]
+            attrs = generated_attrs[row] if generated_attrs is not None else None
+            roster[player_idx] = update_player(roster[player_idx], generated[row], index, attrs, matrix, apply_fields)
+            if skill_targets is not None:
+                skill_targets.append(roster[player_idx])
+            updated += 1
+    
+    if verbose:
+        if real_roster:
+            real_count = min(len(real_roster), roster_size)
+            print(f"✅ {team_name}: Updated with real roster ({real_count} real + {roster_size - real_count} generated)")
+        else:
+            print(f"✅ {team_name}: Generated realistic roster ({roster_size} players)")
+    
+    return updated, preserved, len(open_slots)
+
+def team_stream_key(league_id, team_idx, team):
+    """Identity of a team for RosterGenerator.for_team: its place in the file's seasonLeagues and its name"""
+    return f"{league_id}/{team_idx}/{team_display_name(team)}"
+
+def _update_team_shard(shard, seed, verbose):
+    """Worker: update_team for a group of teams sent as (league type, team key, team, real roster, quality)
+
+    Returns, per team, (roster, updated, preserved, generated, generated
+    slots, printed output) - the parent swaps the roster in and replays the output.
+    """
+    results = []
+    for league_type, team_key, team, real_roster, team_quality in shard:
+        index = SaveIndex([{'leagueType': league_type, 'teams': [team]}], career_check=is_career_player)
+        skill_targets = []
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            counts = update_team(team, real_roster, team_quality, index, RosterGenerator.for_team(seed, team_key),
+                                 verbose, skill_targets=skill_targets, apply_fields=field_plan(league_type))
+        generated_ids = {id(player) for player in skill_targets}
+        slots = [slot for slot, player in enumerate(team['roster']) if id(player) in generated_ids]
+        results.append((team['roster'], *counts, slots, output.getvalue()))
+    return results
+
+def update_teams_parallel(teams, seed, jobs, verbose=True):
+    """Run update_team for (league type, team key, team, real roster, quality) entries across worker processes
+
+    Teams are split into contiguous groups and each group's results come back
+    in order, so the merged output doesn't depend on the number of workers.
+    """
+    shard_count = min(len(teams), jobs * 4)
+    size = -(-len(teams) // shard_count)
+    shards = []
+    for start in range(0, len(teams), size):
+        shards.append([
+            (league_type, team_key, {key: team[key] for key in ('city', 'name', 'roster') if key in team},
+             real_roster, team_quality)
+            for league_type, team_key, team, real_roster, team_quality in teams[start:start + size]
+        ])
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for results in pool.map(_update_team_shard, shards, [seed] * len(shards), [verbose] * len(shards)):
+            yield from results
+
+class SaveUpdateError(Exception):
+    """Raised when a save file can't be updated"""
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Update all college basketball rosters in a Hoop Land save")
+    parser.add_argument('save_file',
+                        help="Mobile save file (.json) to update in place, or a directory / glob of saves")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Worker processes: one save each for a directory or glob (default: one per CPU), "
+                             "or groups of teams for a single save (default: 1)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Only load the college league; other leagues are copied byte-for-byte")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Seed for generated players - the same save and seed give the same output")
+    parser.add_argument('--profile', nargs='?', const='time', choices=PROFILE_MODES,
+                        help="Report time per phase and player counters; 'cpu' adds cProfile, "
+                             "'memory' adds tracemalloc peaks, 'all' does both")
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help="Also write the --profile report as JSON (cProfile data goes to FILE.prof)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Skip teams whose roster and inputs are unchanged since the last --incremental run "
+                             "(tracked in <save>.rosters-cache.json)")
+    parser.add_argument('--snapshot', action='store_true',
+                        help="Back the save up into .hoopland_snapshots/ (next to it) before updating")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and update saves matching save_file whenever the game writes them")
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help="Seconds between checks in --watch mode (default: 2)")
+    parser.add_argument('--league', action='append', default=[], metavar='TYPE=FILE',
+                        help="Also update leagues of this leagueType (0 = pro) from a provider-format roster "
+                             "file (team name -> players); repeatable")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Print a progress summary every few seconds instead of one line per team")
+    return parser.parse_args(argv)
+
+def load_league_rosters(specs):
+    """{league type: {team name: roster}} for --league TYPE=FILE arguments"""
+    league_rosters = {}
+    for spec in specs:
+        league_type, sep, path = spec.partition('=')
+        if not sep or not league_type.strip() or not path:
+            raise SaveUpdateError(f"--league expects TYPE=FILE, got '{spec}'")
+        league_type = league_type.strip()
+        league_type = int(league_type) if league_type.lstrip('-').isdigit() else league_type
+        if league_type == 1:
+            raise SaveUpdateError("College rosters come from REAL_ROSTERS and the provider files, not --league")
+        try:
+            league_rosters[league_type] = dict(iter_provider_teams(path))
+        except (OSError, ValueError) as e:
+            raise SaveUpdateError(f"Could not read {path}: {e}") from None
+        print(f"League type {league_type}: {len(league_rosters[league_type])} teams from {path}")
+    return league_rosters
+
+def write_save(save_file, data):
+    """Write a full save through a validated temporary file
+
+    Raises SchemaError (leaving save_file untouched) if the output is invalid.
+    """
+    with atomic_write(save_file, 'w', encoding='utf-8', validate=validate_file) as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def update_save(save_file, stream=False, seed=None, rosters=None, profile=None, quiet=False, incremental=False,
+                snapshot=False, league_rosters=None, jobs=1):
+    """Update every college roster in one save file in place
+
+    rosters defaults to ROSTER_SOURCE. league_rosters maps other league types
+    (0 = pro, or a custom league's type) to their own team name -> roster
+    source; only the teams such a source covers are updated. Returns a summary dict with the
+    updated/preserved player counts, teams touched, elapsed seconds and the
+    per-phase timings. Pass a RunProfile to collect cProfile/tracemalloc data
+    too; quiet=True replaces the per-team lines with a rate-limited summary.
+    incremental=True skips teams the sidecar TeamCache says are up to date.
+    snapshot=True backs the save up into its snapshot store first. Each
+    team gets its own RosterGenerator.for_team stream, so with jobs > 1 the
+    teams are updated across that many worker processes and the output is
+    identical to a single-process run.
+    """
+    started = time.perf_counter()
+    if profile is None:
+        profile = RunProfile()
+    if snapshot:
+        with profile.phase('snapshot'):
+            take_snapshot(save_file)
     print(f"Loading save file: {save_file}")
+    # College first, then every league type given its own source
+    league_types = [1] + sorted((league_type for league_type in league_rosters or {} if league_type != 1), key=str)
     
-    with open(save_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with profile.phase('load_save'):
+        streamed = None
+        if stream:
+            # Only materialize college leagues - everything else stays on disk
+            streamed = StreamedSave(save_file)
+            if streamed.leagues is None:
+                streamed.close()
+                raise SaveUpdateError("Not a mobile save file")
+            loaded_leagues = {
+                span.index: streamed.load_league(span)
+                for span in streamed.leagues if span.league_type in league_types
+            }
+            data = {'seasonLeagues': list(loaded_leagues.values())}
+            print(f"Streaming mode: loaded {len(loaded_leagues)} of {len(streamed.leagues)} leagues")
+        else:
+            with open(save_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
     
     if 'seasonLeagues' not in data:
-        print("Error: Not a mobile save file")
-        sys.exit(1)
+        raise SaveUpdateError("Not a mobile save file")
+    # Position of each loaded league in the file's seasonLeagues
+    league_ids = list(loaded_leagues) if streamed else list(range(len(data['seasonLeagues'])))
     
-    # Find and preserve career player (Isaac Condrey, pid 706)
-    # Search by both pid and name to be safe
-    career_player = None
-    career_player_team_idx = None
-    career_player_team = None
-    career_player_index = None
-    
-    for league in data['seasonLeagues']:
-        if league.get('leagueType') == 1:  # College league
-            if 'teams' in league:
-                for team_idx, team in enumerate(league['teams']):
-                    if 'roster' in team and team['roster']:
-                        for player_idx, player in enumerate(team['roster']):
-                            # Check by pid
-                            if player.get('pid') == 706:
-                                career_player = player.copy()  # Deep copy to preserve everything
-                                career_player_team_idx = team_idx
-                                career_player_team = team
-                                career_player_index = player_idx
-                                team_name = f"{team.get('city', '')} {team.get('name', '')}".strip()
-                                print(f"✅ Found career player by pid: Isaac Condrey (pid 706) on {team_name}")
-                                break
-                            # Also check by name (case-insensitive)
-                            fn = str(player.get('fn', '')).lower()
-                            ln = str(player.get('ln', '')).lower()
-                            if ('isaac' in fn and 'condrey' in ln) or (fn == 'isaac' and ln == 'condrey'):
-                                # Check if attributes are maxed (indicator of career player)
-                                attrs = player.get('attributes', {})
-                                is_maxed = False
-                                if attrs:
-                                    sample_attr = list(attrs.values())[0]
-                                    if isinstance(sample_attr, list) and len(sample_attr) == 2:
-                                        current, max_val = sample_attr
-                                        if current == 20 and max_val == 20:
-                                            is_maxed = True
-                                
-                                if is_maxed or player.get('pid') == 706:
-                                    career_player = player.copy()
-                                    career_player_team_idx = team_idx
-                                    career_player_team = team
-                                    career_player_index = player_idx
-                                    team_name = f"{team.get('city', '')} {team.get('name', '')}".strip()
-                                    print(f"✅ Found career player by name: Isaac Condrey on {team_name} (maxed attributes: {is_maxed})")
-                                    break
-                    if career_player:
-                        break
-            if career_player:
-                break
-    
-    if not career_player:
+    with profile.phase('career_search'):
+        # Index every roster slot being updated once - the career player search, the
+        # update loop and the relocation below all query this instead of rescanning
+        index = SaveIndex(data['seasonLeagues'], league_types=set(league_types), career_check=is_career_player)
+        college_leagues = set(index.by_league_type.get(1, []))
+        
+        # Find and preserve career player (Isaac Condrey, pid 706)
+        # Search by both pid and name to be safe
+        college_career = [loc for loc in index.career if loc.league in college_leagues]
+        career_loc = index.find_pid(CAREER_PID)
+        if career_loc and career_loc not in college_career:
+            career_loc = None
+        if career_loc is None and college_career:
+            career_loc = college_career[0]
+    
+    if career_loc:
+        career_player = index.player(career_loc)
+        team_name = team_display_name(index.team(career_loc.league, career_loc.team))
+        if career_player.get('pid') == CAREER_PID:
+            print(f"✅ Found career player by pid: Isaac Condrey (pid {CAREER_PID}) on {team_name}")
+        else:
+            print(f"✅ Found career player by name: Isaac Condrey on {team_name} (maxed attributes: {has_maxed_attributes(career_player)})")
+    else:
         print("⚠️  Warning: Career player (Isaac Condrey, pid 706) not found in rosters.")
         print("   Will preserve any player with maxed attributes (20/20) during update.")
     
+    if rosters is None:
+        rosters = ROSTER_SOURCE
+        with profile.phase('roster_source'):
+            report_roster_source()
+    
+    sources = {**(league_rosters or {}), 1: rosters}
+    with profile.phase('team_matching'):
+        # Provider names rarely match the save's spelling exactly
+        match_reports = {}
+        for league_type in league_types:
+            matcher = TeamMatcher((team_display_name(team), team.get('city'))
+                                  for _, _, team in index.teams(league_type))
+            sources[league_type], match_reports[league_type] = matcher.resolve(sources[league_type].items())
+    for league_type, match_report in match_reports.items():
+        report_team_matches(match_report, league=LEAGUE_LABELS.get(league_type, f"league type {league_type}"))
+        profile.count('provider_teams_ambiguous', len(match_report['ambiguous']))
+        profile.count('provider_teams_loose', len(match_report['candidates']))
+        profile.count('provider_teams_unmatched', len(match_report['unmatched']))
+    
+    # Every team's generator derives from this; without --seed the run is random but still per team
+    master_seed = seed if seed is not None else secrets.randbits(64)
     total_updated = 0
+    total_preserved = 0
     teams_updated = 0
+    # (league position in data['seasonLeagues'], team index) of every team we touch
+    dirty_teams = set()
+    team_cache = TeamCache(cache_path_for(save_file)) if incremental else None
+    team_inputs = {}
+    teams_skipped = 0
+    # Generated players per league type, given skills together once their attributes are final
+    skill_targets = {}
     
-    for league in data['seasonLeagues']:
-        if league.get('leagueType') == 1:  # College league
-            if 'teams' in league:
-                for team in league['teams']:
-                    team_name = f"{team.get('city', '')} {team.get('name', '')}".strip()
-                    
-                    if 'roster' not in team or not team['roster']:
-                        continue
-                    
-                    # Check if we have real roster data
-                    real_roster = REAL_ROSTERS.get(team_name, [])
-                    team_quality = TEAM_QUALITY.get(team_name, "average")
-                    
-                    if real_roster:
-                        # Use real roster data for first N players, generate rest
-                        roster_size = len(team['roster'])
-                        for i, real_player in enumerate(real_roster):
-                            if i < roster_size:
-                                # update_player will automatically preserve career player
-                                original_player = team['roster'][i].copy()
-                                updated_player = update_player(team['roster'][i], real_player)
-                                
-                                # Check if player was preserved (career player)
-                                if updated_player is original_player or (
-                                    updated_player.get('fn') == original_player.get('fn') and
-                                    updated_player.get('ln') == original_player.get('ln') and
-                                    'Isaac' in str(updated_player.get('fn', '')) and
-                                    'Condrey' in str(updated_player.get('ln', ''))
-                                ):
-                                    print(f"   ✅ Preserved career player: {updated_player.get('fn')} {updated_player.get('ln')}")
-                                else:
-                                    team['roster'][i] = updated_player
-                                    total_updated += 1
-                        
-                        # Fill remaining roster spots with generated players
-                        if len(real_roster) < roster_size:
-                            remaining = roster_size - len(real_roster)
-                            positions = [0, 1, 2, 3, 4] * 2  # Balanced positions
-                            used_jerseys = {p.get('num') for p in team['roster'][:len(real_roster)] if p.get('num')}
-                            
-                            for i in range(remaining):
-                                player_idx = len(real_roster) + i
-                                # Skip if this is the career player
-                                if player_idx < roster_size and team['roster'][player_idx].get('pid') == 706:
-                                    print(f"   ⚠️  Preserving career player Isaac Condrey (pid 706) - skipping update")
-                                    continue
-                                
-                                jersey = 1
-                                while jersey in used_jerseys:
-                                    jersey += 1
-                                used_jerseys.add(jersey)
-                                
-                                pos = positions[i % len(positions)]
-                                realistic_player = generate_realistic_player(pos, jersey, team_quality)
-                                if player_idx < roster_size:
-                                    team['roster'][player_idx] = update_player(team['roster'][player_idx], realistic_player)
-                                    total_updated += 1
-                        
-                        teams_updated += 1
-                        print(f"✅ {team_name}: Updated with real roster ({len(real_roster)} real + {roster_size - len(real_roster)} generated)")
-                    else:
-                        # Generate realistic roster
-                        roster_size = len(team['roster'])
-                        # Create balanced position distribution
-                        base_positions = [0, 0, 1, 1, 2, 2, 3, 3, 4, 4]
-                        positions = (base_positions * ((roster_size // len(base_positions)) + 1))[:roster_size]
-                        random.shuffle(positions)
-                        
-                        used_jerseys = set()
-                        for i, player in enumerate(team['roster']):
-                            # update_player will automatically preserve career player
-                            original_player = player.copy()
-                            jersey = (i % 30) + 1
-                            while jersey in used_jerseys:
-                                jersey = (jersey % 30) + 1
-                            used_jerseys.add(jersey)
-                            
-                            pos = positions[i] if i < len(positions) else i % 5
-                            realistic_player = generate_realistic_player(pos, jersey, team_quality)
-                            updated_player = update_player(player, realistic_player)
-                            
-                            # Check if player was preserved (career player)
-                            if updated_player is original_player or (
-                                updated_player.get('fn') == original_player.get('fn') and
-                                updated_player.get('ln') == original_player.get('ln') and
-                                'Isaac' in str(updated_player.get('fn', '')) and
-                                'Condrey' in str(updated_player.get('ln', ''))
-                            ):
-                                print(f"   ✅ Preserved career player: {updated_player.get('fn')} {updated_player.get('ln')}")
-                            else:
-                                team['roster'][i] = updated_player
-                                total_updated += 1
-                        
-                        print(f"✅ {team_name}: Generated realistic roster ({roster_size} players)")
-                        teams_updated += 1
-    
-    # Verify career player is on North Carolina (or add them if missing) - BEFORE SAVING
-    found_career = False
-    north_carolina_team = None
-    
-    for league in data['seasonLeagues']:
-        if league.get('leagueType') == 1:
-            if 'teams' in league:
-                for team in league['teams']:
-                    team_name = f"{team.get('city', '')} {team.get('name', '')}".strip()
-                    if 'North Carolina' in team_name or 'Tar Heels' in team_name:
-                        north_carolina_team = team
-                    
-                    if 'roster' in team:
-                        for player in team['roster']:
-                            # Check by pid, name, or maxed attributes
-                            fn = str(player.get('fn', '')).lower()
-                            ln = str(player.get('ln', '')).lower()
-                            pid = player.get('pid')
-                            
-                            if (pid == 706 or 
-                                (fn == 'isaac' and ln == 'condrey') or
-                                ('isaac' in fn and 'condrey' in ln)):
-                                found_career = True
-                                team_name = f"{team.get('city', '')} {team.get('name', '')}".strip()
-                                
-                                # Check if attributes are maxed
-                                attrs = player.get('attributes', {})
-                                is_maxed = False
-                                if attrs:
-                                    for attr_value in attrs.values():
-                                        if isinstance(attr_value, list) and len(attr_value) == 2:
-                                            if attr_value[0] == 20 and attr_value[1] == 20:
-                                                is_maxed = True
-                                                break
-                                
-                                print(f"\n✅ Career player found: Isaac Condrey (pid 706) on {team_name}")
-                                print(f"   Maxed attributes: {is_maxed}")
-                                print(f"   Position: {player.get('pos')}, Jersey: {player.get('num')}")
-                                
-                                # If not on North Carolina, move them there
-                                if 'North Carolina' not in team_name and 'Tar Heels' not in team_name:
-                                    if north_carolina_team and 'roster' in north_carolina_team:
-                                        print(f"   ⚠️  Moving career player to North Carolina...")
-                                        # Remove from current team
-                                        team['roster'].remove(player)
-                                        # Add to North Carolina (at position 0 to ensure they're first)
-                                        north_carolina_team['roster'].insert(0, player)
-                                        print(f"   ✅ Moved to North Carolina Tar Heels")
-                                break
-                        if found_career:
-                            break
-            if found_career:
-                break
-    
-    if not found_career and north_carolina_team:
-        print("\n⚠️  Career player not found. Creating Isaac Condrey on North Carolina...")
-        # Get a sample player structure from the roster to match the format
-        sample_player = None
-        if 'roster' in north_carolina_team and north_carolina_team['roster']:
-            sample_player = north_carolina_team['roster'][0].copy()
+    # College teams are all updated (generated when there is no real roster);
+    # other leagues only where their source has the team
+    league_teams = [
+        (league_type, entry)
+        for league_type in league_types
+        for entry in index.teams(league_type)
+        if entry[2].get('roster') and (league_type == 1 or team_display_name(entry[2]) in sources[league_type])
+    ]
+    progress = Progress(len(league_teams), "teams updated", PROGRESS_INTERVAL) if quiet else None
+    with profile.phase('team_updates'):
+        pending = []
+        for league_type, (league_pos, team_idx, team) in league_teams:
+            team_name = team_display_name(team)
+            
+            # Check if we have real roster data
+            real_roster = sources[league_type].get(team_name, [])
+            team_quality = TEAM_QUALITY.get(team_name, "average")
+            
+            if team_cache is not None:
+                inputs = inputs_digest(real_roster, team_quality, seed)
+                team_inputs[(league_pos, team_idx)] = inputs
+                if team_cache.is_current(f"{league_ids[league_pos]}/{team_idx}", inputs, team['roster']):
+                    teams_skipped += 1
+                    if progress:
+                        progress.step()
+                    continue
+            pending.append((league_type, league_pos, team_idx, team, real_roster, team_quality))
         
-        # Create career player with maxed attributes, matching the save file structure
-        career_player = sample_player.copy() if sample_player else {}
-        career_player.update({
-            'pid': 706,
-            'fn': 'Isaac',
-            'ln': 'Condrey',
-            'pos': 0,  # PG
-            'num': 1,
-            'age': 20,
-            'rating': 99,
-            'attributes': {
-                'LAY': [20, 20], 'DNK': [20, 20], 'INS': [20, 20],
-                'MID': [20, 20], 'TPT': [20, 20], 'FTS': [20, 20],
-                'DRB': [20, 20], 'PAS': [20, 20], 'ORE': [20, 20],
-                'DRE': [20, 20], 'STL': [20, 20], 'BLK': [20, 20]
-            },
-            'skills': [],  # Maxed skills will be added by user in-game
-        })
+        jobs = max(1, min(jobs or 1, len(pending)))
+        # Generated attributes are written into one packed array and synced back in bulk
+        # (in-process only - workers write them straight into their copy of the players)
+        matrix = None
+        if jobs == 1 and np is not None:
+            matrix = AttributeMatrix.from_leagues(data['seasonLeagues'], set(league_types), ATTRIBUTE_KEYS)
+        keys = [team_stream_key(league_ids[league_pos], team_idx, team)
+                for _, league_pos, team_idx, team, _, _ in pending]
+        if jobs > 1:
+            print(f"Updating {len(pending)} teams with {jobs} worker(s)...")
+            results = update_teams_parallel(
+                [(league_type, key, team, real_roster, team_quality)
+                 for key, (league_type, _, _, team, real_roster, team_quality) in zip(keys, pending)],
+                master_seed, jobs, verbose=not quiet)
+        else:
+            results = None
         
-        # Ensure stats structure matches (might be list or dict)
-        if 'stats' not in career_player or not career_player['stats']:
-            if sample_player and 'stats' in sample_player:
-                if isinstance(sample_player['stats'], list):
-                    career_player['stats'] = [{'season': {'ppg': 25.0, 'rpg': 5.0, 'apg': 8.0}}]
-                else:
-                    career_player['stats'] = {'season': {'ppg': 25.0, 'rpg': 5.0, 'apg': 8.0}}
+        for key, (league_type, league_pos, team_idx, team, real_roster, team_quality) in zip(keys, pending):
+            targets = skill_targets.setdefault(league_type, [])
+            if results is None:
+                updated, preserved, generated = update_team(team, real_roster, team_quality, index,
+                                                            RosterGenerator.for_team(master_seed, key),
+                                                            verbose=not quiet, matrix=matrix,
+                                                            skill_targets=targets,
+                                                            apply_fields=field_plan(league_type))
             else:
-                career_player['stats'] = [{'season': {'ppg': 25.0, 'rpg': 5.0, 'apg': 8.0}}]
-        
-        if 'roster' in north_carolina_team:
-            # Insert at position 0 to make them first
-            north_carolina_team['roster'].insert(0, career_player)
-            print(f"   ✅ Created Isaac Condrey on North Carolina Tar Heels")
-            print(f"      - Position: PG (0), Jersey: #1")
-            print(f"      - Rating: 99, All attributes maxed (20/20)")
-            print(f"      - Skills: Empty (will be populated in-game)")
-    
-    if not found_career and not north_carolina_team:
-        print("\n⚠️  WARNING: Career player not found AND North Carolina team not found!")
+                roster, updated, preserved, generated, slots, output = next(results)
+                print(output, end='')
+                index.replace_roster(league_pos, team_idx, roster)
+                targets.extend(roster[slot] for slot in slots)
+            total_updated += updated
+            total_preserved += preserved
+            teams_updated += 1
+            dirty_teams.add((league_pos, team_idx))
+            profile.count('teams_real' if real_roster else 'teams_generated')
+            profile.count('players_generated', generated)
+            if progress:
+                progress.step()
+        if matrix is not None:
+            matrix.sync()
+    if progress:
+        progress.finish()
+    with profile.phase('skills'):
+        # Skills are ranked against every player of the league type, not just this run's batch
+        for league_type, targets in skill_targets.items():
+            league = SKILLS.reference_rows([player for _, _, team in index.teams(league_type)
+                                            for player in team.get('roster') or []], matrix)
+            profile.count('skills_assigned', SKILLS.assign(targets, league))
+    profile.count('players_updated', total_updated)
+    profile.count('players_preserved', total_preserved)
+    if team_cache is not None:
+        profile.count('teams_skipped', teams_skipped)
     
+    with profile.phase('career_relocation'):
+        # Verify career player is on North Carolina (or add them if missing) - BEFORE SAVING
+        # Protected players are never replaced, so the indexed locations are still valid
+        north_carolina_loc = index.find_team("North Carolina Tar Heels", "North Carolina", "Tar Heels")
+        north_carolina_team = index.team(*north_carolina_loc) if north_carolina_loc else None
+        found_career = bool(college_career)
+        
+        if found_career:
+            loc = college_career[0]
+            player = index.player(loc)
+            team_name = team_display_name(index.team(loc.league, loc.team))
+        
+            print(f"\n✅ Career player found: Isaac Condrey (pid 706) on {team_name}")
+            print(f"   Maxed attributes: {has_maxed_attributes(player)}")
+            print(f"   Position: {player.get('pos')}, Jersey: {player.get('num')}")
+        
+            # If not on North Carolina, move them there
+            if 'North Carolina' not in team_name and 'Tar Heels' not in team_name:
+                if north_carolina_team and 'roster' in north_carolina_team:
+                    print(f"   ⚠️  Moving career player to North Carolina...")
+                    # Add to North Carolina (at position 0 to ensure they're first)
+                    index.move_player(loc, north_carolina_loc, 0)
+                    dirty_teams.add((loc.league, loc.team))
+                    dirty_teams.add(north_carolina_loc)
+                    print(f"   ✅ Moved to North Carolina Tar Heels")
+        
+        if not found_career and north_carolina_team:
+            print("\n⚠️  Career player not found. Creating Isaac Condrey on North Carolina...")
+            # Get a sample player structure from the roster to match the format
+            sample_player = None
+            if 'roster' in north_carolina_team and north_carolina_team['roster']:
+                sample_player = north_carolina_team['roster'][0].copy()
+        
+            # Create career player with maxed attributes, matching the save file structure
+            career_player = sample_player.copy() if sample_player else {}
+            career_player.update({
+                'pid': CAREER_PID,
+                'fn': 'Isaac',
+                'ln': 'Condrey',
+                'pos': 0,  # PG
+                'num': 1,
+                'age': 20,
+                'rating': 99,
+                'attributes': {
+                    'LAY': [20, 20], 'DNK': [20, 20], 'INS': [20, 20],
+                    'MID': [20, 20], 'TPT': [20, 20], 'FTS': [20, 20],
+                    'DRB': [20, 20], 'PAS': [20, 20], 'ORE': [20, 20],
+                    'DRE': [20, 20], 'STL': [20, 20], 'BLK': [20, 20]
+                },
+            })
+            SKILLS.assign([career_player])
+        
+            # Ensure stats structure matches (might be list or dict)
+            if 'stats' not in career_player or not career_player['stats']:
+                if sample_player and 'stats' in sample_player:
+                    if isinstance(sample_player['stats'], list):
+                        career_player['stats'] = [{'season': {'ppg': 25.0, 'rpg': 5.0, 'apg': 8.0}}]
+                    else:
+                        career_player['stats'] = {'season': {'ppg': 25.0, 'rpg': 5.0, 'apg': 8.0}}
+                else:
+                    career_player['stats'] = [{'season': {'ppg': 25.0, 'rpg': 5.0, 'apg': 8.0}}]
+        
+            if 'roster' in north_carolina_team:
+                # Insert at position 0 to make them first
+                index.insert_player(north_carolina_loc, career_player, 0)
+                dirty_teams.add(north_carolina_loc)
+                print(f"   ✅ Created Isaac Condrey on North Carolina Tar Heels")
+                print(f"      - Position: PG (0), Jersey: #1")
+                print(f"      - Rating: 99, All attributes maxed (20/20)")
+                print(f"      - Skills: {len(career_player['skills'])} earned from maxed attributes")
+        
+        if not found_career and not north_carolina_team:
+            print("\n⚠️  WARNING: Career player not found AND North Carolina team not found!")
+        
     print(f"\n{'='*50}")
     print(f"✅ Updated {total_updated} players across {teams_updated} teams")
+    if team_cache is not None:
+        print(f"   Skipped {teams_skipped} teams unchanged since the last --incremental run")
     print(f"{'='*50}")
     
+    if team_cache is not None:
+        for league_pos, team_idx in dirty_teams:
+            inputs = team_inputs.get((league_pos, team_idx))
+            if inputs is not None:
+                team_cache.record(f"{league_ids[league_pos]}/{team_idx}", inputs,
+                                  index.team(league_pos, team_idx)['roster'])
+        if not dirty_teams:
+            if streamed:
+                streamed.close()
+            print("✅ Nothing changed - save left as is")
+            return {
+                'file': save_file,
+                'updated': 0,
+                'preserved': total_preserved,
+                'teams': 0,
+                'skipped': teams_skipped,
+                'seconds': time.perf_counter() - started,
+                'phases': dict(profile.phases),
+            }
+    
     print(f"\nSaving updated file...")
-    with open(save_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with profile.phase('serialize'):
+        try:
+            if streamed:
+                # Splice only the teams we changed back into the original bytes;
+                # only those leagues need a full check, the rest are copied verbatim
+                league_indices = list(loaded_leagues)
+                dirty_by_league = {index: set() for index in league_indices}
+                for league_pos, team_idx in dirty_teams:
+                    dirty_by_league[league_indices[league_pos]].add(team_idx)
+                streamed.write_leagues(save_file, loaded_leagues, dirty_by_league,
+                                       validate=lambda path: validate_file(path, set(league_indices)))
+            else:
+                write_save(save_file, data)
+        except SchemaError as e:
+            raise SaveUpdateError(f"Updated save failed validation at {e}; {save_file} was not changed") from None
+    
+    if team_cache is not None:
+        team_cache.save()
     
     print("✅ File saved successfully!")
-    print(f"\nNote: {len([t for t in REAL_ROSTERS.keys() if REAL_ROSTERS[t]])} teams have real 2025-26 roster data.")
-    print(f"      {teams_updated - len([t for t in REAL_ROSTERS.keys() if REAL_ROSTERS[t]])} teams have generated realistic rosters.")
+    return {
+        'file': save_file,
+        'updated': total_updated,
+        'preserved': total_preserved,
+        'teams': teams_updated,
+        'skipped': teams_skipped,
+        'seconds': time.perf_counter() - started,
+        'phases': dict(profile.phases),
+    }
+
+def report_team_matches(report, limit=10, league='college'):
+    """Print provider names that matched loosely, ambiguously or not at all"""
+    for provider_name, found in report['matched'].items():
+        if found.status in ('alias', 'fuzzy'):
+            print(f"   Matched provider team '{provider_name}' to {found.team} ({found.status})")
+    for provider_name, candidates in list(report['ambiguous'].items())[:limit]:
+        print(f"⚠️  Provider team '{provider_name}' is ambiguous ({' / '.join(candidates)}) - not used")
+    if len(report['ambiguous']) > limit:
+        print(f"   ... and {len(report['ambiguous']) - limit} more ambiguous provider teams")
+    for provider_name, candidates in list(report['candidates'].items())[:limit]:
+        print(f"⚠️  Provider team '{provider_name}' only loosely resembles {' / '.join(candidates)} - not used")
+    if len(report['candidates']) > limit:
+        print(f"   ... and {len(report['candidates']) - limit} more loosely matching provider teams")
+    unmatched = report['unmatched']
+    if unmatched:
+        shown = ', '.join(unmatched[:limit]) + (f" and {len(unmatched) - limit} more" if len(unmatched) > limit else "")
+        print(f"⚠️  {len(unmatched)} provider teams match no {league} team in this save: {shown}")
+
+def report_roster_source():
+    """Load ROSTER_SOURCE and print how long it took"""
+    ROSTER_SOURCE.load()
+    status = "cache hit" if ROSTER_SOURCE.stats['cache_hit'] else "rebuilt cache"
+    print(f"Roster source: {ROSTER_SOURCE.stats['teams']} teams ({status}, {ROSTER_SOURCE.stats['load_ms']:.1f} ms)")
+
+def is_save_file(path):
+    """False for our own sidecar files that sit next to saves"""
+    return os.path.isfile(path) and not path.endswith(CACHE_SUFFIX)
+
+def find_save_files(pattern):
+    """Expand a directory or glob into the .json saves it refers to"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.json')
+    return sorted(path for path in glob.glob(pattern) if is_save_file(path))
+
+# Roster source handed to each batch worker once by the pool initializer
+_WORKER_ROSTERS = None
+_WORKER_LEAGUE_ROSTERS = None
+
+def _init_batch_worker(rosters, league_rosters=None):
+    global _WORKER_ROSTERS, _WORKER_LEAGUE_ROSTERS
+    _WORKER_ROSTERS = rosters
+    _WORKER_LEAGUE_ROSTERS = league_rosters
+
+def _update_save_worker(save_file, stream, seed, incremental, snapshot):
+    """Run update_save in a worker; per-team output is discarded and errors are returned, not raised"""
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return update_save(save_file, stream, seed, _WORKER_ROSTERS, quiet=True,
+                               incremental=incremental, snapshot=snapshot, league_rosters=_WORKER_LEAGUE_ROSTERS)
+    except Exception as e:
+        return {'file': save_file, 'error': f"{type(e).__name__}: {e}",
+                'seconds': time.perf_counter() - started}
+
+def update_saves(save_files, stream=False, seed=None, jobs=None, incremental=False, snapshot=False,
+                 league_rosters=None):
+    """Update many saves in parallel worker processes
+
+    The roster source is loaded once here and shared with every worker.
+    A failing file is reported in its summary and never stops the others.
+    """
+    report_roster_source()
+    rosters = dict(ROSTER_SOURCE.items())
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(save_files)))
+    print(f"Updating {len(save_files)} saves with {jobs} worker(s)...")
+    
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker,
+                             initargs=(rosters, league_rosters)) as pool:
+        futures = [pool.submit(_update_save_worker, path, stream, seed, incremental, snapshot) for path in save_files]
+        return [future.result() for future in futures]
+
+def watch_saves(pattern, stream=False, seed=None, jobs=None, incremental=False, snapshot=False, interval=2.0,
+                league_rosters=None):
+    """Update saves matching pattern every time the game finishes writing them, until Ctrl+C
+
+    The roster source is loaded once. Saves that change together are updated
+    as one batch, across a worker pool that is kept for the whole session.
+    """
+    report_roster_source()
+    rosters = dict(ROSTER_SOURCE.items())
+    _init_batch_worker(rosters, league_rosters)
+    watcher = SaveWatcher(pattern, interval, exclude=lambda path: not is_save_file(path))
+    print(f"👀 Watching {watcher.pattern} every {interval:g}s (Ctrl+C to stop)")
+    pool = None
+    try:
+        while True:
+            changed = watcher.wait()
+            print(f"\nDetected {len(changed)} changed save(s)")
+            workers = min(jobs or os.cpu_count() or 1, len(changed))
+            if workers > 1:
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers=jobs or os.cpu_count(),
+                                               initializer=_init_batch_worker, initargs=(rosters, league_rosters))
+                futures = [pool.submit(_update_save_worker, path, stream, seed, incremental, snapshot)
+                           for path in changed]
+                summaries = [future.result() for future in futures]
+            else:
+                summaries = [_update_save_worker(path, stream, seed, incremental, snapshot) for path in changed]
+            for path in changed:
+                # Our own write must not look like a new save from the game
+                watcher.mark_handled(path)
+            print_batch_summary(summaries)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def print_batch_summary(summaries, show_phases=False):
+    print(f"\n{'='*50}")
+    failed = 0
+    for summary in summaries:
+        name = os.path.basename(summary['file'])
+        if 'error' in summary:
+            failed += 1
+            print(f"❌ {name}: {summary['error']} ({summary['seconds']:.2f}s)")
+        else:
+            print(f"✅ {name}: {summary['updated']} updated, {summary['preserved']} preserved "
+                  f"across {summary['teams']} teams ({summary['seconds']:.2f}s)"
+                  + (f", {summary['skipped']} unchanged teams skipped" if summary['skipped'] else ""))
+            if show_phases:
+                print("   " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in summary['phases'].items()))
+    print(f"{'='*50}")
+    print(f"{len(summaries) - failed} of {len(summaries)} saves updated")
+    return failed
+
+def main():
+    args = parse_args()
+    try:
+        league_rosters = load_league_rosters(args.league)
+    except SaveUpdateError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    if args.watch:
+        watch_saves(args.save_file, args.stream, args.seed, args.jobs, args.incremental, args.snapshot,
+                    args.interval, league_rosters)
+        return
+    
+    if os.path.isdir(args.save_file) or glob.has_magic(args.save_file):
+        save_files = find_save_files(args.save_file)
+        if not save_files:
+            print(f"Error: No save files match {args.save_file}")
+            sys.exit(1)
+        if args.profile not in (None, 'time'):
+            print(f"Note: --profile {args.profile} only applies to a single save; reporting phase times")
+        failed = print_batch_summary(update_saves(save_files, args.stream, args.seed, args.jobs, args.incremental,
+                                                  args.snapshot, league_rosters),
+                                     show_phases=args.profile is not None)
+        sys.exit(1 if failed else 0)
+    
+    profile = RunProfile(args.profile or 'time')
+    profile.start()
+    try:
+        summary = update_save(args.save_file, args.stream, args.seed, profile=profile, quiet=args.quiet,
+                              incremental=args.incremental, snapshot=args.snapshot, league_rosters=league_rosters,
+                              jobs=args.jobs)
+    except SaveUpdateError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        profile.stop()
+    
+    if args.profile:
+        profile.report()
+    if args.profile_output:
+        profile.write(args.profile_output)
+        print(f"✅ Profile written to {args.profile_output}")
+    
+    teams_updated = summary['teams']
+    real_team_count = ROSTER_SOURCE.team_count()
+    print(f"\nNote: {real_team_count} teams have real 2025-26 roster data.")
+    print(f"      {teams_updated - real_team_count} teams have generated realistic rosters.")
     print(f"\n⚠️  IMPORTANT: This script uses 2025-26 season data where available.")
     print(f"   For teams without real roster data, realistic rosters are generated.")
     print(f"   To add more real 2025-26 rosters, update the REAL_ROSTERS dictionary in this script.")
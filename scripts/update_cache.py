@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Incremental update cache for roster updates
+A sidecar JSON file next to the save records, for every team that was
+updated, a hash of its inputs (real/provider roster, quality tier, seed) and
+a hash of the roster that was written. On the next --incremental run a team
+whose roster and inputs both still match is skipped.
+"""
+
+import hashlib
+import json
+
+from atomic_file import atomic_write
+
+# Bump when update_team's output for the same inputs changes
+CACHE_VERSION = 6
+
+CACHE_SUFFIX = '.rosters-cache.json'
+
+
+def cache_path_for(save_file):
+    return f"{save_file}{CACHE_SUFFIX}"
+
+
+def _digest(value):
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def inputs_digest(real_roster, team_quality, seed):
+    """Hash of everything update_team reads besides the save itself"""
+    return _digest([CACHE_VERSION, real_roster, team_quality, seed])
+
+
+def roster_digest(roster):
+    return _digest(roster)
+
+
+class TeamCache:
+    """Per-team {inputs, output} hashes keyed by 'league/team' position"""
+
+    def __init__(self, path):
+        self.path = path
+        self.teams = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == CACHE_VERSION:
+                self.teams = cached.get('teams', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠️  Ignoring unreadable update cache {path}: {e}")
+
+    def is_current(self, key, inputs, roster):
+        """True if this team was last written from the same inputs and is unchanged since"""
+        entry = self.teams.get(key)
+        return bool(entry) and entry['inputs'] == inputs and entry['output'] == roster_digest(roster)
+
+    def record(self, key, inputs, roster):
+        self.teams[key] = {'inputs': inputs, 'output': roster_digest(roster)}
+
+    def save(self):
+        try:
+            with atomic_write(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'teams': self.teams}, f)
+        except OSError as e:
+            print(f"⚠️  Could not write update cache {self.path}: {e}")